@@ -0,0 +1,50 @@
+"""
+Compara obtener_productos(ids) con N llamadas a obtener_producto(id).
+
+Uso:
+    python -m benchmarks.bench_multiget --productos 10000 --ids 1 10 100 1000
+"""
+import sys
+import random
+import argparse
+from benchmarks.comun import servidor_temporal, conectar_cliente, medir
+
+
+def main():
+    """
+    Ejecuta el benchmark e imprime una tabla con los resultados.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--productos", type=int, default=10000,
+                        help="Tamaño del catálogo de prueba")
+    parser.add_argument("--ids", type=int, nargs="+", default=[1, 10, 100, 1000],
+                        help="Cantidades de IDs a consultar")
+    parser.add_argument("--repeticiones", type=int, default=5,
+                        help="Repeticiones por medición")
+    args = parser.parse_args()
+    
+    aleatorio = random.Random(0)
+    
+    with servidor_temporal(args.productos) as uri:
+        # Sin caché, para medir solo el coste de las llamadas remotas
+        cliente = conectar_cliente(uri, usar_cache=False)
+        
+        print(f"{'IDS':>6} {'N LLAMADAS (s)':>16} {'MULTI-GET (s)':>15} {'ACELERACIÓN':>12}")
+        print("-" * 52)
+        
+        for cantidad in args.ids:
+            ids = aleatorio.sample(range(1, args.productos + 1), min(cantidad, args.productos))
+            
+            individual = medir(lambda: [cliente.obtener_producto(i) for i in ids], args.repeticiones)
+            multiple = medir(lambda: cliente.obtener_productos(ids), args.repeticiones)
+            
+            aceleracion = individual["mediana"] / multiple["mediana"]
+            print(f"{len(ids):>6} {individual['mediana']:>16.4f} {multiple['mediana']:>15.4f} {aceleracion:>11.1f}x")
+        
+        cliente.cerrar()
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
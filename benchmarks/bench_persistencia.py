@@ -0,0 +1,207 @@
+"""
+Mide la persistencia del inventario (guardar, cargar, to_dict, from_dict y
+listar) a varios tamaños de catálogo y la compara con una línea base.
+
+Para cada operación y tamaño se mide el tiempo (mínimo de varias
+repeticiones) y el pico de memoria reservada (con tracemalloc, en una
+ejecución aparte). El programa termina con código 1 si alguna medida
+empeora más que el umbral respecto a la línea base guardada.
+
+Uso:
+    python -m benchmarks.bench_persistencia
+    python -m benchmarks.bench_persistencia --tamanos 1000 10000 --umbral 0.5
+    python -m benchmarks.bench_persistencia --guardar-linea-base
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from servidor.producto import Producto
+from benchmarks.comun import crear_inventario, medir, commit_actual
+
+TAMANOS_POR_DEFECTO = [1000, 10000, 100000, 1000000]
+RUTA_LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "linea_base_persistencia.json")
+
+# Por debajo de estos valores las diferencias son ruido y no se comparan
+MINIMO_SEGUNDOS = 0.005
+MINIMO_MEMORIA_MB = 1.0
+
+
+def operaciones(inventario):
+    """
+    Devuelve las operaciones a medir sobre un inventario.
+    
+    Args:
+        inventario (Inventario): Inventario de prueba ya guardado en disco.
+    
+    Returns:
+        dict: Función sin argumentos por nombre de operación.
+    """
+    productos = list(inventario.productos.values())
+    diccionarios = [producto.to_dict() for producto in productos]
+    
+    return {
+        "guardar": inventario.guardar_en_archivo,
+        "cargar": inventario.cargar_desde_archivo,
+        "to_dict": lambda: [producto.to_dict() for producto in productos],
+        "from_dict": lambda: [Producto.from_dict(datos) for datos in diccionarios],
+        "listar": inventario.listar_productos,
+        "listar_categoria": lambda: inventario.listar_productos("Categoria 0")
+    }
+
+
+def pico_memoria(funcion):
+    """
+    Ejecuta una función y mide la memoria máxima que reserva.
+    
+    Args:
+        funcion (callable): Función a medir (sin argumentos).
+    
+    Returns:
+        float: Pico de memoria reservada durante la llamada, en MB.
+    """
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        funcion()
+        return (tracemalloc.get_traced_memory()[1] - base) / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def medir_tamano(cantidad, repeticiones):
+    """
+    Mide todas las operaciones con un catálogo de un tamaño.
+    
+    Args:
+        cantidad (int): Número de productos.
+        repeticiones (int): Repeticiones de cada medida de tiempo.
+    
+    Returns:
+        dict: Segundos y pico de memoria (MB) por operación.
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        inventario = crear_inventario(os.path.join(directorio, "inventario.json"), cantidad)
+        inventario.guardar_en_archivo()
+        
+        resultados = {}
+        for nombre, funcion in operaciones(inventario).items():
+            tiempo = medir(funcion, repeticiones)["minimo"]
+            resultados[nombre] = {
+                "segundos": tiempo,
+                "memoria_mb": pico_memoria(funcion)
+            }
+        
+        resultados["archivo_mb"] = os.path.getsize(inventario.ruta_archivo) / 2 ** 20
+        return resultados
+
+
+def comparar(resultados, linea_base, umbral):
+    """
+    Busca medidas que empeoran más que el umbral respecto a la línea base.
+    
+    Args:
+        resultados (dict): Medidas actuales por tamaño y operación.
+        linea_base (dict): Medidas de referencia, con la misma estructura.
+        umbral (float): Empeoramiento relativo admitido (0.25 = 25 %).
+    
+    Returns:
+        list: Descripción de cada regresión encontrada.
+    """
+    regresiones = []
+    
+    for tamano, medidas in resultados.items():
+        base_tamano = linea_base.get(tamano)
+        if not base_tamano:
+            continue
+        
+        for operacion, valores in medidas.items():
+            base = base_tamano.get(operacion)
+            if not isinstance(valores, dict) or not base:
+                continue
+            
+            for clave, minimo in (("segundos", MINIMO_SEGUNDOS), ("memoria_mb", MINIMO_MEMORIA_MB)):
+                actual, referencia = valores[clave], base[clave]
+                if max(actual, referencia) < minimo:
+                    continue
+                if actual > referencia * (1 + umbral):
+                    regresiones.append(
+                        f"{operacion} con {tamano} productos: {clave} {actual:.4f} "
+                        f"frente a {referencia:.4f} (+{(actual / referencia - 1) * 100:.0f}%)"
+                    )
+    
+    return regresiones
+
+
+def main():
+    """
+    Ejecuta las mediciones, las muestra y las compara con la línea base.
+    
+    Returns:
+        int: 0 si no hay regresiones, 1 si las hay.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS_POR_DEFECTO,
+                        help="Tamaños de catálogo a medir")
+    parser.add_argument("--repeticiones", type=int, default=5,
+                        help="Repeticiones por medida de tiempo")
+    parser.add_argument("--umbral", type=float, default=0.25,
+                        help="Empeoramiento relativo admitido antes de fallar (0.25 = 25%%)")
+    parser.add_argument("--linea-base", default=RUTA_LINEA_BASE,
+                        help="Archivo JSON de la línea base")
+    parser.add_argument("--guardar-linea-base", action="store_true",
+                        help="Guardar estas medidas como nueva línea base en lugar de comparar")
+    args = parser.parse_args()
+    
+    resultados = {}
+    
+    print(f"{'TAMAÑO':>9} {'OPERACIÓN':<17} {'SEGUNDOS':>10} {'MEMORIA MB':>11}")
+    print("-" * 50)
+    
+    for cantidad in args.tamanos:
+        medidas = medir_tamano(cantidad, args.repeticiones)
+        resultados[str(cantidad)] = medidas
+        
+        for operacion, valores in medidas.items():
+            if isinstance(valores, dict):
+                print(f"{cantidad:>9} {operacion:<17} {valores['segundos']:>10.4f} {valores['memoria_mb']:>11.1f}")
+        print(f"{cantidad:>9} {'(archivo)':<17} {'':>10} {medidas['archivo_mb']:>11.1f}")
+    
+    if args.guardar_linea_base:
+        with open(args.linea_base, 'w', encoding='utf-8') as archivo:
+            json.dump({
+                "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "commit": commit_actual(),
+                "python": platform.python_version(),
+                "maquina": platform.platform(),
+                "resultados": resultados
+            }, archivo, indent=2)
+        print(f"\nLínea base guardada en {args.linea_base}")
+        return 0
+    
+    if not os.path.exists(args.linea_base):
+        print(f"\nNo hay línea base en {args.linea_base}; créala con --guardar-linea-base")
+        return 0
+    
+    with open(args.linea_base, 'r', encoding='utf-8') as archivo:
+        linea_base = json.load(archivo)
+    
+    regresiones = comparar(resultados, linea_base["resultados"], args.umbral)
+    
+    if regresiones:
+        print(f"\nRegresiones respecto a la línea base ({linea_base.get('commit')}):")
+        for regresion in regresiones:
+            print(f"  {regresion}")
+        return 1
+    
+    print(f"\nSin regresiones respecto a la línea base ({linea_base.get('commit')}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+"""
+Generador de carga: N clientes concurrentes contra un servidor con una mezcla
+configurable de operaciones.
+
+Inicia un servidor en un proceso aparte sobre un archivo temporal con un
+catálogo de prueba (o usa uno ya en marcha con --uri), lanza los clientes a
+la vez y muestra el rendimiento, los percentiles de latencia y la tasa de
+errores de cada operación. Con --salida guarda los resultados en JSON,
+anotados con el commit, y con --comparar los compara con otra ejecución.
+
+Uso:
+    python -m benchmarks.carga --productos 10000 --trabajadores 8 --duracion 10
+    python -m benchmarks.carga --mezcla get=50,sell=50 --salida actual.json --comparar base.json
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import concurrent.futures
+import multiprocessing
+from collections import Counter
+from benchmarks.comun import (
+    servidor_en_proceso, conectar_cliente, resumir_latencias, commit_actual
+)
+
+# Operaciones que puede incluir la mezcla
+OPERACIONES = ("list", "get", "sell", "add", "modify")
+MEZCLA_POR_DEFECTO = "get=60,sell=25,list=5,add=5,modify=5"
+
+# Categorías del catálogo de prueba (las de sembrar_catalogo)
+CATEGORIAS = 20
+
+
+def leer_mezcla(texto):
+    """
+    Interpreta una mezcla de operaciones del tipo "get=60,sell=40".
+    
+    Args:
+        texto (str): Pares operación=peso separados por comas.
+    
+    Returns:
+        dict: Peso de cada operación.
+    """
+    mezcla = {}
+    
+    for parte in texto.split(","):
+        operacion, _, peso = parte.partition("=")
+        operacion = operacion.strip()
+        
+        if operacion not in OPERACIONES:
+            raise argparse.ArgumentTypeError(f"Operación desconocida: {operacion}")
+        try:
+            mezcla[operacion] = float(peso)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Peso no válido para {operacion}: {peso}")
+    
+    if not any(peso > 0 for peso in mezcla.values()):
+        raise argparse.ArgumentTypeError("La mezcla no tiene ninguna operación con peso")
+    
+    return mezcla
+
+
+def ejecutar_trabajador(uri, numero, parametros, comienzo):
+    """
+    Ejecuta las operaciones de un cliente de la prueba.
+    
+    Args:
+        uri (str): URI del servidor.
+        numero (int): Número del trabajador (de 0 a trabajadores - 1).
+        parametros (dict): Mezcla, duración, operaciones, productos,
+            trabajadores, semilla y uso de caché de la prueba.
+        comienzo (float): Instante (time.time) en que empiezan todos.
+    
+    Returns:
+        dict: Duraciones, errores y excepciones por operación, mensajes de
+              error y segundos transcurridos.
+    """
+    aleatorio = random.Random(parametros["semilla"] * 1000003 + numero)
+    productos = parametros["productos"]
+    nombres = list(parametros["mezcla"])
+    pesos = list(parametros["mezcla"].values())
+    
+    resultados = {nombre: {"tiempos": [], "errores": 0, "excepciones": 0} for nombre in nombres}
+    mensajes = Counter()
+    
+    try:
+        cliente = conectar_cliente(uri, usar_cache=parametros["cache"])
+    except RuntimeError as e:
+        return {"resultados": resultados, "mensajes": {str(e): 1}, "segundos": 0.0, "conectado": False}
+    
+    # IDs nuevos de este trabajador: no se solapan con el catálogo ni con
+    # los de los demás trabajadores
+    siguiente_id = productos + 1 + numero
+    
+    def llamada(operacion):
+        nonlocal siguiente_id
+        
+        if operacion == "get":
+            return cliente.obtener_producto(aleatorio.randint(1, productos))
+        if operacion == "sell":
+            return cliente.vender_producto(aleatorio.randint(1, productos), 1)
+        if operacion == "list":
+            return cliente.listar_productos(f"Categoria {aleatorio.randrange(CATEGORIAS)}")
+        if operacion == "modify":
+            return cliente.modificar_producto(
+                aleatorio.randint(1, productos), {"precio": round(aleatorio.uniform(1, 500), 2)}
+            )
+        
+        id_producto = siguiente_id
+        siguiente_id += parametros["trabajadores"]
+        return cliente.agregar_producto(
+            id_producto, f"Producto {id_producto}", round(aleatorio.uniform(1, 500), 2),
+            aleatorio.randint(0, 1000), f"Categoria {aleatorio.randrange(CATEGORIAS)}"
+        )
+    
+    time.sleep(max(0.0, comienzo - time.time()))
+    
+    inicio = time.perf_counter()
+    fin = inicio + parametros["duracion"]
+    hechas = 0
+    
+    while True:
+        if parametros["operaciones"]:
+            if hechas >= parametros["operaciones"]:
+                break
+        elif time.perf_counter() >= fin:
+            break
+        
+        operacion = aleatorio.choices(nombres, pesos)[0]
+        datos = resultados[operacion]
+        
+        antes = time.perf_counter()
+        try:
+            resultado = llamada(operacion)
+            if not resultado.get("exito"):
+                datos["errores"] += 1
+                mensajes[f"{operacion}: {resultado.get('mensaje')}"] += 1
+        except Exception as e:
+            datos["excepciones"] += 1
+            mensajes[f"{operacion}: {type(e).__name__}: {e}"] += 1
+        datos["tiempos"].append(time.perf_counter() - antes)
+        hechas += 1
+    
+    segundos = time.perf_counter() - inicio
+    cliente.cerrar()
+    
+    return {"resultados": resultados, "mensajes": dict(mensajes), "segundos": segundos, "conectado": True}
+
+
+def resumir(tiempos, errores, excepciones, segundos):
+    """
+    Resume las llamadas de una operación (o de todas).
+    
+    Args:
+        tiempos (list): Duración de cada llamada en segundos.
+        errores (int): Llamadas que devolvieron "exito" falso.
+        excepciones (int): Llamadas que lanzaron una excepción.
+        segundos (float): Duración de la prueba.
+    
+    Returns:
+        dict: Llamadas, llamadas por segundo, errores, tasa de error y
+              percentiles de latencia.
+    """
+    llamadas = len(tiempos)
+    return {
+        "llamadas": llamadas,
+        "por_segundo": llamadas / segundos if segundos else 0.0,
+        "errores": errores,
+        "excepciones": excepciones,
+        "tasa_error": (errores + excepciones) / llamadas if llamadas else 0.0,
+        "latencia": resumir_latencias(tiempos)
+    }
+
+
+def ejecutar_prueba(uri, parametros):
+    """
+    Lanza todos los trabajadores y agrega sus resultados.
+    
+    Args:
+        uri (str): URI del servidor.
+        parametros (dict): Parámetros de la prueba.
+    
+    Returns:
+        dict: Resumen total y por operación, y mensajes de error más
+              frecuentes.
+    """
+    if parametros["procesos"]:
+        ejecutor = concurrent.futures.ProcessPoolExecutor(
+            parametros["trabajadores"], mp_context=multiprocessing.get_context("spawn")
+        )
+        margen = 5.0
+    else:
+        ejecutor = concurrent.futures.ThreadPoolExecutor(parametros["trabajadores"])
+        margen = 1.0
+    
+    # Todos los trabajadores empiezan a la vez, ya conectados
+    comienzo = time.time() + margen
+    
+    with ejecutor:
+        futuros = [
+            ejecutor.submit(ejecutar_trabajador, uri, numero, parametros, comienzo)
+            for numero in range(parametros["trabajadores"])
+        ]
+        trabajadores = [futuro.result() for futuro in futuros]
+    
+    segundos = max(trabajador["segundos"] for trabajador in trabajadores)
+    mensajes = Counter()
+    operaciones = {}
+    todos = []
+    errores_total = 0
+    excepciones_total = 0
+    
+    for operacion in parametros["mezcla"]:
+        tiempos = []
+        errores = 0
+        excepciones = 0
+        
+        for trabajador in trabajadores:
+            datos = trabajador["resultados"][operacion]
+            tiempos.extend(datos["tiempos"])
+            errores += datos["errores"]
+            excepciones += datos["excepciones"]
+        
+        operaciones[operacion] = resumir(tiempos, errores, excepciones, segundos)
+        todos.extend(tiempos)
+        errores_total += errores
+        excepciones_total += excepciones
+    
+    for trabajador in trabajadores:
+        mensajes.update(trabajador["mensajes"])
+    
+    return {
+        "segundos": segundos,
+        "trabajadores_conectados": sum(trabajador["conectado"] for trabajador in trabajadores),
+        "total": resumir(todos, errores_total, excepciones_total, segundos),
+        "operaciones": operaciones,
+        "mensajes": dict(mensajes.most_common(10))
+    }
+
+
+def imprimir(resultado, anterior=None):
+    """
+    Muestra los resultados en una tabla, con la variación respecto a una
+    ejecución anterior si se indica.
+    """
+    def variacion(actual, previo):
+        if not previo:
+            return ""
+        return f" ({(actual - previo) / previo * 100:+.0f}%)"
+    
+    print(f"{'OPERACIÓN':<10} {'LLAMADAS':>9} {'OPS/S':>16} {'P50 ms':>8} {'P95 ms':>8} "
+          f"{'P99 ms':>18} {'ERRORES':>8}")
+    print("-" * 83)
+    
+    filas = list(resultado["operaciones"].items()) + [("total", resultado["total"])]
+    for nombre, datos in filas:
+        previo = None
+        if anterior:
+            previo = anterior["total"] if nombre == "total" else anterior["operaciones"].get(nombre)
+        
+        latencia = datos["latencia"]
+        por_segundo = f"{datos['por_segundo']:.0f}" + variacion(
+            datos["por_segundo"], previo and previo["por_segundo"]
+        )
+        p99 = f"{latencia['p99_ms']:.2f}" + variacion(
+            latencia["p99_ms"], previo and previo["latencia"]["p99_ms"]
+        )
+        print(f"{nombre:<10} {datos['llamadas']:>9} {por_segundo:>16} {latencia['p50_ms']:>8.2f} "
+              f"{latencia['p95_ms']:>8.2f} {p99:>18} {datos['tasa_error'] * 100:>7.1f}%")
+    
+    if resultado["mensajes"]:
+        print("\nErrores más frecuentes:")
+        for mensaje, cuenta in resultado["mensajes"].items():
+            print(f"  {cuenta:>6}  {mensaje}")
+
+
+def main():
+    """
+    Ejecuta la prueba de carga, muestra los resultados y, si se pide, los
+    guarda en JSON.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--uri", help="Servidor ya en marcha (por defecto, uno temporal)")
+    parser.add_argument("--productos", type=int, default=10000,
+                        help="Tamaño del catálogo de prueba (con --uri, IDs existentes de 1 a N)")
+    parser.add_argument("--trabajadores", type=int, default=8, help="Clientes concurrentes")
+    parser.add_argument("--duracion", type=float, default=10.0,
+                        help="Segundos de prueba por trabajador")
+    parser.add_argument("--operaciones", type=int, default=0,
+                        help="Operaciones por trabajador (sustituye a --duracion)")
+    parser.add_argument("--mezcla", type=leer_mezcla, default=MEZCLA_POR_DEFECTO,
+                        help=f"Pesos de las operaciones (por defecto, {MEZCLA_POR_DEFECTO})")
+    parser.add_argument("--procesos", action="store_true",
+                        help="Un proceso por trabajador en lugar de un hilo")
+    parser.add_argument("--cache", action="store_true", help="Usar la caché de productos del cliente")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="Archivo JSON de una ejecución anterior")
+    args = parser.parse_args()
+    
+    mezcla = args.mezcla if isinstance(args.mezcla, dict) else leer_mezcla(args.mezcla)
+    parametros = {
+        "productos": args.productos,
+        "trabajadores": args.trabajadores,
+        "duracion": args.duracion,
+        "operaciones": args.operaciones,
+        "mezcla": mezcla,
+        "procesos": args.procesos,
+        "cache": args.cache,
+        "semilla": args.semilla
+    }
+    
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as archivo:
+            anterior = json.load(archivo)
+    
+    if args.uri:
+        resultado = ejecutar_prueba(args.uri, parametros)
+    else:
+        with servidor_en_proceso(args.productos) as uri:
+            resultado = ejecutar_prueba(uri, parametros)
+    
+    resultado = dict(
+        {"fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit_actual(), "parametros": parametros},
+        **resultado
+    )
+    
+    imprimir(resultado, anterior)
+    
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+        print(f"\nResultados guardados en {args.salida}")
+    
+    return 1 if resultado["trabajadores_conectados"] < args.trabajadores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Utilidades compartidas por los benchmarks: servidor temporal, catálogo de
+prueba y medición de tiempos.
+"""
+import os
+import time
+import random
+import subprocess
+import multiprocessing
+import tempfile
+import threading
+import contextlib
+import statistics
+import Pyro4
+from servidor.servidor import ServidorInventario
+from servidor.opciones import leer_opciones, aplicar_opciones
+from servidor.inventario import Inventario
+from servidor.producto import Producto
+from cliente.cliente import ClienteInventario
+from common.constantes import NOMBRE_SERVIDOR
+
+
+def configurar_pyro():
+    """
+    Aplica la misma configuración de Pyro que usan el cliente y el servidor.
+    """
+    Pyro4.config.SERIALIZER = "pickle"
+    Pyro4.config.SERIALIZERS_ACCEPTED.add("pickle")
+    Pyro4.config.REQUIRE_EXPOSE = False
+
+
+def crear_inventario(ruta_archivo, cantidad, categorias=20, semilla=0):
+    """
+    Crea en memoria un inventario de prueba, sin guardarlo.
+    
+    Args:
+        ruta_archivo (str): Archivo de persistencia del inventario.
+        cantidad (int): Número de productos.
+        categorias (int): Número de categorías distintas.
+        semilla (int): Semilla para que el catálogo sea reproducible.
+    
+    Returns:
+        Inventario: Inventario con los productos.
+    """
+    aleatorio = random.Random(semilla)
+    inventario = Inventario(ruta_archivo)
+    
+    for id_producto in range(1, cantidad + 1):
+        inventario.agregar_producto(Producto(
+            id_producto,
+            f"Producto {id_producto}",
+            round(aleatorio.uniform(1, 500), 2),
+            aleatorio.randint(0, 1000),
+            f"Categoria {aleatorio.randrange(categorias)}"
+        ))
+    
+    return inventario
+
+
+def sembrar_catalogo(ruta_archivo, cantidad, categorias=20, semilla=0):
+    """
+    Escribe un catálogo de prueba en el formato JSON del proyecto.
+    
+    Args:
+        ruta_archivo (str): Archivo de inventario a crear.
+        cantidad (int): Número de productos.
+        categorias (int): Número de categorías distintas.
+        semilla (int): Semilla para que el catálogo sea reproducible.
+    """
+    crear_inventario(ruta_archivo, cantidad, categorias, semilla).guardar_en_archivo()
+
+
+@contextlib.contextmanager
+def servidor_temporal(productos=0, opciones=None):
+    """
+    Inicia un ServidorInventario sobre un archivo temporal, atendido por un
+    daemon de Pyro en un hilo en segundo plano.
+    
+    Args:
+        productos (int): Tamaño del catálogo de prueba inicial.
+        opciones (list, optional): Opciones de ejecución del servidor, como
+            en su línea de comandos (por ejemplo ["--tipo", "multiplex"]).
+    
+    Yields:
+        str: URI del servidor.
+    """
+    configurar_pyro()
+    if opciones is not None:
+        aplicar_opciones(leer_opciones(opciones))
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_archivo = os.path.join(directorio, "inventario.json")
+        if productos:
+            sembrar_catalogo(ruta_archivo, productos)
+        
+        daemon = Pyro4.Daemon(host="localhost")
+        uri = daemon.register(ServidorInventario(ruta_archivo), objectId=NOMBRE_SERVIDOR)
+        
+        hilo = threading.Thread(target=daemon.requestLoop, daemon=True)
+        hilo.start()
+        
+        try:
+            yield str(uri)
+        finally:
+            daemon.shutdown()
+            hilo.join()
+
+
+def _ejecutar_servidor(productos, opciones, cola, parar):
+    """
+    Cuerpo del proceso de servidor_en_proceso.
+    """
+    with servidor_temporal(productos, opciones) as uri:
+        cola.put(uri)
+        parar.wait()
+
+
+@contextlib.contextmanager
+def servidor_en_proceso(productos=0, opciones=None):
+    """
+    Como servidor_temporal, pero en un proceso aparte, para que el servidor
+    no compita por el GIL con los clientes que lo miden.
+    
+    Args:
+        productos (int): Tamaño del catálogo de prueba inicial.
+        opciones (list, optional): Opciones de ejecución del servidor.
+    
+    Yields:
+        str: URI del servidor.
+    """
+    contexto = multiprocessing.get_context("spawn")
+    cola = contexto.Queue()
+    parar = contexto.Event()
+    
+    proceso = contexto.Process(target=_ejecutar_servidor, args=(productos, opciones, cola, parar), daemon=True)
+    proceso.start()
+    
+    try:
+        yield cola.get(timeout=600)
+    finally:
+        parar.set()
+        proceso.join(timeout=30)
+        if proceso.is_alive():
+            proceso.terminate()
+
+
+def conectar_cliente(uri, usar_cache=True):
+    """
+    Crea un ClienteInventario conectado a la URI indicada.
+    
+    Args:
+        uri (str): URI del servidor.
+        usar_cache (bool): Si el cliente usa su caché de productos.
+    
+    Returns:
+        ClienteInventario: Cliente conectado.
+    """
+    cliente = ClienteInventario(usar_cache=usar_cache)
+    if not cliente.conectar_a(uri):
+        raise RuntimeError(f"No se pudo conectar con {uri}")
+    return cliente
+
+
+def medir(funcion, repeticiones):
+    """
+    Ejecuta una función varias veces y resume sus tiempos.
+    
+    Args:
+        funcion (callable): Función a medir (sin argumentos).
+        repeticiones (int): Número de ejecuciones.
+    
+    Returns:
+        dict: Mediana, mínimo y máximo en segundos.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    
+    return {
+        "mediana": statistics.median(tiempos),
+        "minimo": min(tiempos),
+        "maximo": max(tiempos)
+    }
+
+
+def resumir_latencias(tiempos):
+    """
+    Resume una lista de duraciones en percentiles.
+    
+    Args:
+        tiempos (list): Duraciones en segundos.
+    
+    Returns:
+        dict: Media, p50, p90, p95, p99 y máximo en milisegundos.
+    """
+    if not tiempos:
+        return {"media_ms": 0.0, "p50_ms": 0.0, "p90_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    
+    ordenados = sorted(tiempos)
+    
+    def percentil(p):
+        return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))] * 1000
+    
+    return {
+        "media_ms": statistics.fmean(ordenados) * 1000,
+        "p50_ms": percentil(50),
+        "p90_ms": percentil(90),
+        "p95_ms": percentil(95),
+        "p99_ms": percentil(99),
+        "max_ms": ordenados[-1] * 1000
+    }
+
+
+def commit_actual():
+    """
+    Devuelve el commit de git del proyecto, para anotar los resultados.
+    
+    Returns:
+        str: Hash abreviado del commit, o None si no se puede obtener.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
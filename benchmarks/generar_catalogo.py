@@ -0,0 +1,257 @@
+"""
+Generador de catálogos sintéticos para pruebas de escala.
+
+Escribe inventarios en el formato JSON del proyecto (el que lee
+Inventario.cargar_desde_archivo) o en los formatos de exportación (JSON por
+línea o CSV). Los productos se generan y escriben uno a uno, así que la
+memoria no depende del tamaño del catálogo, y con la misma semilla y
+parámetros el archivo generado es siempre idéntico.
+
+Las distribuciones de precio y stock se indican como "tipo:parámetros":
+    uniforme:MIN:MAX    lognormal:MU:SIGMA    normal:MEDIA:DESVIACION
+    exponencial:MEDIA   fijo:VALOR
+
+Uso:
+    python -m benchmarks.generar_catalogo catalogo.json --productos 10000000
+    python -m benchmarks.generar_catalogo catalogo.csv --formato csv --categorias 500 \\
+        --distribucion-categorias zipf:1.2 --precio lognormal:3:1 --stock exponencial:40
+"""
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import itertools
+from common.exportacion import EscritorProductos
+
+FORMATOS = ("json", "jsonl", "csv")
+
+# Palabras con las que se componen los nombres de los productos
+PALABRAS = (
+    "mesa", "silla", "lampara", "cable", "teclado", "raton", "monitor", "cargador",
+    "funda", "botella", "taza", "cuaderno", "boligrafo", "mochila", "auricular",
+    "altavoz", "camara", "bateria", "soporte", "adaptador", "estuche", "reloj",
+    "toalla", "cojin", "manta", "sarten", "olla", "cuchillo", "tijera", "martillo",
+    "grande", "pequeno", "negro", "blanco", "rojo", "azul", "verde", "metalico",
+    "plegable", "inalambrico", "portatil", "clasico", "premium", "basico", "doble",
+    "ligero", "reforzado", "compacto", "ecologico", "digital"
+)
+
+
+def leer_distribucion(texto):
+    """
+    Interpreta una distribución del tipo "uniforme:1:500".
+    
+    Args:
+        texto (str): Tipo y parámetros separados por dos puntos.
+    
+    Returns:
+        tuple: (tipo, parámetros).
+    """
+    tipo, *parametros = texto.split(":")
+    esperados = {"uniforme": 2, "lognormal": 2, "normal": 2, "exponencial": 1, "fijo": 1}
+    
+    if tipo not in esperados:
+        raise argparse.ArgumentTypeError(f"Distribución desconocida: {tipo}")
+    if len(parametros) != esperados[tipo]:
+        raise argparse.ArgumentTypeError(f"{tipo} necesita {esperados[tipo]} parámetro(s)")
+    try:
+        return tipo, tuple(float(parametro) for parametro in parametros)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Parámetros no válidos: {texto}")
+
+
+def leer_distribucion_categorias(texto):
+    """
+    Interpreta la distribución de categorías: "uniforme" o "zipf:S".
+    
+    Args:
+        texto (str): Distribución.
+    
+    Returns:
+        float: Exponente de Zipf (0 para la uniforme).
+    """
+    if texto == "uniforme":
+        return 0.0
+    
+    tipo, _, exponente = texto.partition(":")
+    try:
+        if tipo == "zipf":
+            return float(exponente)
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(f"Distribución de categorías no válida: {texto}")
+
+
+def muestrear(aleatorio, distribucion):
+    """
+    Toma un valor no negativo de una distribución.
+    
+    Args:
+        aleatorio (random.Random): Generador de números aleatorios.
+        distribucion (tuple): (tipo, parámetros) de leer_distribucion.
+    
+    Returns:
+        float: Valor generado.
+    """
+    tipo, parametros = distribucion
+    
+    if tipo == "uniforme":
+        valor = aleatorio.uniform(*parametros)
+    elif tipo == "lognormal":
+        valor = aleatorio.lognormvariate(*parametros)
+    elif tipo == "normal":
+        valor = aleatorio.gauss(*parametros)
+    elif tipo == "exponencial":
+        valor = aleatorio.expovariate(1 / parametros[0])
+    else:
+        valor = parametros[0]
+    
+    return max(0.0, valor)
+
+
+def generar_nombre(aleatorio, longitud_min, longitud_max):
+    """
+    Compone un nombre de producto con palabras al azar.
+    
+    Args:
+        aleatorio (random.Random): Generador de números aleatorios.
+        longitud_min (int): Longitud mínima en caracteres.
+        longitud_max (int): Longitud máxima en caracteres.
+    
+    Returns:
+        str: Nombre generado.
+    """
+    longitud = aleatorio.randint(longitud_min, longitud_max)
+    nombre = aleatorio.choice(PALABRAS).capitalize()
+    
+    while len(nombre) < longitud:
+        nombre += " " + aleatorio.choice(PALABRAS)
+    
+    return nombre[:longitud].rstrip()
+
+
+def generar_productos(cantidad, semilla=0, categorias=20, exponente_zipf=0.0,
+                      nombre_min=10, nombre_max=40, precio=("uniforme", (1.0, 500.0)),
+                      stock=("uniforme", (0.0, 1000.0)), id_inicial=1):
+    """
+    Genera productos sintéticos de forma determinista.
+    
+    Args:
+        cantidad (int): Número de productos.
+        semilla (int): Semilla del generador.
+        categorias (int): Número de categorías distintas.
+        exponente_zipf (float): Sesgo de la distribución de categorías (0
+            para uniforme; con S > 0 la categoría k tiene peso 1 / k^S).
+        nombre_min (int): Longitud mínima de los nombres.
+        nombre_max (int): Longitud máxima de los nombres.
+        precio (tuple): Distribución de los precios.
+        stock (tuple): Distribución del stock.
+        id_inicial (int): ID del primer producto; los demás son consecutivos.
+    
+    Yields:
+        dict: Datos de cada producto.
+    """
+    aleatorio = random.Random(semilla)
+    nombres_categorias = [f"Categoria {indice}" for indice in range(categorias)]
+    acumulados = list(itertools.accumulate(
+        1 / math.pow(indice, exponente_zipf) for indice in range(1, categorias + 1)
+    ))
+    
+    for id_producto in range(id_inicial, id_inicial + cantidad):
+        yield {
+            "id": id_producto,
+            "nombre": generar_nombre(aleatorio, nombre_min, nombre_max),
+            "precio": round(max(0.01, muestrear(aleatorio, precio)), 2),
+            "stock": int(round(muestrear(aleatorio, stock))),
+            "categoria": aleatorio.choices(nombres_categorias, cum_weights=acumulados)[0]
+        }
+
+
+def escribir_inventario_json(archivo, productos):
+    """
+    Escribe productos en el formato del archivo de inventario, el mismo que
+    produce Inventario.guardar_en_archivo, sin tenerlos todos en memoria.
+    
+    Args:
+        archivo: Archivo de texto abierto para escritura.
+        productos (iterable): Diccionarios de productos.
+    
+    Returns:
+        int: Número de productos escritos.
+    """
+    total = 0
+    archivo.write("{")
+    
+    for producto in productos:
+        cuerpo = json.dumps(producto, indent=4, ensure_ascii=False).replace("\n", "\n    ")
+        archivo.write(f'{"," if total else ""}\n    "{producto["id"]}": {cuerpo}')
+        total += 1
+    
+    archivo.write("\n}" if total else "}")
+    return total
+
+
+def con_progreso(productos, cantidad, cada=1000000):
+    """
+    Recorre los productos informando del avance en la salida de errores.
+    """
+    inicio = time.perf_counter()
+    
+    for numero, producto in enumerate(productos, 1):
+        yield producto
+        if numero % cada == 0:
+            segundos = time.perf_counter() - inicio
+            print(f"{numero}/{cantidad} productos ({numero / segundos:.0f}/s)", file=sys.stderr)
+
+
+def main():
+    """
+    Genera un catálogo con los parámetros de la línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("salida", help="Archivo de destino (\"-\" para la salida estándar)")
+    parser.add_argument("--productos", type=int, default=10000)
+    parser.add_argument("--formato", choices=FORMATOS, default="json",
+                        help="json (archivo de inventario), jsonl o csv")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--categorias", type=int, default=20, help="Número de categorías")
+    parser.add_argument("--distribucion-categorias", type=leer_distribucion_categorias,
+                        default="uniforme", help="uniforme o zipf:S (sesgada)")
+    parser.add_argument("--nombre-min", type=int, default=10, help="Longitud mínima de los nombres")
+    parser.add_argument("--nombre-max", type=int, default=40, help="Longitud máxima de los nombres")
+    parser.add_argument("--precio", type=leer_distribucion, default="uniforme:1:500")
+    parser.add_argument("--stock", type=leer_distribucion, default="uniforme:0:1000")
+    parser.add_argument("--id-inicial", type=int, default=1)
+    args = parser.parse_args()
+    
+    if args.nombre_min < 1 or args.nombre_max < args.nombre_min:
+        parser.error("Longitudes de nombre no válidas")
+    
+    productos = generar_productos(
+        args.productos, args.semilla, args.categorias, args.distribucion_categorias,
+        args.nombre_min, args.nombre_max, args.precio, args.stock, args.id_inicial
+    )
+    productos = con_progreso(productos, args.productos)
+    
+    archivo = sys.stdout if args.salida == "-" else open(args.salida, 'w', encoding='utf-8', newline='')
+    inicio = time.perf_counter()
+    
+    try:
+        if args.formato == "json":
+            total = escribir_inventario_json(archivo, productos)
+        else:
+            escritor = EscritorProductos(archivo, args.formato)
+            escritor.escribir_todos(productos)
+            total = escritor.total
+    finally:
+        if archivo is not sys.stdout:
+            archivo.close()
+    
+    print(f"{total} productos generados en {time.perf_counter() - inicio:.1f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Matriz de rendimiento del servidor: la prueba de carga de benchmarks.carga
+con cada tipo de servidor de Pyro y cada número de clientes concurrentes.
+
+Cada configuración es "thread:HILOS" (pool de hilos, con HILOS conexiones
+simultáneas como máximo) o "multiplex" (un solo hilo con select); para cada
+una se inicia un servidor nuevo en un proceso aparte. Se muestran el
+rendimiento, los percentiles de latencia, la tasa de errores y los clientes
+que llegaron a conectarse, y con --salida se guardan en JSON.
+
+Uso:
+    python -m benchmarks.matriz_servidor
+    python -m benchmarks.matriz_servidor --configuraciones thread:40 multiplex --trabajadores 4 16 \\
+        --mezcla get=80,sell=20 --duracion 10 --salida matriz.json
+"""
+import sys
+import json
+import time
+import argparse
+from benchmarks.comun import servidor_en_proceso, commit_actual
+from benchmarks.carga import MEZCLA_POR_DEFECTO, leer_mezcla, ejecutar_prueba
+from servidor.opciones import TIPOS_SERVIDOR
+
+CONFIGURACIONES_POR_DEFECTO = ["thread:40", "thread:8", "multiplex"]
+TRABAJADORES_POR_DEFECTO = [1, 8, 32]
+
+
+def leer_configuracion(texto):
+    """
+    Interpreta una configuración del tipo "thread:40" o "multiplex".
+    
+    Args:
+        texto (str): Tipo de servidor y, para "thread", hilos máximos.
+    
+    Returns:
+        list: Opciones de ejecución del servidor para servidor_en_proceso.
+    """
+    tipo, _, hilos = texto.partition(":")
+    
+    if tipo not in TIPOS_SERVIDOR:
+        raise argparse.ArgumentTypeError(f"Tipo de servidor desconocido: {tipo}")
+    if not hilos:
+        return ["--tipo", tipo]
+    if tipo != "thread" or not hilos.isdigit() or int(hilos) < 1:
+        raise argparse.ArgumentTypeError(f"Configuración no válida: {texto}")
+    
+    return ["--tipo", tipo, "--hilos", hilos, "--hilos-min", str(min(4, int(hilos)))]
+
+
+def imprimir_fila(configuracion, trabajadores, resultado):
+    """
+    Muestra una fila de la matriz.
+    """
+    total = resultado["total"]
+    latencia = total["latencia"]
+    print(f"{configuracion:<12} {trabajadores:>8} {resultado['trabajadores_conectados']:>10} "
+          f"{total['por_segundo']:>8.0f} {latencia['p50_ms']:>8.2f} {latencia['p95_ms']:>8.2f} "
+          f"{latencia['p99_ms']:>8.2f} {total['tasa_error'] * 100:>7.1f}%")
+
+
+def main():
+    """
+    Ejecuta la prueba de carga para cada configuración y número de clientes,
+    y muestra la matriz de resultados.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--configuraciones", nargs="+", default=CONFIGURACIONES_POR_DEFECTO,
+                        help="thread:HILOS o multiplex (por defecto, %(default)s)")
+    parser.add_argument("--trabajadores", type=int, nargs="+", default=TRABAJADORES_POR_DEFECTO,
+                        help="Números de clientes concurrentes a probar")
+    parser.add_argument("--productos", type=int, default=10000, help="Tamaño del catálogo de prueba")
+    parser.add_argument("--duracion", type=float, default=5.0, help="Segundos de cada prueba")
+    parser.add_argument("--mezcla", type=leer_mezcla, default=MEZCLA_POR_DEFECTO,
+                        help=f"Pesos de las operaciones (por defecto, {MEZCLA_POR_DEFECTO})")
+    parser.add_argument("--opciones-servidor", default="",
+                        help="Opciones añadidas a todas las configuraciones (p. ej. \"--tcp-nodelay\")")
+    parser.add_argument("--procesos", action="store_true",
+                        help="Un proceso por cliente en lugar de un hilo")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+    
+    configuraciones = {}
+    for texto in args.configuraciones:
+        try:
+            configuraciones[texto] = leer_configuracion(texto) + args.opciones_servidor.split()
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+    
+    mezcla = args.mezcla if isinstance(args.mezcla, dict) else leer_mezcla(args.mezcla)
+    parametros = {
+        "productos": args.productos,
+        "duracion": args.duracion,
+        "operaciones": 0,
+        "mezcla": mezcla,
+        "procesos": args.procesos,
+        "cache": False,
+        "semilla": args.semilla
+    }
+    
+    print(f"{'SERVIDOR':<12} {'CLIENTES':>8} {'CONECTADOS':>10} {'OPS/S':>8} {'P50 ms':>8} "
+          f"{'P95 ms':>8} {'P99 ms':>8} {'ERRORES':>8}")
+    print("-" * 78)
+    
+    matriz = []
+    for nombre, opciones in configuraciones.items():
+        # Un servidor nuevo por configuración, con el catálogo recién creado
+        with servidor_en_proceso(args.productos, opciones) as uri:
+            for trabajadores in args.trabajadores:
+                resultado = ejecutar_prueba(uri, dict(parametros, trabajadores=trabajadores))
+                imprimir_fila(nombre, trabajadores, resultado)
+                matriz.append({
+                    "servidor": nombre,
+                    "opciones": opciones,
+                    "trabajadores": trabajadores,
+                    "trabajadores_conectados": resultado["trabajadores_conectados"],
+                    "total": resultado["total"],
+                    "operaciones": resultado["operaciones"],
+                    "mensajes": resultado["mensajes"]
+                })
+    
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump({
+                "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "commit": commit_actual(),
+                "parametros": parametros,
+                "matriz": matriz
+            }, archivo, ensure_ascii=False, indent=2)
+        print(f"\nResultados guardados en {args.salida}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
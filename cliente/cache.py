@@ -0,0 +1,115 @@
+"""
+Caché local de productos para el cliente de inventario.
+"""
+import time
+import threading
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """
+    Caché de tamaño acotado con expulsión LRU (el menos usado recientemente).
+    
+    Cada entrada guarda los datos del producto, la versión que el servidor
+    indicó para ellos y el instante en que se validaron por última vez.
+    Dentro del tiempo de vida (ttl) la entrada se considera vigente; pasado
+    ese tiempo hay que revalidarla contra el servidor.
+    
+    Es segura entre hilos, así que varios clientes (los clones de un mismo
+    cliente) pueden compartirla.
+    """
+    
+    def __init__(self, max_entradas, ttl):
+        """
+        Inicializa la caché.
+        
+        Args:
+            max_entradas (int): Número máximo de productos guardados.
+            ttl (float): Segundos durante los que una entrada se usa sin
+                revalidar.
+        """
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.revalidaciones = 0
+        self.fallos = 0
+    
+    def obtener(self, clave):
+        """
+        Busca una entrada y la marca como usada recientemente.
+        
+        Args:
+            clave: Clave de la entrada (ID del producto).
+        
+        Returns:
+            tuple: (datos, version, vigente) o None si no está en caché.
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            
+            self._entradas.move_to_end(clave)
+            datos, version, validado = entrada
+            return datos, version, time.monotonic() - validado < self.ttl
+    
+    def guardar(self, clave, datos, version):
+        """
+        Guarda o reemplaza una entrada, expulsando la menos usada si la caché
+        está llena.
+        
+        Args:
+            clave: Clave de la entrada (ID del producto).
+            datos (dict): Datos del producto.
+            version (str): Versión de los datos según el servidor.
+        """
+        with self._lock:
+            self._entradas[clave] = (datos, version, time.monotonic())
+            self._entradas.move_to_end(clave)
+            
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+    
+    def renovar(self, clave):
+        """
+        Marca una entrada como recién validada sin cambiar sus datos.
+        
+        Args:
+            clave: Clave de la entrada (ID del producto).
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                self._entradas[clave] = (entrada[0], entrada[1], time.monotonic())
+    
+    def invalidar(self, clave):
+        """
+        Elimina una entrada de la caché.
+        
+        Args:
+            clave: Clave de la entrada (ID del producto).
+        """
+        with self._lock:
+            self._entradas.pop(clave, None)
+    
+    def anotar(self, contador):
+        """
+        Suma uno a un contador de la caché.
+        
+        Args:
+            contador (str): "aciertos", "revalidaciones" o "fallos".
+        """
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + 1)
+    
+    def limpiar(self):
+        """
+        Vacía la caché.
+        """
+        with self._lock:
+            self._entradas.clear()
+    
+    def __len__(self):
+        return len(self._entradas)
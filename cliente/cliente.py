@@ -1,23 +1,134 @@
 """
 Cliente que se conecta al servidor de inventario usando Pyro.
 """
+import os
 import sys
+import time
+import uuid
+import random
+import threading
 import Pyro4
+from cliente.cache import CacheLRU
+from cliente.cola_ventas import ColaVentas
+from common import trazas
+from common.exportacion import EscritorProductos
 from common.constantes import (
     NOMBRE_SERVIDOR, HOST_SERVIDOR, PUERTO_SERVIDOR,
-    NS_HOST, NS_PORT
+    NS_HOST, NS_PORT, TIMEOUT_CONEXION, TIMEOUT_LLAMADA_LARGA, ANOTACION_CLIENTE,
+    RECONEXION_INTENTOS, RECONEXION_ESPERA_BASE, RECONEXION_ESPERA_MAX,
+    REINTENTOS_LLAMADA, TAMANO_MAX_LOTE, CACHE_MAX_PRODUCTOS, CACHE_TTL,
+    RUTA_COLA_VENTAS, INTERVALO_SINCRONIZACION_VENTAS, TAMANO_PAGINA_EXPORTACION,
+    RUTA_TRAZAS_CLIENTE, REINTENTOS_OCUPADO, SIN_CONEXION_ESPERA,
+    EXPORTACION_INTERVALO_CONSULTA
 )
 
+class ProxyTrazado(Pyro4.Proxy):
+    """
+    Proxy que envía en cada llamada, como anotaciones de Pyro, el
+    identificador del cliente (si lo tiene) y la traza asociada al hilo que
+    la hace (si la hay).
+    """
+    
+    def __init__(self, uri, id_cliente=None):
+        """
+        Crea el proxy.
+        
+        Args:
+            uri (str): URI del objeto remoto.
+            id_cliente (bytes, optional): Identificador del cliente.
+        """
+        super().__init__(uri)
+        # Pyro trata cualquier otro atributo asignado como remoto
+        object.__setattr__(self, "_id_cliente", id_cliente)
+    
+    def _pyroAnnotations(self):
+        anotaciones = super()._pyroAnnotations()
+        datos = trazas.anotacion()
+        
+        if datos is not None or self._id_cliente is not None:
+            anotaciones = dict(anotaciones)
+        if datos is not None:
+            anotaciones[trazas.ANOTACION_TRAZA] = datos
+        if self._id_cliente is not None:
+            anotaciones[ANOTACION_CLIENTE] = self._id_cliente
+        
+        return anotaciones
+
+
 class ClienteInventario:
     """
     Cliente para interactuar con el servidor de inventario.
     """
     
-    def __init__(self):
+    # Métodos remotos cuyo coste crece con el catálogo: usan
+    # TIMEOUT_LLAMADA_LARGA en lugar de TIMEOUT_CONEXION
+    METODOS_LARGOS = (
+        "obtener_productos", "listar_productos", "cambios_desde", "ejecutar_lote",
+        "abrir_exportacion", "leer_exportacion"
+    )
+    
+    def __init__(self, usar_cache=True, cola_ventas=None, cache=None, id_cliente=None):
         """
         Inicializa el cliente e intenta conectar con el servidor.
+        
+        Args:
+            usar_cache (bool): Si se guardan en caché local los productos
+                consultados.
+            cola_ventas (ColaVentas, optional): Cola donde guardar las ventas
+                que no se pueden enviar por falta de conexión.
+            cache (CacheLRU, optional): Caché compartida con otro cliente; si
+                es None y usar_cache es True, se crea una propia.
+            id_cliente (bytes, optional): Identificador con el que el
+                servidor reconoce al cliente; por defecto, uno nuevo.
         """
         self.servidor = None
+        
+        # Identificador enviado en cada llamada: el control de admisión del
+        # servidor limita las llamadas simultáneas por cliente con él
+        self.id_cliente = id_cliente or uuid.uuid4().hex.encode("ascii")
+        
+        # Caché de productos consultados, validada con la versión del servidor
+        if cache is None and usar_cache:
+            cache = CacheLRU(CACHE_MAX_PRODUCTOS, CACHE_TTL)
+        self.cache = cache
+        
+        # Ventas pendientes sin conexión y su sincronización en segundo plano
+        self.cola_ventas = cola_ventas
+        self._detener_sincronizacion = None
+        
+        # Última URI con la que se logró conectar; se reutiliza al reconectar
+        # para no repetir la búsqueda en el Name Server
+        self.uri = None
+        self._lock_reconexion = threading.Lock()
+        
+        # Instante (time.monotonic) hasta el que se da el servidor por caído
+        # tras una reconexión fallida; 0 si no lo está
+        self._sin_conexion_hasta = 0.0
+        
+        # Estadísticas para medir el comportamiento ante caídas del servidor
+        self.estadisticas = {
+            "reconexiones": 0,
+            "reconexiones_fallidas": 0,
+            "llamadas_fallidas": 0,
+            "rechazos_ocupado": 0,
+            "ultima_reconexion_seg": None,
+            "tiempo_total_reconexion_seg": 0.0
+        }
+    
+    def _crear_proxy(self, uri):
+        """
+        Crea un proxy hacia la URI indicada y verifica la conexión.
+        
+        Args:
+            uri (str): URI del objeto remoto.
+        
+        Returns:
+            Pyro4.Proxy: Proxy ya conectado.
+        """
+        proxy = ProxyTrazado(uri, self.id_cliente)
+        proxy._pyroTimeout = TIMEOUT_CONEXION
+        proxy._pyroBind()
+        return proxy
     
     def conectar_con_ns(self):
         """
@@ -33,11 +144,9 @@ class ClienteInventario:
             # Obtener la URI del servidor por su nombre
             uri = ns.lookup(NOMBRE_SERVIDOR)
             
-            # Conectar con el servidor
-            self.servidor = Pyro4.Proxy(uri)
-            
-            # Verificar la conexión
-            self.servidor._pyroBind()
+            # Conectar con el servidor y verificar la conexión
+            self.servidor = self._crear_proxy(uri)
+            self.uri = uri
             
             print(f"Conectado al servidor: {NOMBRE_SERVIDOR}")
             return True
@@ -63,12 +172,9 @@ class ClienteInventario:
             
             print(f"Intentando conexión directa a {uri}...")
             
-            # Conectar con el servidor
-            self.servidor = Pyro4.Proxy(uri)
-            
-            # Verificar la conexión con un timeout más corto
-            self.servidor._pyroTimeout = 5  # 5 segundos de timeout
-            self.servidor._pyroBind()
+            # Conectar con el servidor y verificar la conexión
+            self.servidor = self._crear_proxy(uri)
+            self.uri = uri
             
             print(f"Conectado directamente al servidor: {uri}")
             return True
@@ -92,6 +198,121 @@ class ClienteInventario:
         # Si falla, intentar conexión directa
         return self.conectar_directo()
     
+    def conectar_a(self, uri):
+        """
+        Conecta con el servidor en una URI conocida.
+        
+        Args:
+            uri (str): URI del objeto remoto.
+        
+        Returns:
+            bool: True si la conexión fue exitosa, False en caso contrario.
+        """
+        try:
+            self.servidor = self._crear_proxy(uri)
+            self.uri = uri
+            return True
+        
+        except Exception as e:
+            print(f"Error al conectar con el servidor: {e}")
+            return False
+    
+    def clonar(self):
+        """
+        Crea un nuevo cliente con su propia conexión a la misma URI.
+        
+        Un proxy de Pyro atiende una llamada a la vez; para hacer llamadas
+        concurrentes cada hilo necesita su propio cliente. El clon comparte
+        la caché de productos, de modo que lo que uno invalida deja de
+        servirse también en el otro, y el identificador de cliente, de modo
+        que el servidor cuenta las llamadas de ambos juntas.
+        
+        Returns:
+            ClienteInventario: Cliente conectado o None si falla la conexión.
+        """
+        if self.uri is None:
+            return None
+        
+        cliente = ClienteInventario(
+            usar_cache=self.cache is not None,
+            cola_ventas=self.cola_ventas,
+            cache=self.cache,
+            id_cliente=self.id_cliente
+        )
+        
+        if not cliente.conectar_a(self.uri):
+            return None
+        
+        return cliente
+    
+    def cerrar(self):
+        """
+        Cierra la conexión con el servidor.
+        """
+        self.detener_sincronizacion_ventas()
+        
+        if self.servidor is not None:
+            self.servidor._pyroRelease()
+            self.servidor = None
+    
+    def reconectar(self, proxy_fallido=None):
+        """
+        Vuelve a conectar con la última URI válida usando backoff exponencial
+        con jitter.
+        
+        Si la reconexión falla, durante SIN_CONEXION_ESPERA segundos no se
+        vuelve a intentar (las llamadas fallan enseguida) y después se hace
+        un solo intento, para no bloquear al llamante en cada operación
+        mientras el servidor siga caído.
+        
+        Args:
+            proxy_fallido (Pyro4.Proxy, optional): Proxy cuya conexión se perdió.
+                Si otro hilo ya lo reemplazó, no se vuelve a reconectar.
+        
+        Returns:
+            bool: True si se recuperó la conexión, False en caso contrario.
+        """
+        if self.uri is None:
+            return False
+        
+        with self._lock_reconexion:
+            # Otro hilo pudo haber reconectado mientras esperábamos el lock
+            if proxy_fallido is not None and self.servidor is not proxy_fallido:
+                return True
+            
+            if time.monotonic() < self._sin_conexion_hasta:
+                return False
+            
+            inicio = time.perf_counter()
+            intentos = 1 if self._sin_conexion_hasta else RECONEXION_INTENTOS
+            
+            for intento in range(intentos):
+                try:
+                    proxy = self._crear_proxy(self.uri)
+                except Pyro4.errors.CommunicationError:
+                    # Backoff exponencial con "full jitter"
+                    espera = min(RECONEXION_ESPERA_MAX, RECONEXION_ESPERA_BASE * (2 ** intento))
+                    time.sleep(random.uniform(0, espera))
+                    continue
+                
+                anterior = self.servidor
+                self.servidor = proxy
+                self._sin_conexion_hasta = 0.0
+                if anterior is not None:
+                    anterior._pyroRelease()
+                
+                duracion = time.perf_counter() - inicio
+                self.estadisticas["reconexiones"] += 1
+                self.estadisticas["ultima_reconexion_seg"] = duracion
+                self.estadisticas["tiempo_total_reconexion_seg"] += duracion
+                print(f"Reconectado al servidor en {duracion:.2f} s")
+                return True
+            
+            self.estadisticas["reconexiones_fallidas"] += 1
+            self.estadisticas["tiempo_total_reconexion_seg"] += time.perf_counter() - inicio
+            self._sin_conexion_hasta = time.monotonic() + SIN_CONEXION_ESPERA
+            return False
+    
     def esta_conectado(self):
         """
         Verifica si el cliente está conectado al servidor.
@@ -101,7 +322,197 @@ class ClienteInventario:
         """
         return self.servidor is not None
     
-    def agregar_producto(self, id, nombre, precio, stock, categoria):
+    def obtener_estadisticas(self):
+        """
+        Devuelve las estadísticas de conexión del cliente.
+        
+        Returns:
+            dict: Reconexiones, tiempos de reconexión, llamadas fallidas y
+                  rechazos por servidor ocupado.
+        """
+        estadisticas = dict(self.estadisticas)
+        
+        if self.cache is not None:
+            estadisticas["cache_aciertos"] = self.cache.aciertos
+            estadisticas["cache_revalidaciones"] = self.cache.revalidaciones
+            estadisticas["cache_fallos"] = self.cache.fallos
+        
+        return estadisticas
+    
+    def _actualizar_cache(self, id_producto, resultado):
+        """
+        Actualiza la caché con el producto devuelto por una operación, o
+        descarta la entrada si la respuesta no lo incluye.
+        
+        Args:
+            id_producto (int): ID del producto afectado.
+            resultado (dict): Respuesta del servidor.
+        """
+        if self.cache is None:
+            return
+        
+        if resultado.get("exito") and "producto" in resultado and "version" in resultado:
+            self.cache.guardar(int(id_producto), dict(resultado["producto"]), resultado["version"])
+        else:
+            self.cache.invalidar(int(id_producto))
+    
+    def _llamar(self, metodo, *args, reintentable=False):
+        """
+        Invoca un método remoto recuperando la conexión si se perdió.
+        
+        Si las trazas están activadas, la llamada (con sus reintentos) se
+        anota como un tramo con un identificador de traza nuevo, que viaja
+        al servidor para enlazar allí sus tramos.
+        
+        Args:
+            metodo (str): Nombre del método remoto.
+            *args: Argumentos del método.
+            reintentable (bool): Si la llamada puede repetirse sin riesgo
+                tras reconectar (lecturas u operaciones con identificador
+                de solicitud).
+        
+        Returns:
+            dict: Resultado de la operación.
+        """
+        if not trazas.activas():
+            return self._invocar(metodo, args, reintentable)
+        
+        id_traza = trazas.nuevo_id()
+        trazas.iniciar_contexto(id_traza)
+        inicio = time.perf_counter()
+        trazas.flujo("s", inicio, id_traza)
+        resultado = None
+        
+        try:
+            resultado = self._invocar(metodo, args, reintentable)
+            return resultado
+        finally:
+            trazas.terminar_contexto()
+            trazas.tramo(
+                f"cliente.{metodo}", inicio, time.perf_counter(), id_traza, "cliente",
+                {"exito": isinstance(resultado, dict) and resultado.get("exito")}
+            )
+    
+    def _invocar(self, metodo, args, reintentable):
+        """
+        Hace la llamada remota de _llamar, con sus reintentos.
+        """
+        if not self.esta_conectado():
+            return {"exito": False, "mensaje": "No conectado al servidor", "sin_conexion": True}
+        
+        # Servidor caído hace poco: fallar enseguida en lugar de volver a
+        # esperar el timeout y la reconexión en cada llamada
+        if time.monotonic() < self._sin_conexion_hasta:
+            self.estadisticas["llamadas_fallidas"] += 1
+            return {"exito": False, "mensaje": "Sin conexión con el servidor", "sin_conexion": True}
+        
+        reintentos = REINTENTOS_LLAMADA if reintentable else 0
+        reintentos_ocupado = REINTENTOS_OCUPADO
+        timeout = TIMEOUT_LLAMADA_LARGA if metodo in self.METODOS_LARGOS else TIMEOUT_CONEXION
+        
+        while True:
+            proxy = self.servidor
+            
+            try:
+                proxy._pyroTimeout = timeout
+                resultado = getattr(proxy, metodo)(*args)
+            except Pyro4.errors.TimeoutError as e:
+                # El servidor recibió la llamada y no respondió a tiempo:
+                # puede seguir ejecutándola, así que repetirla solo duplicaría
+                # el trabajo. Pyro cierra la conexión y la abre de nuevo en
+                # la siguiente llamada
+                error = e
+                sin_conexion = True
+                break
+            except Pyro4.errors.CommunicationError as e:
+                error = e
+                sin_conexion = True
+                
+                # Conexión perdida o timeout: reconectar con la URI conocida
+                # y repetir solo si la operación es segura de reintentar
+                if not self.reconectar(proxy) or not reintentos:
+                    break
+                reintentos -= 1
+                continue
+            except Exception as e:
+                error = e
+                sin_conexion = False
+                break
+            
+            # El servidor rechazó la llamada sin ejecutarla, así que puede
+            # repetirse siempre, tras la espera que indica (con jitter)
+            if isinstance(resultado, dict) and resultado.get("ocupado"):
+                self.estadisticas["rechazos_ocupado"] += 1
+                if reintentos_ocupado:
+                    reintentos_ocupado -= 1
+                    time.sleep(resultado.get("reintentar_en", 0) * random.uniform(1, 1.5))
+                    continue
+            
+            return resultado
+        
+        self.estadisticas["llamadas_fallidas"] += 1
+        resultado = {"exito": False, "mensaje": f"Error: {str(error)}"}
+        if sin_conexion:
+            resultado["sin_conexion"] = True
+        return resultado
+    
+    def _llamar_idempotente(self, metodo, *args, id_solicitud=None):
+        """
+        Invoca un método remoto de modificación con un identificador de
+        solicitud, de modo que pueda reintentarse sin aplicarse dos veces.
+        
+        Args:
+            metodo (str): Nombre del método remoto.
+            *args: Argumentos del método.
+            id_solicitud (str, optional): Identificador a usar; si es None se
+                genera uno nuevo.
+        
+        Returns:
+            dict: Resultado de la operación.
+        """
+        if id_solicitud is None:
+            id_solicitud = uuid.uuid4().hex
+        
+        return self._llamar(metodo, *args, id_solicitud, reintentable=True)
+    
+    def _llamar_lote(self, llamadas):
+        """
+        Envía una lista de llamadas en una sola llamada remota a
+        ejecutar_lote, recuperando la conexión si se perdió.
+        
+        Todas las llamadas del lote son seguras de reintentar: las de lectura
+        por naturaleza y las de modificación porque llevan identificador de
+        solicitud. El servidor guarda el inventario una sola vez por lote.
+        
+        Args:
+            llamadas (list): Tuplas (metodo, args).
+        
+        Returns:
+            list: Resultado de cada llamada, en el mismo orden.
+        """
+        resultado = self._llamar("ejecutar_lote", list(llamadas), reintentable=True)
+        
+        if not resultado["exito"]:
+            return [resultado] * len(llamadas)
+        
+        return resultado["resultados"]
+    
+    def lote(self):
+        """
+        Crea un lote de operaciones que se envían juntas al servidor.
+        
+        Ejemplo:
+            with cliente.lote() as lote:
+                lote.agregar_producto(10, "Leche", 21.0, 30, "Lacteos")
+                lote.vender_producto(1, 2)
+            print(lote.resultados)
+        
+        Returns:
+            LoteOperaciones: Lote vacío asociado a este cliente.
+        """
+        return LoteOperaciones(self)
+    
+    def agregar_producto(self, id, nombre, precio, stock, categoria, id_solicitud=None):
         """
         Agrega un nuevo producto al inventario.
         
@@ -111,72 +522,115 @@ class ClienteInventario:
             precio (float): Precio del producto.
             stock (int): Cantidad disponible en inventario.
             categoria (str): Categoría a la que pertenece el producto.
-            
+            id_solicitud (str, optional): Identificador para reintentos
+                seguros. Si es None se genera uno nuevo.
+        
         Returns:
             dict: Resultado de la operación.
         """
-        if not self.esta_conectado():
-            return {"exito": False, "mensaje": "No conectado al servidor"}
-        
-        try:
-            return self.servidor.agregar_producto(id, nombre, precio, stock, categoria)
-        except Exception as e:
-            return {"exito": False, "mensaje": f"Error: {str(e)}"}
+        resultado = self._llamar_idempotente(
+            "agregar_producto", id, nombre, precio, stock, categoria,
+            id_solicitud=id_solicitud
+        )
+        self._actualizar_cache(id, resultado)
+        return resultado
     
-    def modificar_producto(self, id_producto, datos):
+    def modificar_producto(self, id_producto, datos, id_solicitud=None):
         """
         Modifica un producto existente en el inventario.
         
         Args:
             id_producto (int): ID del producto a modificar.
             datos (dict): Datos a actualizar.
-            
+            id_solicitud (str, optional): Identificador para reintentos
+                seguros. Si es None se genera uno nuevo.
+        
         Returns:
             dict: Resultado de la operación.
         """
-        if not self.esta_conectado():
-            return {"exito": False, "mensaje": "No conectado al servidor"}
-        
-        try:
-            return self.servidor.modificar_producto(id_producto, datos)
-        except Exception as e:
-            return {"exito": False, "mensaje": f"Error: {str(e)}"}
+        resultado = self._llamar_idempotente(
+            "modificar_producto", id_producto, datos, id_solicitud=id_solicitud
+        )
+        self._actualizar_cache(id_producto, resultado)
+        return resultado
     
-    def eliminar_producto(self, id_producto):
+    def eliminar_producto(self, id_producto, id_solicitud=None):
         """
         Elimina un producto del inventario.
         
         Args:
             id_producto (int): ID del producto a eliminar.
-            
+            id_solicitud (str, optional): Identificador para reintentos
+                seguros. Si es None se genera uno nuevo.
+        
         Returns:
             dict: Resultado de la operación.
         """
-        if not self.esta_conectado():
-            return {"exito": False, "mensaje": "No conectado al servidor"}
-        
-        try:
-            return self.servidor.eliminar_producto(id_producto)
-        except Exception as e:
-            return {"exito": False, "mensaje": f"Error: {str(e)}"}
+        resultado = self._llamar_idempotente("eliminar_producto", id_producto, id_solicitud=id_solicitud)
+        self._actualizar_cache(id_producto, resultado)
+        return resultado
     
     def obtener_producto(self, id_producto):
         """
         Obtiene la información de un producto por su ID.
         
+        Si el producto está en la caché y se validó hace menos de CACHE_TTL
+        segundos, se devuelve sin consultar al servidor; si no, se pide al
+        servidor indicando la versión conocida para que solo envíe los datos
+        si cambiaron.
+        
         Args:
             id_producto (int): ID del producto a consultar.
-            
+        
         Returns:
             dict: Datos del producto o mensaje de error.
         """
-        if not self.esta_conectado():
-            return {"exito": False, "mensaje": "No conectado al servidor"}
+        if self.cache is None:
+            return self._llamar("obtener_producto", id_producto, reintentable=True)
         
-        try:
-            return self.servidor.obtener_producto(id_producto)
-        except Exception as e:
-            return {"exito": False, "mensaje": f"Error: {str(e)}"}
+        id_producto = int(id_producto)
+        entrada = self.cache.obtener(id_producto)
+        
+        # Entrada vigente: se sirve sin consultar al servidor
+        if entrada is not None and entrada[2]:
+            self.cache.anotar("aciertos")
+            return {"exito": True, "producto": dict(entrada[0]), "version": entrada[1]}
+        
+        # Entrada caducada: pedir el producto solo si cambió su versión
+        version_conocida = entrada[1] if entrada is not None else None
+        resultado = self._llamar(
+            "obtener_producto", id_producto, version_conocida, reintentable=True
+        )
+        
+        if resultado.get("sin_cambios"):
+            self.cache.anotar("revalidaciones")
+            self.cache.renovar(id_producto)
+            return {"exito": True, "producto": dict(entrada[0]), "version": entrada[1]}
+        
+        self.cache.anotar("fallos")
+        self._actualizar_cache(id_producto, resultado)
+        return resultado
+    
+    def obtener_productos(self, ids):
+        """
+        Obtiene la información de varios productos en una sola llamada.
+        
+        Args:
+            ids (list): IDs de los productos a consultar.
+        
+        Returns:
+            dict: Diccionario ID -> datos del producto en "productos" y lista
+                  de IDs inexistentes en "faltantes", o mensaje de error.
+        """
+        resultado = self._llamar("obtener_productos", list(ids), reintentable=True)
+        
+        if self.cache is not None and resultado["exito"]:
+            for id_producto, datos in resultado["productos"].items():
+                self.cache.guardar(id_producto, dict(datos), resultado["versiones"][id_producto])
+            for id_producto in resultado["faltantes"]:
+                self.cache.invalidar(id_producto)
+        
+        return resultado
     
     def listar_productos(self, categoria=None):
         """
@@ -184,43 +638,452 @@ class ClienteInventario:
         
         Args:
             categoria (str, optional): Categoría por la que filtrar.
-            
+        
         Returns:
             dict: Lista de productos o mensaje de error.
         """
-        if not self.esta_conectado():
-            return {"exito": False, "mensaje": "No conectado al servidor"}
+        return self._llamar("listar_productos", categoria, reintentable=True)
+    
+    def listar_categorias(self):
+        """
+        Lista las categorías con su número de productos y su stock total,
+        sin descargar el catálogo.
         
-        try:
-            return self.servidor.listar_productos(categoria)
-        except Exception as e:
-            return {"exito": False, "mensaje": f"Error: {str(e)}"}
+        Returns:
+            dict: Lista de categorías o mensaje de error.
+        """
+        return self._llamar("listar_categorias", reintentable=True)
+    
+    def cambios_desde(self, version_conocida=None):
+        """
+        Obtiene los cambios del catálogo posteriores a una versión.
+        
+        Args:
+            version_conocida (str, optional): Versión del catálogo devuelta
+                por una llamada anterior. Si es None o el servidor se
+                reinició, se recibe el catálogo completo.
+        
+        Returns:
+            dict: Versión actual, indicador "completo", productos y, si no es
+                  completo, IDs eliminados; o mensaje de error.
+        """
+        resultado = self._llamar("cambios_desde", version_conocida, reintentable=True)
+        
+        # Las entradas de la caché de los productos cambiados quedan obsoletas
+        if self.cache is not None and resultado["exito"] and not resultado["completo"]:
+            for p in resultado["productos"]:
+                self.cache.invalidar(p["id"])
+            for id_producto in resultado["eliminados"]:
+                self.cache.invalidar(id_producto)
+        
+        return resultado
     
-    def vender_producto(self, id_producto, cantidad):
+    def vender_producto(self, id_producto, cantidad, id_solicitud=None):
         """
         Registra la venta de un producto, reduciendo su stock.
         
         Args:
             id_producto (int): ID del producto vendido.
             cantidad (int): Cantidad vendida.
+            id_solicitud (str, optional): Identificador para reintentos
+                seguros. Si es None se genera uno nuevo.
+        
+        Returns:
+            dict: Resultado de la operación. Si no hay conexión (o el
+                  servidor sigue ocupado tras los reintentos) y el cliente
+                  tiene cola de ventas, la venta queda guardada en ella y el
+                  resultado lleva "pendiente".
+        """
+        if id_solicitud is None:
+            id_solicitud = uuid.uuid4().hex
+        
+        resultado = self._llamar_idempotente(
+            "vender_producto", id_producto, cantidad, id_solicitud=id_solicitud
+        )
+        self._actualizar_cache(id_producto, resultado)
+        
+        # Sin conexión: guardar la venta para enviarla más tarde con el mismo
+        # identificador, por si el servidor llegó a aplicarla. Una venta
+        # rechazada por servidor ocupado no se aplicó y también se guarda
+        if (resultado.get("sin_conexion") or resultado.get("ocupado")) and self.cola_ventas is not None:
+            self.cola_ventas.encolar(id_producto, cantidad, id_solicitud)
+            motivo = "sin conexión" if resultado.get("sin_conexion") else "con el servidor ocupado"
+            return {
+                "exito": True,
+                "pendiente": True,
+                "id_solicitud": id_solicitud,
+                "mensaje": f"Venta guardada {motivo}. Se enviará al servidor más tarde."
+            }
+        
+        return resultado
+    
+    def exportar(self, archivo, formato="jsonl", tamano_pagina=TAMANO_PAGINA_EXPORTACION):
+        """
+        Exporta el catálogo a un archivo local, en orden de ID, escribiendo
+        página a página sin acumular el catálogo en memoria.
+        
+        Todas las páginas se leen de la misma vista fija del catálogo en el
+        servidor, de modo que la exportación no ve cambios a medias.
+        
+        Args:
+            archivo: Archivo de texto abierto para escritura.
+            formato (str): "jsonl" o "csv".
+            tamano_pagina (int): Productos pedidos por llamada.
+        
+        Returns:
+            dict: Número de productos exportados y versión del catálogo, o
+                  mensaje de error.
+        """
+        abierta = self._llamar("abrir_exportacion", reintentable=True)
+        
+        if not abierta["exito"]:
+            return abierta
+        
+        try:
+            escritor = EscritorProductos(archivo, formato)
+            desde_id = None
+            
+            while True:
+                pagina = self._llamar(
+                    "leer_exportacion", abierta["id_exportacion"], desde_id, tamano_pagina,
+                    reintentable=True
+                )
+                if not pagina["exito"]:
+                    return pagina
+                
+                escritor.escribir_todos(pagina["productos"])
+                desde_id = pagina["siguiente"]
+                if desde_id is None:
+                    break
             
+            return {
+                "exito": True,
+                "mensaje": "Catálogo exportado correctamente",
+                "total": escritor.total,
+                "version": abierta["version"]
+            }
+        finally:
+            self._llamar("cerrar_exportacion", abierta["id_exportacion"], reintentable=True)
+    
+    def exportar_en_servidor(self, nombre_archivo, formato="jsonl", intervalo=EXPORTACION_INTERVALO_CONSULTA):
+        """
+        Pide al servidor que exporte el catálogo a un archivo de su
+        directorio de exportaciones y espera a que termine.
+        
+        El servidor ejecuta la exportación como un trabajo aparte: la
+        llamada que la inicia vuelve enseguida y después se consulta su
+        estado cada cierto tiempo, de modo que ninguna llamada dura lo que
+        la exportación completa.
+        
+        Args:
+            nombre_archivo (str): Nombre del archivo en el servidor.
+            formato (str): "jsonl" o "csv".
+            intervalo (float): Segundos entre consultas del estado.
+        
+        Returns:
+            dict: Ruta en el servidor y número de productos exportados, o
+                  mensaje de error (con "id_trabajo" si la exportación llegó
+                  a iniciarse).
+        """
+        iniciada = self._llamar("exportar_a_archivo", nombre_archivo, formato)
+        
+        if not iniciada["exito"]:
+            return iniciada
+        
+        while True:
+            time.sleep(intervalo)
+            estado = self._llamar("estado_exportacion_archivo", iniciada["id_trabajo"], reintentable=True)
+            
+            if not estado["exito"]:
+                return dict(estado, id_trabajo=iniciada["id_trabajo"])
+            if estado["terminado"]:
+                return estado["resultado"]
+    
+    def ajustar_stock(self, id_producto, cantidad, id_solicitud=None):
+        """
+        Suma (o resta, si es negativa) una cantidad al stock de un producto.
+        
+        Args:
+            id_producto (int): ID del producto.
+            cantidad (int): Cantidad a sumar al stock.
+            id_solicitud (str, optional): Identificador para reintentos
+                seguros. Si es None se genera uno nuevo.
+        
         Returns:
             dict: Resultado de la operación.
         """
-        if not self.esta_conectado():
-            return {"exito": False, "mensaje": "No conectado al servidor"}
+        resultado = self._llamar_idempotente(
+            "ajustar_stock", id_producto, cantidad, id_solicitud=id_solicitud
+        )
+        self._actualizar_cache(id_producto, resultado)
+        return resultado
+    
+    def sincronizar_ventas(self):
+        """
+        Envía al servidor las ventas de la cola en lotes de TAMANO_MAX_LOTE.
+        
+        Las ventas aceptadas y las rechazadas salen de la cola; las
+        rechazadas se registran como conflictos. Si un lote no llega a
+        ejecutarse (sin conexión, servidor ocupado u otro error de la
+        llamada), sus ventas y las restantes quedan pendientes para el
+        siguiente intento.
+        
+        Returns:
+            dict: Número de ventas confirmadas, conflictos (venta y motivo)
+                  y ventas que siguen pendientes (con "mensaje" si el envío
+                  se interrumpió), o mensaje de error.
+        """
+        if self.cola_ventas is None:
+            return {"exito": False, "mensaje": "El cliente no tiene cola de ventas"}
+        
+        if not self.cola_ventas.lock_envio.acquire(blocking=False):
+            return {"exito": False, "mensaje": "Ya hay una sincronización en curso"}
         
         try:
-            return self.servidor.vender_producto(id_producto, cantidad)
-        except Exception as e:
-            return {"exito": False, "mensaje": f"Error: {str(e)}"}
+            confirmadas = 0
+            conflictos = []
+            interrupcion = None
+            entradas = self.cola_ventas.pendientes()
+            
+            for inicio in range(0, len(entradas), TAMANO_MAX_LOTE):
+                parte = entradas[inicio:inicio + TAMANO_MAX_LOTE]
+                lote = self._llamar("ejecutar_lote", [
+                    ("vender_producto", (e["id_producto"], e["cantidad"], e["id_solicitud"]))
+                    for e in parte
+                ], reintentable=True)
+                
+                # El lote no se ejecutó: ninguna de sus ventas es un conflicto
+                if not lote["exito"]:
+                    interrupcion = lote["mensaje"]
+                    break
+                
+                resueltas = []
+                sin_conexion = False
+                
+                for entrada, resultado in zip(parte, lote["resultados"]):
+                    if resultado["exito"]:
+                        confirmadas += 1
+                        resueltas.append(entrada["id_solicitud"])
+                        self._actualizar_cache(entrada["id_producto"], resultado)
+                    elif resultado.get("sin_conexion") or resultado.get("ocupado"):
+                        sin_conexion = True
+                    else:
+                        conflictos.append(self.cola_ventas.registrar_conflicto(entrada, resultado["mensaje"]))
+                        resueltas.append(entrada["id_solicitud"])
+                
+                self.cola_ventas.retirar(resueltas)
+                
+                if sin_conexion:
+                    break
+            
+            resultado = {
+                "exito": True,
+                "confirmadas": confirmadas,
+                "conflictos": conflictos,
+                "pendientes": len(self.cola_ventas)
+            }
+            if interrupcion is not None:
+                resultado["mensaje"] = interrupcion
+            return resultado
+        finally:
+            self.cola_ventas.lock_envio.release()
+    
+    def iniciar_sincronizacion_ventas(self, intervalo=INTERVALO_SINCRONIZACION_VENTAS):
+        """
+        Inicia un hilo que intenta enviar las ventas pendientes cada cierto
+        tiempo, con su propia conexión al servidor.
+        
+        Args:
+            intervalo (float): Segundos entre intentos.
+        """
+        if self.cola_ventas is None or self._detener_sincronizacion is not None:
+            return
+        
+        self._detener_sincronizacion = threading.Event()
+        hilo = threading.Thread(
+            target=self._sincronizar_en_hilo,
+            args=(self._detener_sincronizacion, intervalo)
+        )
+        hilo.daemon = True
+        hilo.start()
+    
+    def detener_sincronizacion_ventas(self):
+        """
+        Detiene el hilo de sincronización de ventas, si está en marcha.
+        """
+        if self._detener_sincronizacion is not None:
+            self._detener_sincronizacion.set()
+            self._detener_sincronizacion = None
+    
+    def _sincronizar_en_hilo(self, detener, intervalo):
+        """
+        Bucle del hilo de sincronización de ventas.
+        
+        Args:
+            detener (threading.Event): Evento que termina el bucle.
+            intervalo (float): Segundos entre intentos.
+        """
+        cliente = None
+        
+        while not detener.wait(intervalo):
+            if not len(self.cola_ventas):
+                continue
+            
+            if cliente is None:
+                cliente = self.clonar()
+                if cliente is None:
+                    continue
+            
+            resultado = cliente.sincronizar_ventas()
+            
+            if resultado["exito"] and (resultado["confirmadas"] or resultado["conflictos"]):
+                print(
+                    f"Ventas sincronizadas: {resultado['confirmadas']}, "
+                    f"conflictos: {len(resultado['conflictos'])}, "
+                    f"pendientes: {resultado['pendientes']}"
+                )
+        
+        if cliente is not None:
+            cliente.cerrar()
+
+
+class LoteOperaciones:
+    """
+    Acumula llamadas a ClienteInventario y las envía en un solo intercambio
+    de red. Los resultados se devuelven en el orden en que se encolaron.
+    
+    Las llamadas viajan en una llamada a ejecutar_lote del servidor, que las
+    aplica en orden y guarda el inventario una sola vez. No se usa
+    Pyro4.batch(): con él cada modificación guardaría el inventario por
+    separado en el servidor.
+    
+    Usado como gestor de contexto, el lote se envía al salir del bloque y los
+    resultados quedan en el atributo resultados.
+    """
+    
+    METODOS_MODIFICACION = (
+        "agregar_producto", "modificar_producto", "eliminar_producto",
+        "vender_producto", "ajustar_stock"
+    )
+    
+    def __init__(self, cliente):
+        """
+        Inicializa un lote vacío.
+        
+        Args:
+            cliente (ClienteInventario): Cliente por el que se envía el lote.
+        """
+        self.cliente = cliente
+        self.llamadas = []
+        self.resultados = None
+    
+    def _encolar(self, metodo, *args):
+        """
+        Añade una llamada al lote.
+        
+        Returns:
+            int: Posición de la llamada en el lote (índice de su resultado).
+        """
+        self.llamadas.append((metodo, args))
+        return len(self.llamadas) - 1
+    
+    def _encolar_idempotente(self, metodo, *args, id_solicitud=None):
+        """
+        Añade al lote una llamada de modificación con identificador de
+        solicitud, para que el lote completo pueda reintentarse.
+        """
+        if id_solicitud is None:
+            id_solicitud = uuid.uuid4().hex
+        return self._encolar(metodo, *args, id_solicitud)
+    
+    def agregar_producto(self, id, nombre, precio, stock, categoria, id_solicitud=None):
+        """Encola el alta de un producto."""
+        return self._encolar_idempotente(
+            "agregar_producto", id, nombre, precio, stock, categoria,
+            id_solicitud=id_solicitud
+        )
+    
+    def modificar_producto(self, id_producto, datos, id_solicitud=None):
+        """Encola la modificación de un producto."""
+        return self._encolar_idempotente("modificar_producto", id_producto, datos, id_solicitud=id_solicitud)
+    
+    def eliminar_producto(self, id_producto, id_solicitud=None):
+        """Encola la eliminación de un producto."""
+        return self._encolar_idempotente("eliminar_producto", id_producto, id_solicitud=id_solicitud)
+    
+    def vender_producto(self, id_producto, cantidad, id_solicitud=None):
+        """Encola la venta de un producto."""
+        return self._encolar_idempotente("vender_producto", id_producto, cantidad, id_solicitud=id_solicitud)
+    
+    def ajustar_stock(self, id_producto, cantidad, id_solicitud=None):
+        """Encola un ajuste de stock."""
+        return self._encolar_idempotente("ajustar_stock", id_producto, cantidad, id_solicitud=id_solicitud)
+    
+    def obtener_producto(self, id_producto):
+        """Encola la consulta de un producto."""
+        return self._encolar("obtener_producto", id_producto)
+    
+    def obtener_productos(self, ids):
+        """Encola la consulta de varios productos."""
+        return self._encolar("obtener_productos", list(ids))
+    
+    def listar_productos(self, categoria=None):
+        """Encola el listado de productos."""
+        return self._encolar("listar_productos", categoria)
+    
+    def listar_categorias(self):
+        """Encola el listado de categorías."""
+        return self._encolar("listar_categorias")
+    
+    def ejecutar(self):
+        """
+        Envía las llamadas encoladas y vacía el lote.
+        
+        Los lotes muy grandes se parten en mensajes de TAMANO_MAX_LOTE
+        llamadas como máximo.
+        
+        Returns:
+            list: Resultado de cada llamada, en el orden en que se encolaron.
+        """
+        resultados = []
+        
+        for inicio in range(0, len(self.llamadas), TAMANO_MAX_LOTE):
+            parte = self.llamadas[inicio:inicio + TAMANO_MAX_LOTE]
+            resultados.extend(self.cliente._llamar_lote(parte))
+        
+        # Mantener coherente la caché del cliente con las modificaciones
+        for (metodo, args), resultado in zip(self.llamadas, resultados):
+            if metodo in self.METODOS_MODIFICACION:
+                self.cliente._actualizar_cache(args[0], resultado)
+        
+        self.llamadas = []
+        self.resultados = resultados
+        return resultados
+    
+    def __len__(self):
+        return len(self.llamadas)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, tipo, valor, traza):
+        # Si el bloque terminó con una excepción no se envía nada
+        if tipo is None:
+            self.ejecutar()
 
 
 # Función para crear una instancia del cliente y conectarla
-def obtener_cliente():
+def obtener_cliente(usar_cola_ventas=False, uri=None):
     """
     Crea y conecta un cliente al servidor.
     
+    Args:
+        usar_cola_ventas (bool): Si las ventas hechas sin conexión se guardan
+            en la cola local (RUTA_COLA_VENTAS) y se envían al volver la
+            conexión.
+        uri (str, optional): URI del servidor. Si es None se usa la conexión
+            directa a HOST_SERVIDOR y PUERTO_SERVIDOR.
+    
     Returns:
         ClienteInventario: Cliente conectado o None si falla la conexión.
     """
@@ -231,10 +1094,22 @@ def obtener_cliente():
     # Deshabilitar la necesidad de clave HMAC para desarrollo local
     Pyro4.config.REQUIRE_EXPOSE = False
     
-    cliente = ClienteInventario()
+    ruta_base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    
+    if RUTA_TRAZAS_CLIENTE:
+        trazas.configurar(os.path.join(ruta_base, RUTA_TRAZAS_CLIENTE), "cliente")
+    
+    cola_ventas = None
+    if usar_cola_ventas:
+        cola_ventas = ColaVentas(os.path.join(ruta_base, RUTA_COLA_VENTAS))
+    
+    cliente = ClienteInventario(cola_ventas=cola_ventas)
     
     # Intentar la conexión directa sin usar el Name Server
-    if cliente.conectar_directo():
+    conectado = cliente.conectar_a(uri) if uri else cliente.conectar_directo()
+    
+    if conectado:
+        cliente.iniciar_sincronizacion_ventas()
         return cliente
     else:
         print("No se pudo conectar con el servidor de inventario.")
@@ -0,0 +1,250 @@
+"""
+Cliente asíncrono que permite lanzar muchas llamadas al servidor de
+inventario en paralelo y reunir sus resultados.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from common.constantes import MAX_LLAMADAS_EN_VUELO
+
+
+class ClienteInventarioAsync:
+    """
+    Envoltorio asíncrono de ClienteInventario.
+    
+    Las llamadas se ejecutan en un pool de hilos; cada hilo usa su propio
+    cliente (y por tanto su propia conexión Pyro), clonado del cliente base.
+    El número de llamadas en curso está limitado: al alcanzar el límite,
+    enviar una nueva llamada espera a que termine alguna de las anteriores.
+    
+    Ejemplo:
+        with ClienteInventarioAsync(obtener_cliente()) as cliente:
+            futuros = [cliente.obtener_producto(i) for i in ids]
+            resultados = cliente.reunir(futuros)
+    """
+    
+    def __init__(self, cliente_base, max_en_vuelo=MAX_LLAMADAS_EN_VUELO):
+        """
+        Inicializa el cliente asíncrono.
+        
+        Args:
+            cliente_base (ClienteInventario): Cliente ya conectado del que se
+                toma la URI del servidor.
+            max_en_vuelo (int): Máximo de llamadas simultáneas en curso.
+        """
+        self.cliente_base = cliente_base
+        self.max_en_vuelo = max_en_vuelo
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_en_vuelo,
+            thread_name_prefix="cliente-inventario"
+        )
+        self._en_vuelo = threading.BoundedSemaphore(max_en_vuelo)
+        self._local = threading.local()
+        self._clientes = []
+        self._lock = threading.Lock()
+    
+    def _cliente_del_hilo(self):
+        """
+        Devuelve el cliente asociado al hilo actual, creándolo si hace falta.
+        
+        Returns:
+            ClienteInventario: Cliente del hilo o None si no pudo conectar.
+        """
+        cliente = getattr(self._local, "cliente", None)
+        
+        if cliente is None:
+            cliente = self.cliente_base.clonar()
+            self._local.cliente = cliente
+            
+            if cliente is not None:
+                with self._lock:
+                    self._clientes.append(cliente)
+        
+        return cliente
+    
+    def _ejecutar(self, metodo, args, kwargs):
+        """
+        Ejecuta una llamada en el hilo del pool.
+        """
+        cliente = self._cliente_del_hilo()
+        
+        if cliente is None:
+            return {"exito": False, "mensaje": "No conectado al servidor"}
+        
+        return getattr(cliente, metodo)(*args, **kwargs)
+    
+    def _lanzar(self, metodo, args, kwargs):
+        """
+        Envía al pool una llamada que ya tiene su hueco reservado. El hueco
+        se libera cuando termina el futuro, también si se cancela antes de
+        empezar a ejecutarse.
+        
+        Returns:
+            concurrent.futures.Future: Futuro con el resultado de la llamada.
+        """
+        try:
+            futuro = self._pool.submit(self._ejecutar, metodo, args, kwargs)
+        except Exception:
+            self._en_vuelo.release()
+            raise
+        
+        futuro.add_done_callback(lambda _: self._en_vuelo.release())
+        return futuro
+    
+    def enviar(self, metodo, *args, **kwargs):
+        """
+        Lanza una llamada de ClienteInventario sin esperar su resultado.
+        
+        Si ya hay max_en_vuelo llamadas en curso, espera a que termine una.
+        
+        Args:
+            metodo (str): Nombre del método de ClienteInventario.
+            *args: Argumentos posicionales del método.
+            **kwargs: Argumentos con nombre del método.
+        
+        Returns:
+            concurrent.futures.Future: Futuro con el resultado de la llamada.
+        """
+        self._en_vuelo.acquire()
+        return self._lanzar(metodo, args, kwargs)
+    
+    async def enviar_async(self, metodo, *args, **kwargs):
+        """
+        Versión para asyncio de enviar(): espera el resultado sin bloquear
+        el bucle de eventos.
+        
+        Args:
+            metodo (str): Nombre del método de ClienteInventario.
+            *args: Argumentos posicionales del método.
+            **kwargs: Argumentos con nombre del método.
+        
+        Returns:
+            dict: Resultado de la llamada.
+        """
+        # Esperar un hueco libre fuera del bucle de eventos. El hilo que
+        # espera no se puede interrumpir: si la corrutina se cancela, el
+        # hueco se devuelve en cuanto ese hilo lo obtenga
+        espera = asyncio.ensure_future(asyncio.to_thread(self._en_vuelo.acquire))
+        
+        try:
+            await asyncio.shield(espera)
+        except asyncio.CancelledError:
+            espera.add_done_callback(lambda _: self._en_vuelo.release())
+            raise
+        
+        return await asyncio.wrap_future(self._lanzar(metodo, args, kwargs))
+    
+    @staticmethod
+    def reunir(futuros):
+        """
+        Espera una lista de futuros y devuelve sus resultados en orden.
+        
+        Args:
+            futuros (list): Futuros devueltos por este cliente.
+        
+        Returns:
+            list: Resultados en el mismo orden que los futuros.
+        """
+        return [futuro.result() for futuro in futuros]
+    
+    def agregar_producto(self, id, nombre, precio, stock, categoria, id_solicitud=None):
+        """
+        Agrega un nuevo producto al inventario.
+        
+        Returns:
+            concurrent.futures.Future: Futuro con el resultado de la operación.
+        """
+        return self.enviar(
+            "agregar_producto", id, nombre, precio, stock, categoria,
+            id_solicitud=id_solicitud
+        )
+    
+    def modificar_producto(self, id_producto, datos, id_solicitud=None):
+        """
+        Modifica un producto existente en el inventario.
+        
+        Returns:
+            concurrent.futures.Future: Futuro con el resultado de la operación.
+        """
+        return self.enviar("modificar_producto", id_producto, datos, id_solicitud=id_solicitud)
+    
+    def eliminar_producto(self, id_producto, id_solicitud=None):
+        """
+        Elimina un producto del inventario.
+        
+        Returns:
+            concurrent.futures.Future: Futuro con el resultado de la operación.
+        """
+        return self.enviar("eliminar_producto", id_producto, id_solicitud=id_solicitud)
+    
+    def obtener_producto(self, id_producto):
+        """
+        Obtiene la información de un producto por su ID.
+        
+        Returns:
+            concurrent.futures.Future: Futuro con los datos del producto.
+        """
+        return self.enviar("obtener_producto", id_producto)
+    
+    def obtener_productos(self, ids):
+        """
+        Obtiene la información de varios productos en una sola llamada.
+        
+        Returns:
+            concurrent.futures.Future: Futuro con los productos y los faltantes.
+        """
+        return self.enviar("obtener_productos", ids)
+    
+    def listar_productos(self, categoria=None):
+        """
+        Lista todos los productos, opcionalmente filtrados por categoría.
+        
+        Returns:
+            concurrent.futures.Future: Futuro con la lista de productos.
+        """
+        return self.enviar("listar_productos", categoria)
+    
+    def listar_categorias(self):
+        """
+        Lista las categorías con su número de productos y su stock total.
+        
+        Returns:
+            concurrent.futures.Future: Futuro con la lista de categorías.
+        """
+        return self.enviar("listar_categorias")
+    
+    def vender_producto(self, id_producto, cantidad, id_solicitud=None):
+        """
+        Registra la venta de un producto, reduciendo su stock.
+        
+        Returns:
+            concurrent.futures.Future: Futuro con el resultado de la operación.
+        """
+        return self.enviar("vender_producto", id_producto, cantidad, id_solicitud=id_solicitud)
+    
+    def ajustar_stock(self, id_producto, cantidad, id_solicitud=None):
+        """
+        Suma (o resta, si es negativa) una cantidad al stock de un producto.
+        
+        Returns:
+            concurrent.futures.Future: Futuro con el resultado de la operación.
+        """
+        return self.enviar("ajustar_stock", id_producto, cantidad, id_solicitud=id_solicitud)
+    
+    def cerrar(self):
+        """
+        Espera las llamadas pendientes y cierra las conexiones de los hilos.
+        """
+        self._pool.shutdown(wait=True)
+        
+        with self._lock:
+            for cliente in self._clientes:
+                cliente.cerrar()
+            self._clientes = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, tipo, valor, traza):
+        self.cerrar()
@@ -0,0 +1,181 @@
+"""
+Cola local y persistente de ventas pendientes de enviar al servidor.
+"""
+import os
+import json
+import time
+import uuid
+import threading
+
+
+class ColaVentas:
+    """
+    Cola de ventas registradas sin conexión con el servidor.
+    
+    Cada venta se añade como una línea JSON a un archivo y se fuerza su
+    escritura a disco antes de confirmarla, de modo que no se pierde aunque
+    el proceso termine. Cada entrada lleva su identificador de solicitud:
+    reenviarla tras un corte de conexión no la aplica dos veces en el
+    servidor. El servidor solo recuerda esos identificadores en memoria
+    (durante IDEMPOTENCIA_TTL segundos), así que si se reinicia después de
+    aplicar una venta y antes de que salga de la cola, el reenvío la aplica
+    de nuevo.
+    
+    Las ventas que el servidor rechaza (por ejemplo, por stock insuficiente)
+    salen de la cola y se guardan en un archivo de conflictos para revisarlas.
+    """
+    
+    def __init__(self, ruta_archivo):
+        """
+        Inicializa la cola y carga las ventas pendientes del archivo.
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo de la cola.
+        """
+        self.ruta_archivo = ruta_archivo
+        self.ruta_conflictos = os.path.splitext(ruta_archivo)[0] + "_conflictos.jsonl"
+        self._lock = threading.Lock()
+        
+        # Impide que dos sincronizaciones envíen las mismas entradas a la vez
+        self.lock_envio = threading.Lock()
+        
+        self._entradas = self._leer(self.ruta_archivo)
+    
+    @staticmethod
+    def _leer(ruta):
+        """
+        Lee un archivo de entradas JSON, una por línea.
+        
+        Una última línea incompleta (escritura interrumpida) se descarta.
+        
+        Args:
+            ruta (str): Ruta del archivo.
+        
+        Returns:
+            list: Entradas leídas.
+        """
+        entradas = []
+        
+        if not os.path.exists(ruta):
+            return entradas
+        
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            for linea in archivo:
+                try:
+                    entradas.append(json.loads(linea))
+                except json.JSONDecodeError:
+                    print(f"Entrada ilegible descartada en {ruta}")
+        
+        return entradas
+    
+    @staticmethod
+    def _anexar(ruta, entrada):
+        """
+        Añade una entrada al final de un archivo y la fuerza a disco.
+        
+        Args:
+            ruta (str): Ruta del archivo.
+            entrada (dict): Entrada a añadir.
+        """
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        
+        with open(ruta, 'a', encoding='utf-8') as archivo:
+            archivo.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+            archivo.flush()
+            os.fsync(archivo.fileno())
+    
+    def encolar(self, id_producto, cantidad, id_solicitud=None):
+        """
+        Registra una venta pendiente.
+        
+        Args:
+            id_producto (int): ID del producto vendido.
+            cantidad (int): Cantidad vendida.
+            id_solicitud (str, optional): Identificador de la solicitud; si
+                es None se genera uno nuevo.
+        
+        Returns:
+            dict: Entrada guardada.
+        """
+        entrada = {
+            "id_solicitud": id_solicitud or uuid.uuid4().hex,
+            "id_producto": id_producto,
+            "cantidad": cantidad,
+            "fecha": time.time()
+        }
+        
+        with self._lock:
+            self._anexar(self.ruta_archivo, entrada)
+            self._entradas.append(entrada)
+        
+        return entrada
+    
+    def pendientes(self):
+        """
+        Devuelve las ventas pendientes, en el orden en que se registraron.
+        
+        Returns:
+            list: Entradas pendientes.
+        """
+        with self._lock:
+            return list(self._entradas)
+    
+    def retirar(self, ids_solicitud):
+        """
+        Quita de la cola las entradas ya resueltas.
+        
+        El archivo se reescribe con las entradas restantes en un archivo
+        temporal que reemplaza al anterior.
+        
+        Args:
+            ids_solicitud (iterable): Identificadores de las entradas a quitar.
+        """
+        ids_solicitud = set(ids_solicitud)
+        if not ids_solicitud:
+            return
+        
+        with self._lock:
+            self._entradas = [
+                entrada for entrada in self._entradas
+                if entrada["id_solicitud"] not in ids_solicitud
+            ]
+            
+            temporal = f"{self.ruta_archivo}.tmp"
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                for entrada in self._entradas:
+                    archivo.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            
+            os.replace(temporal, self.ruta_archivo)
+    
+    def registrar_conflicto(self, entrada, mensaje):
+        """
+        Guarda una venta rechazada por el servidor junto con el motivo.
+        
+        Args:
+            entrada (dict): Entrada de la cola rechazada.
+            mensaje (str): Mensaje de error del servidor.
+        
+        Returns:
+            dict: Conflicto registrado.
+        """
+        conflicto = dict(entrada, mensaje=mensaje)
+        
+        with self._lock:
+            self._anexar(self.ruta_conflictos, conflicto)
+        
+        return conflicto
+    
+    def conflictos(self):
+        """
+        Devuelve las ventas rechazadas registradas hasta ahora.
+        
+        Returns:
+            list: Conflictos con los datos de la venta y el motivo.
+        """
+        with self._lock:
+            return self._leer(self.ruta_conflictos)
+    
+    def __len__(self):
+        return len(self._entradas)
@@ -0,0 +1,405 @@
+"""
+Modo no interactivo del cliente de inventario, pensado para scripts y tareas
+programadas.
+
+Cada comando lee sus registros de un archivo o de la entrada estándar (JSON
+por línea o CSV con cabecera), los envía al servidor en lotes por una sola
+conexión y escribe un resultado JSON por línea en la salida estándar. Los
+mensajes de diagnóstico y el resumen final se escriben en la salida de
+errores.
+
+Ejemplos:
+    python -m cliente.main_cliente list --formato csv
+    python -m cliente.main_cliente get 1 2 3
+    python -m cliente.main_cliente sell ventas.jsonl
+    python -m cliente.main_cliente import productos.csv --formato csv --actualizar
+    python -m cliente.main_cliente adjust ajustes.jsonl
+    python -m cliente.main_cliente export --formato csv --salida catalogo.csv
+"""
+import sys
+import csv
+import json
+import time
+import argparse
+import itertools
+import contextlib
+
+from cliente.cliente import obtener_cliente
+from common.exportacion import EscritorProductos, CAMPOS_PRODUCTO
+from common.constantes import TAMANO_MAX_LOTE, MSG_PRODUCTO_EXISTE
+
+
+@contextlib.contextmanager
+def abrir_archivo(ruta, modo, estandar):
+    """
+    Abre un archivo, o usa el flujo estándar si la ruta es "-".
+    
+    Args:
+        ruta (str): Ruta del archivo o "-".
+        modo (str): Modo de apertura ('r' o 'w').
+        estandar: Flujo a usar cuando la ruta es "-".
+    
+    Yields:
+        Archivo abierto.
+    """
+    if ruta == "-":
+        yield estandar
+    else:
+        with open(ruta, modo, encoding='utf-8', newline='') as archivo:
+            yield archivo
+
+
+class RegistroNoValido:
+    """
+    Registro de la entrada que no se pudo interpretar; se informa como una
+    operación fallida sin interrumpir el resto.
+    """
+    
+    def __init__(self, mensaje, numero=None):
+        self.mensaje = mensaje
+        self.numero = numero
+
+
+def leer_registros(archivo, formato):
+    """
+    Lee registros de un archivo sin cargarlo entero en memoria.
+    
+    Args:
+        archivo: Archivo de texto abierto.
+        formato (str): "jsonl" (un objeto JSON por línea) o "csv" (con cabecera).
+    
+    Yields:
+        dict: Cada registro leído, o RegistroNoValido si una línea no se
+              puede interpretar.
+    """
+    if formato == "csv":
+        lector = csv.DictReader(archivo)
+        while True:
+            try:
+                registro = next(lector)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield RegistroNoValido(f"CSV no válido: {e}")
+                continue
+            yield registro
+    else:
+        for linea in archivo:
+            if linea.strip():
+                try:
+                    yield json.loads(linea)
+                except json.JSONDecodeError as e:
+                    yield RegistroNoValido(f"JSON no válido: {e}")
+
+
+def leer_id(numero, registro):
+    """
+    Obtiene el ID de un registro {"id"} de la entrada de get.
+    
+    Args:
+        numero (int): Posición del registro en la entrada.
+        registro: Registro leído con leer_registros.
+    
+    Returns:
+        int: ID del producto, o RegistroNoValido si el registro no lo tiene.
+    """
+    try:
+        if isinstance(registro, RegistroNoValido):
+            raise ValueError(registro.mensaje)
+        return int(registro["id"])
+    except (KeyError, TypeError, ValueError) as e:
+        return RegistroNoValido(f"Registro no válido: {e}", numero)
+
+
+def escribir_json(salida, registro):
+    """
+    Escribe un registro como una línea JSON.
+    """
+    salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+def escribir_productos(salida, productos, formato):
+    """
+    Escribe productos en formato JSON por línea o CSV.
+    
+    Args:
+        salida: Archivo de texto abierto.
+        productos (iterable): Diccionarios de productos.
+        formato (str): "jsonl" o "csv".
+    
+    Returns:
+        int: Número de productos escritos.
+    """
+    escritor = EscritorProductos(salida, formato)
+    escritor.escribir_todos(productos)
+    return escritor.total
+
+
+def en_partes(iterable, tamano):
+    """
+    Divide un iterable en listas de como máximo tamano elementos.
+    """
+    iterador = iter(iterable)
+    while True:
+        parte = list(itertools.islice(iterador, tamano))
+        if not parte:
+            return
+        yield parte
+
+
+def argumentos_venta(registro):
+    """Convierte un registro {"id", "cantidad"} en argumentos de vender_producto."""
+    return int(registro["id"]), int(registro["cantidad"])
+
+
+def argumentos_ajuste(registro):
+    """Convierte un registro {"id", "cantidad"} en argumentos de ajustar_stock."""
+    return int(registro["id"]), int(registro["cantidad"])
+
+
+def argumentos_alta(registro):
+    """Convierte un registro de producto en argumentos de agregar_producto."""
+    return (
+        int(registro["id"]),
+        registro["nombre"],
+        float(registro["precio"]),
+        int(registro["stock"]),
+        registro["categoria"]
+    )
+
+
+def procesar_registros(cliente, registros, metodo, convertir, salida, actualizar=False):
+    """
+    Envía una operación por registro, en lotes de TAMANO_MAX_LOTE, y escribe
+    el resultado de cada una en el orden de entrada.
+    
+    Args:
+        cliente (ClienteInventario): Cliente conectado.
+        registros (iterable): Registros leídos de la entrada.
+        metodo (str): Método de LoteOperaciones a invocar por registro.
+        convertir (callable): Convierte un registro en los argumentos del método.
+        salida: Archivo donde escribir los resultados.
+        actualizar (bool): En altas, modificar los productos que ya existen.
+    
+    Returns:
+        tuple: (procesados, fallidos).
+    """
+    procesados = 0
+    fallidos = 0
+    
+    for parte in en_partes(enumerate(registros, 1), TAMANO_MAX_LOTE):
+        lote = cliente.lote()
+        pendientes = []
+        
+        for numero, registro in parte:
+            try:
+                if isinstance(registro, RegistroNoValido):
+                    raise ValueError(registro.mensaje)
+                args = convertir(registro)
+            except (KeyError, TypeError, ValueError) as e:
+                pendientes.append((numero, None, {"exito": False, "mensaje": f"Registro no válido: {e}"}))
+                continue
+            
+            pendientes.append((numero, args, getattr(lote, metodo)(*args)))
+        
+        resultados = lote.ejecutar()
+        
+        # Altas de productos ya existentes: enviarlas como modificaciones
+        if actualizar:
+            lote = cliente.lote()
+            reenvios = {}
+            for numero, args, posicion in pendientes:
+                if args is not None and resultados[posicion]["mensaje"] == MSG_PRODUCTO_EXISTE:
+                    datos = dict(zip(CAMPOS_PRODUCTO[1:], args[1:]))
+                    reenvios[posicion] = lote.modificar_producto(args[0], datos)
+            
+            if reenvios:
+                modificados = lote.ejecutar()
+                for posicion, indice in reenvios.items():
+                    resultados[posicion] = modificados[indice]
+        
+        for numero, args, posicion in pendientes:
+            resultado = posicion if args is None else resultados[posicion]
+            registro = {"registro": numero}
+            if args is not None:
+                registro["id"] = args[0]
+            registro.update(resultado)
+            escribir_json(salida, registro)
+            
+            procesados += 1
+            if not resultado["exito"]:
+                fallidos += 1
+    
+    return procesados, fallidos
+
+
+def consultar_productos(cliente, ids, salida):
+    """
+    Consulta productos por ID en bloques de TAMANO_MAX_LOTE y los escribe
+    en el orden pedido. Los registros no válidos de la entrada
+    (RegistroNoValido) se escriben como consultas fallidas.
+    
+    Returns:
+        tuple: (procesados, fallidos).
+    """
+    procesados = 0
+    fallidos = 0
+    
+    for parte in en_partes(ids, TAMANO_MAX_LOTE):
+        validos = [id_producto for id_producto in parte if not isinstance(id_producto, RegistroNoValido)]
+        resultado = cliente.obtener_productos(validos) if validos else {"exito": True, "productos": {}}
+        
+        for id_producto in parte:
+            procesados += 1
+            
+            if isinstance(id_producto, RegistroNoValido):
+                fallidos += 1
+                escribir_json(salida, {"registro": id_producto.numero, "exito": False, "mensaje": id_producto.mensaje})
+            elif resultado["exito"] and id_producto in resultado["productos"]:
+                escribir_json(salida, dict(resultado["productos"][id_producto], exito=True))
+            else:
+                fallidos += 1
+                mensaje = "Producto no encontrado" if resultado["exito"] else resultado["mensaje"]
+                escribir_json(salida, {"id": id_producto, "exito": False, "mensaje": mensaje})
+    
+    return procesados, fallidos
+
+
+def crear_parser():
+    """
+    Crea el analizador de argumentos del modo no interactivo.
+    
+    Returns:
+        argparse.ArgumentParser: Analizador con un subcomando por operación.
+    """
+    parser = argparse.ArgumentParser(
+        prog="main_cliente",
+        description="Operaciones del inventario en modo no interactivo."
+    )
+    parser.add_argument("--uri", help="URI del servidor (por defecto, conexión directa)")
+    
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    
+    listar = comandos.add_parser("list", help="Listar productos")
+    listar.add_argument("--categoria", help="Filtrar por categoría")
+    listar.add_argument("--formato", choices=["jsonl", "csv"], default="jsonl")
+    
+    obtener = comandos.add_parser("get", help="Obtener productos por ID")
+    obtener.add_argument("ids", nargs="*", type=int,
+                         help="IDs a consultar (si no se indican, se leen de --entrada)")
+    obtener.add_argument("--entrada", default="-",
+                         help="Archivo con un registro {\"id\"} por línea (por defecto, stdin)")
+    obtener.add_argument("--formato", choices=["jsonl", "csv"], default="jsonl",
+                         help="Formato de la entrada")
+    
+    for nombre, ayuda in (
+        ("sell", "Registrar ventas (registros con id y cantidad)"),
+        ("adjust", "Ajustar stock (registros con id y cantidad, que puede ser negativa)"),
+        ("import", "Agregar productos (registros con id, nombre, precio, stock y categoria)")
+    ):
+        comando = comandos.add_parser(nombre, help=ayuda)
+        comando.add_argument("entrada", nargs="?", default="-",
+                             help="Archivo de registros (por defecto, stdin)")
+        comando.add_argument("--formato", choices=["jsonl", "csv"], default="jsonl",
+                             help="Formato de la entrada")
+        if nombre == "import":
+            comando.add_argument("--actualizar", action="store_true",
+                                 help="Modificar los productos que ya existen")
+    
+    exportar = comandos.add_parser("export", help="Exportar el catálogo completo, en orden de ID")
+    exportar.add_argument("--formato", choices=["jsonl", "csv"], default="jsonl")
+    exportar.add_argument("--salida", default="-", help="Archivo de destino (por defecto, stdout)")
+    exportar.add_argument("--en-servidor", metavar="NOMBRE",
+                          help="Escribir la exportación en el servidor, con este nombre de archivo")
+    
+    return parser
+
+
+def ejecutar_comando(argumentos=None):
+    """
+    Ejecuta un comando del modo no interactivo.
+    
+    Args:
+        argumentos (list, optional): Argumentos de la línea de comandos; por
+            defecto, sys.argv[1:].
+    
+    Returns:
+        int: Código de salida: 0 si todo fue bien, 1 si alguna operación
+             falló y 2 si no se pudo conectar con el servidor.
+    """
+    args = crear_parser().parse_args(argumentos)
+    salida = sys.stdout
+    
+    # Los mensajes del cliente van a stderr para no mezclarse con los datos
+    with contextlib.redirect_stdout(sys.stderr):
+        cliente = obtener_cliente(uri=args.uri)
+        
+        if not cliente:
+            return 2
+        
+        inicio = time.perf_counter()
+        
+        try:
+            if args.comando == "list":
+                resultado = cliente.listar_productos(args.categoria)
+                
+                if not resultado["exito"]:
+                    print(f"Error: {resultado['mensaje']}")
+                    return 1
+                
+                procesados = escribir_productos(salida, resultado["productos"], args.formato)
+                fallidos = 0
+            
+            elif args.comando == "export":
+                if args.en_servidor:
+                    resultado = cliente.exportar_en_servidor(args.en_servidor, args.formato)
+                else:
+                    with abrir_archivo(args.salida, 'w', salida) as archivo:
+                        resultado = cliente.exportar(archivo, args.formato)
+                
+                if not resultado["exito"]:
+                    print(f"Error: {resultado['mensaje']}")
+                    return 1
+                
+                if args.en_servidor:
+                    print(f"Exportado en el servidor: {resultado['ruta']}")
+                procesados = resultado["total"]
+                fallidos = 0
+            
+            elif args.comando == "get":
+                if args.ids:
+                    ids = args.ids
+                else:
+                    with abrir_archivo(args.entrada, 'r', sys.stdin) as archivo:
+                        ids = [
+                            leer_id(numero, registro)
+                            for numero, registro in enumerate(leer_registros(archivo, args.formato), 1)
+                        ]
+                procesados, fallidos = consultar_productos(cliente, ids, salida)
+            
+            else:
+                metodo, convertir = {
+                    "sell": ("vender_producto", argumentos_venta),
+                    "adjust": ("ajustar_stock", argumentos_ajuste),
+                    "import": ("agregar_producto", argumentos_alta)
+                }[args.comando]
+                
+                with abrir_archivo(args.entrada, 'r', sys.stdin) as archivo:
+                    procesados, fallidos = procesar_registros(
+                        cliente, leer_registros(archivo, args.formato), metodo, convertir,
+                        salida, actualizar=getattr(args, "actualizar", False)
+                    )
+        finally:
+            salida.flush()
+            cliente.cerrar()
+        
+        segundos = time.perf_counter() - inicio
+        print(json.dumps({
+            "comando": args.comando,
+            "procesados": procesados,
+            "fallidos": fallidos,
+            "segundos": round(segundos, 3),
+            "operaciones_por_segundo": round(procesados / segundos, 1) if segundos else None
+        }))
+    
+    return 1 if fallidos else 0
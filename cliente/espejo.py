@@ -0,0 +1,148 @@
+"""
+Copia local en disco del catálogo, para mostrarlo al iniciar el cliente sin
+esperar al servidor.
+"""
+import os
+import json
+import threading
+
+
+class EspejoCatalogo:
+    """
+    Guarda en un archivo los productos del catálogo junto con la versión del
+    servidor a la que corresponden.
+    
+    El archivo tiene una línea JSON con la versión y después una por
+    producto, de modo que se puede leer por partes y mostrar la primera sin
+    esperar al resto. Al iniciar, el cliente muestra el espejo y después
+    pide al servidor solo los cambios posteriores a esa versión.
+    """
+    
+    def __init__(self, ruta_archivo):
+        """
+        Inicializa el espejo.
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo del espejo.
+        """
+        self.ruta_archivo = ruta_archivo
+        
+        # Escritura en segundo plano: solo se escribe la copia más reciente
+        self._lock = threading.Lock()
+        self._pendiente = None
+        self._escribiendo = False
+    
+    def existe(self):
+        """
+        Indica si hay un espejo guardado.
+        
+        Returns:
+            bool: True si el archivo existe.
+        """
+        return os.path.exists(self.ruta_archivo)
+    
+    def leer_por_partes(self, tamano):
+        """
+        Lee el espejo del disco por partes, sin cargarlo entero de una vez.
+        
+        También lee los espejos escritos como un único objeto JSON, que se
+        entregan en una sola parte.
+        
+        Args:
+            tamano (int): Productos por parte.
+        
+        Yields:
+            tuple: (version, productos) con la versión del catálogo y la
+                   lista de productos de cada parte; al menos una parte,
+                   aunque el catálogo esté vacío.
+        
+        Raises:
+            OSError, ValueError, KeyError: Si el archivo no existe o no es
+                un espejo válido.
+        """
+        with open(self.ruta_archivo, 'r', encoding='utf-8') as archivo:
+            cabecera = json.loads(archivo.readline())
+            version = cabecera["version"]
+            
+            if "productos" in cabecera:
+                yield version, cabecera["productos"]
+                return
+            
+            parte = []
+            entregadas = 0
+            for linea in archivo:
+                parte.append(json.loads(linea))
+                if len(parte) >= tamano:
+                    yield version, parte
+                    entregadas += 1
+                    parte = []
+            
+            if parte or not entregadas:
+                yield version, parte
+    
+    def guardar(self, version, productos):
+        """
+        Escribe el espejo en el disco.
+        
+        Se escribe en un archivo temporal que luego reemplaza al anterior,
+        para no dejar un espejo a medias si el proceso termina a mitad.
+        
+        Args:
+            version (str): Versión del catálogo a la que corresponden los
+                productos.
+            productos (iterable): Diccionarios de los productos.
+        
+        Returns:
+            bool: True si se guardó correctamente, False en caso contrario.
+        """
+        temporal = f"{self.ruta_archivo}.tmp"
+        
+        try:
+            os.makedirs(os.path.dirname(self.ruta_archivo), exist_ok=True)
+            
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                archivo.write(json.dumps({"version": version}, ensure_ascii=False) + "\n")
+                for p in productos:
+                    archivo.write(json.dumps(p, ensure_ascii=False) + "\n")
+            
+            os.replace(temporal, self.ruta_archivo)
+            return True
+        except Exception as e:
+            print(f"Error al guardar la copia local del catálogo: {e}")
+            return False
+    
+    def guardar_en_segundo_plano(self, version, productos):
+        """
+        Escribe el espejo en un hilo aparte.
+        
+        Si ya hay una escritura en curso, al terminar se escribe solo la
+        última copia pedida y se descartan las intermedias.
+        
+        Args:
+            version (str): Versión del catálogo a la que corresponden los
+                productos.
+            productos (list): Diccionarios de los productos.
+        """
+        with self._lock:
+            self._pendiente = (version, productos)
+            if self._escribiendo:
+                return
+            self._escribiendo = True
+        
+        hilo = threading.Thread(target=self._escribir_pendientes)
+        hilo.daemon = True
+        hilo.start()
+    
+    def _escribir_pendientes(self):
+        """
+        Escribe copias pendientes hasta que no quede ninguna.
+        """
+        while True:
+            with self._lock:
+                pendiente = self._pendiente
+                self._pendiente = None
+                if pendiente is None:
+                    self._escribiendo = False
+                    return
+            
+            self.guardar(*pendiente)
@@ -0,0 +1,243 @@
+"""
+Índice de búsqueda en memoria para filtrar el catálogo en la interfaz.
+"""
+from collections import defaultdict
+
+
+class IndiceBusqueda:
+    """
+    Índice de trigramas sobre una clave de búsqueda precalculada por producto,
+    más un índice por categoría.
+    
+    La clave de cada producto es su ID, nombre y categoría en minúsculas,
+    separados por un carácter que no puede aparecer en la búsqueda, de modo
+    que una subcadena de la búsqueda coincide con la clave si y solo si
+    coincide con alguno de los tres campos.
+    
+    Cada trigrama guarda el conjunto de productos cuya clave lo contiene; al
+    actualizar o eliminar un producto se quitan sus trigramas anteriores. Los
+    resultados se devuelven en el orden en que se indexaron los productos,
+    que es el del catálogo.
+    """
+    
+    SEPARADOR = "\x00"
+    
+    def __init__(self, productos=()):
+        """
+        Construye el índice.
+        
+        Args:
+            productos (iterable): Diccionarios de productos a indexar.
+        """
+        self.claves = {}
+        self.categorias = defaultdict(set)
+        self.trigramas = defaultdict(set)
+        self._categoria_de = {}
+        self._orden = {}
+        self._siguiente = 0
+        self._ultima_busqueda = None
+        self._ultimo_resultado = None
+        
+        self.agregar_todos(productos)
+    
+    def agregar_todos(self, productos):
+        """
+        Indexa productos que aún no están en el índice, más rápido que
+        llamar a actualizar() por cada uno.
+        
+        Args:
+            productos (iterable): Diccionarios de productos a indexar.
+        """
+        claves = self.claves
+        categorias = self.categorias
+        trigramas = self.trigramas
+        categoria_de = self._categoria_de
+        orden = self._orden
+        
+        for p in productos:
+            id_producto = p["id"]
+            clave = self.clave(p)
+            claves[id_producto] = clave
+            categoria_de[id_producto] = p["categoria"]
+            categorias[p["categoria"]].add(id_producto)
+            orden[id_producto] = self._siguiente
+            self._siguiente += 1
+            
+            for trigrama in {clave[i:i + 3] for i in range(len(clave) - 2)}:
+                trigramas[trigrama].add(id_producto)
+        
+        self._ultima_busqueda = None
+    
+    def clave(self, p):
+        """
+        Calcula la clave de búsqueda de un producto.
+        
+        Args:
+            p (dict): Datos del producto.
+        
+        Returns:
+            str: Clave en minúsculas.
+        """
+        return f"{p['id']}{self.SEPARADOR}{p['nombre']}{self.SEPARADOR}{p['categoria']}".lower()
+    
+    @staticmethod
+    def trigramas_de(texto):
+        """
+        Devuelve el conjunto de trigramas de un texto.
+        """
+        return set(texto[i:i + 3] for i in range(len(texto) - 2))
+    
+    def _quitar_trigramas(self, id_producto, trigramas):
+        """
+        Quita un producto de los conjuntos de los trigramas indicados,
+        descartando los que quedan vacíos.
+        """
+        for trigrama in trigramas:
+            ids = self.trigramas.get(trigrama)
+            if ids is not None:
+                ids.discard(id_producto)
+                if not ids:
+                    del self.trigramas[trigrama]
+    
+    def _quitar_categoria(self, id_producto):
+        """
+        Quita un producto del índice por categoría.
+        """
+        categoria = self._categoria_de.pop(id_producto, None)
+        ids = self.categorias.get(categoria)
+        if ids is not None:
+            ids.discard(id_producto)
+            if not ids:
+                del self.categorias[categoria]
+    
+    def actualizar(self, p):
+        """
+        Indexa un producto nuevo o actualiza uno existente.
+        
+        Args:
+            p (dict): Datos del producto.
+        """
+        id_producto = p["id"]
+        clave = self.clave(p)
+        anterior = self.claves.get(id_producto)
+        
+        if clave == anterior:
+            return
+        
+        if anterior is None:
+            self.agregar_todos([p])
+            return
+        
+        # Solo cambian los trigramas que no comparten la clave anterior y la
+        # nueva
+        trigramas_anteriores = self.trigramas_de(anterior)
+        trigramas_nuevos = self.trigramas_de(clave)
+        self._quitar_trigramas(id_producto, trigramas_anteriores - trigramas_nuevos)
+        for trigrama in trigramas_nuevos - trigramas_anteriores:
+            self.trigramas[trigrama].add(id_producto)
+        
+        if self._categoria_de.get(id_producto) != p["categoria"]:
+            self._quitar_categoria(id_producto)
+            self._categoria_de[id_producto] = p["categoria"]
+            self.categorias[p["categoria"]].add(id_producto)
+        
+        self.claves[id_producto] = clave
+        self._ultima_busqueda = None
+    
+    def eliminar(self, id_producto):
+        """
+        Quita un producto del índice.
+        
+        Args:
+            id_producto (int): ID del producto.
+        """
+        clave = self.claves.pop(id_producto, None)
+        if clave is None:
+            return
+        
+        self._quitar_trigramas(id_producto, self.trigramas_de(clave))
+        self._quitar_categoria(id_producto)
+        del self._orden[id_producto]
+        self._ultima_busqueda = None
+    
+    def coincide(self, id_producto, busqueda):
+        """
+        Indica si un producto coincide con una búsqueda.
+        
+        Args:
+            id_producto (int): ID del producto.
+            busqueda (str): Texto buscado, en minúsculas.
+        
+        Returns:
+            bool: True si el texto aparece en el ID, nombre o categoría.
+        """
+        clave = self.claves.get(id_producto)
+        return clave is not None and busqueda in clave
+    
+    def buscar(self, busqueda):
+        """
+        Busca los productos que contienen el texto indicado.
+        
+        Con tres o más caracteres solo se comprueban los productos que tienen
+        todos los trigramas de la búsqueda; con menos se comprueban todos
+        (una búsqueda tan corta coincide con buena parte del catálogo).
+        
+        Args:
+            busqueda (str): Texto buscado, en minúsculas y no vacío.
+        
+        Returns:
+            set: IDs de los productos que coinciden.
+        """
+        # Al seguir escribiendo una palabra, los resultados son un
+        # subconjunto de los de la búsqueda anterior
+        if self._ultima_busqueda and self._ultima_busqueda in busqueda:
+            candidatos = self._ultimo_resultado
+        elif len(busqueda) >= 3:
+            conjuntos = []
+            for trigrama in self.trigramas_de(busqueda):
+                ids = self.trigramas.get(trigrama)
+                if ids is None:
+                    conjuntos = [set()]
+                    break
+                conjuntos.append(ids)
+            conjuntos.sort(key=len)
+            candidatos = conjuntos[0].intersection(*conjuntos[1:])
+        else:
+            candidatos = self.claves
+        
+        resultado = set(
+            id_producto for id_producto in candidatos
+            if self.coincide(id_producto, busqueda)
+        )
+        
+        self._ultima_busqueda = busqueda
+        self._ultimo_resultado = resultado
+        return resultado
+    
+    def filtrar(self, busqueda, categoria=None):
+        """
+        Devuelve los productos que contienen un texto y pertenecen a una
+        categoría, en el orden del catálogo.
+        
+        Args:
+            busqueda (str): Texto buscado, en minúsculas; vacío para no
+                filtrar por texto.
+            categoria (str, optional): Categoría exacta; None para todas.
+        
+        Returns:
+            list: IDs de los productos que cumplen el filtro.
+        """
+        if busqueda:
+            ids = self.buscar(busqueda)
+            if categoria is not None:
+                ids = ids & self.categorias.get(categoria, set())
+        elif categoria is not None:
+            ids = self.categorias.get(categoria, set())
+        else:
+            return list(self.claves)
+        
+        # Con muchos resultados es más barato recorrer el catálogo en orden
+        # que ordenarlos
+        if len(ids) * 8 > len(self.claves):
+            return [id_producto for id_producto in self.claves if id_producto in ids]
+        return sorted(ids, key=self._orden.__getitem__)
@@ -335,26 +335,24 @@ class InterfazCLI:
         print("         FILTRAR POR CATEGORÍA")
         print("=" * 50)
         
-        # Obtener todas las categorías únicas
-        resultado = self.cliente.listar_productos()
+        # Obtener las categorías sin descargar el catálogo
+        resultado = self.cliente.listar_categorias()
         
         if not resultado["exito"]:
             print(f"Error: {resultado['mensaje']}")
             input("\nPresione Enter para continuar...")
             return
         
-        productos = resultado["productos"]
-        
-        if not productos:
+        if not resultado["categorias"]:
             print("No hay productos en el inventario.")
             input("\nPresione Enter para continuar...")
             return
         
-        categorias = sorted(set(p["categoria"] for p in productos))
+        categorias = [c["categoria"] for c in resultado["categorias"]]
         
         print("Categorías disponibles:")
-        for i, cat in enumerate(categorias, 1):
-            print(f"{i}. {cat}")
+        for i, c in enumerate(resultado["categorias"], 1):
+            print(f"{i}. {c['categoria']} ({c['productos']} productos, stock total: {c['stock']})")
         
         try:
             opcion = int(input("\nSeleccione una categoría (0 para volver): "))
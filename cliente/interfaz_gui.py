@@ -10,6 +10,12 @@ import threading
 import time
 
 from cliente.cliente import obtener_cliente
+from cliente.indice_busqueda import IndiceBusqueda
+from cliente.espejo import EspejoCatalogo
+from common.constantes import (
+    UMBRAL_TABLA_VIRTUAL, FILAS_MARGEN_VIRTUAL, RETARDO_BUSQUEDA_MS,
+    RUTA_ESPEJO_CATALOGO, TAMANO_PAGINA_ESPEJO
+)
 
 # Intenta establecer la ruta correcta para TCL
 tcl_lib = r"C:\Users\Gerardo Herrera\AppData\Local\Programs\Python\Python313\tcl"  # Ajusta esta ruta
@@ -79,13 +85,52 @@ class InterfazGUI:
         self.category_var = tk.StringVar()
         self.category_var.set("Todas")
         
-        # Variable para productos
-        self.productos = []
+        # Productos del catálogo por ID (en el orden del servidor)
+        self.productos = {}
         self.categorias = ["Todas"]
         
+        # Índice de búsqueda del catálogo y filtrado pendiente (debounce)
+        self.indice = IndiceBusqueda()
+        self.filtro_programado = None
+        
+        # Estado de la tabla virtual: productos que cumplen el filtro, índice
+        # de la primera fila visible y filas reutilizadas de la tabla
+        self.productos_filtrados = []
+        self.ids_filtrados = set()
+        self.tabla_virtual = False
+        self.inicio_virtual = 0
+        self.filas_virtuales = []
+        self.id_seleccionado = None
+        
+        # Estado de la tabla normal: fila de la tabla y valores mostrados por
+        # ID de producto, para aplicar solo los cambios al refrescar
+        self.filas_tree = {}
+        self.valores_filas = {}
+        self.criterio_filtro = None
+        
         # Inicializar el cliente
         self.cliente = None
         
+        # Cliente propio para las cargas en segundo plano, para que una
+        # descarga larga no bloquee las consultas de los diálogos
+        self.cliente_carga = None
+        
+        # Control de cargas: cada petición (y cada cambio local hecho con
+        # una carga en curso) incrementa la generación y solo se aplica el
+        # resultado de la más reciente
+        self.generacion_carga = 0
+        self.cargando = False
+        
+        # Copia local del catálogo y versión del servidor a la que
+        # corresponden los productos mostrados (None si no se conoce)
+        ruta_base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.espejo = EspejoCatalogo(os.path.join(ruta_base, RUTA_ESPEJO_CATALOGO))
+        self.version_catalogo = None
+        
+        # Si se muestra solo la primera página de la copia local mientras se
+        # lee el resto
+        self.espejo_parcial = False
+        
         # Crear el marco principal
         self.main_frame = ttk.Frame(self.root)
         self.main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -93,14 +138,21 @@ class InterfazGUI:
         # Inicializar la interfaz
         self.init_ui()
         
+        # Con copia local la ventana se puede usar mientras se conecta; sin
+        # ella se espera a la conexión con la pantalla de carga
+        self.usar_espejo = self.espejo.existe()
+        
         # Conectar al servidor en un hilo separado
         self.conectando = True
         self.thread_conexion = threading.Thread(target=self.conectar_servidor)
         self.thread_conexion.daemon = True
         self.thread_conexion.start()
         
-        # Mostrar pantalla de carga
-        self.mostrar_pantalla_carga()
+        if self.usar_espejo:
+            self.status_bar.config(text="Cargando copia local del catálogo...")
+        else:
+            # Mostrar pantalla de carga
+            self.mostrar_pantalla_carga()
     
     def init_ui(self):
         """
@@ -126,7 +178,7 @@ class InterfazGUI:
         ttk.Label(search_frame, text="Buscar:").pack(side=tk.LEFT, padx=(0, 5))
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=20)
         search_entry.pack(side=tk.LEFT, padx=(0, 10))
-        search_entry.bind("<KeyRelease>", self.filtrar_productos)
+        self.search_var.trace_add("write", self.programar_filtrado)
         
         # Selector de categoría
         ttk.Label(search_frame, text="Categoría:").pack(side=tk.LEFT, padx=(0, 5))
@@ -201,26 +253,47 @@ class InterfazGUI:
         self.tree.column("categoria", width=150)
         
         # Agregar scrollbars
-        vsb = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        self.vsb = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
         hsb = ttk.Scrollbar(table_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        self.tree.configure(yscrollcommand=self.vsb.set, xscrollcommand=hsb.set)
         
         # Posicionar la tabla y scrollbars
         self.tree.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
-        vsb.pack(fill=tk.Y, side=tk.RIGHT)
+        self.vsb.pack(fill=tk.Y, side=tk.RIGHT)
         hsb.pack(fill=tk.X, side=tk.BOTTOM)
         
         # Agregar evento de doble clic
         self.tree.bind("<Double-1>", self.mostrar_detalles_producto)
         
-        # Barra de estado
+        # Eventos de la tabla virtual
+        self.tree.bind("<<TreeviewSelect>>", self.recordar_seleccion)
+        self.tree.bind("<Configure>", lambda event: self.tabla_virtual and self.renderizar_ventana())
+        self.tree.bind("<MouseWheel>", self.rueda_tabla_virtual)
+        self.tree.bind("<Button-4>", self.rueda_tabla_virtual)
+        self.tree.bind("<Button-5>", self.rueda_tabla_virtual)
+        self.tree.bind("<Up>", self.tecla_tabla_virtual)
+        self.tree.bind("<Down>", self.tecla_tabla_virtual)
+        self.tree.bind("<Prior>", self.tecla_tabla_virtual)
+        self.tree.bind("<Next>", self.tecla_tabla_virtual)
+        
+        # Barra de estado con indicador de progreso de carga
+        status_frame = ttk.Frame(self.main_frame)
+        status_frame.pack(fill=tk.X, side=tk.BOTTOM, pady=(5, 0))
+        
         self.status_bar = ttk.Label(
-            self.main_frame, 
+            status_frame, 
             text="Listo",
             relief=tk.SUNKEN, 
             anchor=tk.W
         )
-        self.status_bar.pack(fill=tk.X, side=tk.BOTTOM, pady=(5, 0))
+        self.status_bar.pack(fill=tk.X, side=tk.LEFT, expand=True)
+        
+        self.progreso_carga = ttk.Progressbar(
+            status_frame,
+            orient="horizontal",
+            length=150,
+            mode="indeterminate"
+        )
     
     def mostrar_pantalla_carga(self):
         """
@@ -303,7 +376,13 @@ class InterfazGUI:
     def conectar_servidor(self):
         """
         Conecta con el servidor en un hilo separado.
+        
+        Si hay copia local del catálogo, antes de conectar se lee y se
+        entrega a la interfaz para mostrarla de inmediato.
         """
+        if self.usar_espejo:
+            self.cargar_espejo_en_hilo()
+        
         self.cliente = obtener_cliente()
         self.conectando = False
         
@@ -323,6 +402,13 @@ class InterfazGUI:
             # Conexión exitosa
             self.cargar_productos()
             self.status_bar.config(text="Conectado al servidor")
+        elif self.version_catalogo is not None:
+            # Sin servidor, pero con la copia local ya mostrada
+            messagebox.showwarning(
+                "Error de conexión",
+                "No se pudo conectar con el servidor. Se muestra la copia local del catálogo."
+            )
+            self.status_bar.config(text="Sin conexión: mostrando copia local del catálogo")
         else:
             # Error de conexión
             messagebox.showerror(
@@ -331,93 +417,680 @@ class InterfazGUI:
             )
             self.root.destroy()
     
+    def cargar_espejo_en_hilo(self):
+        """
+        Lee la copia local del catálogo fuera del hilo de Tk.
+        
+        La primera página se entrega en cuanto se lee, para mostrarla sin
+        esperar al resto; después se lee el resto del catálogo, se construye
+        su índice de búsqueda y se entrega completo.
+        """
+        productos = []
+        
+        try:
+            for version, parte in self.espejo.leer_por_partes(TAMANO_PAGINA_ESPEJO):
+                if not productos:
+                    self.root.after(
+                        0, self.mostrar_espejo, version, list(parte),
+                        sorted(set(p["categoria"] for p in parte)), IndiceBusqueda(parte)
+                    )
+                productos.extend(parte)
+            
+            if len(productos) > TAMANO_PAGINA_ESPEJO:
+                categorias = sorted(set(p["categoria"] for p in productos))
+                self.root.after(0, self.completar_espejo, productos, categorias, IndiceBusqueda(productos))
+            else:
+                self.root.after(0, self.completar_espejo, None, None, None)
+        
+        except (RuntimeError, tk.TclError):
+            # La ventana se cerró durante la lectura
+            pass
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error al cargar la copia local del catálogo: {e}")
+            # Lo ya mostrado no es el catálogo completo de esa versión
+            if productos:
+                try:
+                    self.root.after(0, self.descartar_espejo)
+                except (RuntimeError, tk.TclError):
+                    pass
+    
+    def mostrar_espejo(self, version, productos, categorias, indice):
+        """
+        Muestra la primera página de la copia local del catálogo mientras se
+        lee el resto y se sincroniza con el servidor.
+        
+        Args:
+            version (str): Versión del catálogo de la copia local.
+            productos (list): Productos de la primera página.
+            categorias (list): Categorías de la página, ordenadas.
+            indice (IndiceBusqueda): Índice de búsqueda de la página.
+        """
+        # Si ya llegaron datos del servidor, la copia está obsoleta
+        if self.version_catalogo is not None:
+            return
+        
+        self.version_catalogo = version
+        self.espejo_parcial = True
+        self.reemplazar_catalogo(productos, categorias, indice)
+        self.status_bar.config(text=f"Copia local: {len(self.productos)} productos. Leyendo el resto...")
+    
+    def completar_espejo(self, productos, categorias, indice):
+        """
+        Sustituye la primera página de la copia local por la copia completa.
+        
+        Args:
+            productos (list): Productos de la copia, o None si cabían en la
+                primera página.
+            categorias (list): Categorías de la copia, ordenadas.
+            indice (IndiceBusqueda): Índice de búsqueda de la copia.
+        """
+        if not self.espejo_parcial:
+            return
+        
+        self.espejo_parcial = False
+        if productos is not None:
+            self.reemplazar_catalogo(productos, categorias, indice)
+        self.status_bar.config(text=f"Copia local: {len(self.productos)} productos. Sincronizando...")
+    
+    def descartar_espejo(self):
+        """
+        Olvida la versión de una copia local que no se pudo leer entera, para
+        que la próxima carga pida el catálogo completo al servidor.
+        """
+        if self.espejo_parcial:
+            self.espejo_parcial = False
+            self.version_catalogo = None
+    
+    def guardar_espejo(self):
+        """
+        Guarda en segundo plano la copia local del catálogo mostrado.
+        
+        Los productos se copian aquí, en el hilo de Tk: el hilo que escribe
+        no debe leer los diccionarios que siguen cambiando con cada
+        operación, o podría mezclar dos versiones del catálogo.
+        """
+        productos = [dict(p) for p in self.productos.values()]
+        self.espejo.guardar_en_segundo_plano(self.version_catalogo, productos)
+    
+    def comprobar_conexion(self):
+        """
+        Comprueba que hay conexión con el servidor antes de una operación,
+        avisando al usuario si aún no la hay.
+        
+        Returns:
+            bool: True si hay cliente conectado.
+        """
+        if self.cliente:
+            return True
+        
+        messagebox.showwarning(
+            "Sin conexión",
+            "No hay conexión con el servidor. Se muestra la copia local del catálogo."
+        )
+        return False
+    
     def cargar_productos(self):
         """
-        Carga los productos desde el servidor.
+        Carga los productos desde el servidor en un hilo en segundo plano.
+        
+        Si se conoce la versión del catálogo mostrado, solo se descargan los
+        cambios posteriores a ella.
+        
+        Si ya hay una carga en curso no se lanza otra: su resultado queda
+        obsoleto y, al terminar, se inicia una única carga nueva.
         """
         if not self.cliente:
             return
         
+        self.generacion_carga += 1
+        
+        if self.cargando:
+            return
+        
+        self.iniciar_carga()
+    
+    def iniciar_carga(self):
+        """
+        Inicia la descarga del catálogo para la generación actual.
+        """
+        self.cargando = True
+        
+        # Mostrar mensaje e indicador de carga
+        self.status_bar.config(text="Cargando productos...")
+        self.progreso_carga.pack(side=tk.RIGHT, padx=(5, 0))
+        self.progreso_carga.start(10)
+        
+        hilo = threading.Thread(
+            target=self.cargar_productos_en_hilo,
+            args=(self.generacion_carga, self.version_catalogo)
+        )
+        hilo.daemon = True
+        hilo.start()
+    
+    def cargar_productos_en_hilo(self, generacion, version):
+        """
+        Descarga el catálogo (o sus cambios) fuera del hilo de Tk y entrega
+        el resultado al hilo principal mediante root.after.
+        
+        Args:
+            generacion (int): Generación de carga a la que pertenece.
+            version (str): Versión del catálogo mostrado o None.
+        """
+        categorias = None
+        indice = None
+        
         try:
-            # Mostrar mensaje de carga
-            self.status_bar.config(text="Cargando productos...")
-            self.root.update_idletasks()
+            if self.cliente_carga is None:
+                self.cliente_carga = self.cliente.clonar() or self.cliente
             
-            # Obtener productos
-            resultado = self.cliente.listar_productos()
+            resultado = self.cliente_carga.cambios_desde(version)
             
             if resultado["exito"]:
-                # Limpiar tabla actual
-                for item in self.tree.get_children():
-                    self.tree.delete(item)
-                
-                self.productos = resultado["productos"]
-                
-                # Obtener categorías únicas
-                categorias = set()
-                for p in self.productos:
-                    categorias.add(p["categoria"])
-                
-                self.categorias = ["Todas"] + sorted(list(categorias))
-                self.category_combobox.config(values=self.categorias)
-                
-                # Aplicar filtros actuales
-                self.filtrar_productos()
+                # Las categorías del selector se piden al servidor, que las
+                # mantiene al día sin recorrer el catálogo
+                respuesta = self.cliente_carga.listar_categorias()
+                if respuesta["exito"]:
+                    categorias = [c["categoria"] for c in respuesta["categorias"]]
                 
-                # Actualizar barra de estado
-                self.status_bar.config(text=f"Productos cargados: {len(self.productos)}")
-            else:
-                messagebox.showerror("Error", resultado["mensaje"])
-                self.status_bar.config(text="Error al cargar productos")
+                # Catálogo completo: construir el índice de búsqueda
+                if resultado["completo"]:
+                    indice = IndiceBusqueda(resultado["productos"])
+                    if categorias is None:
+                        categorias = sorted(set(p["categoria"] for p in resultado["productos"]))
         
         except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar productos: {str(e)}")
+            resultado = {"exito": False, "mensaje": f"Error al cargar productos: {str(e)}"}
+        
+        try:
+            self.root.after(0, self.finalizar_carga, generacion, resultado, categorias, indice)
+        except (RuntimeError, tk.TclError):
+            # La ventana se cerró durante la carga
+            pass
+    
+    def finalizar_carga(self, generacion, resultado, categorias, indice):
+        """
+        Aplica en la interfaz el resultado de una carga.
+        
+        Args:
+            generacion (int): Generación de carga a la que pertenece.
+            resultado (dict): Respuesta de cambios_desde.
+            categorias (list): Categorías del catálogo, ordenadas, o None si
+                no se pudieron obtener.
+            indice (IndiceBusqueda): Índice de búsqueda del catálogo.
+        """
+        self.cargando = False
+        
+        # Si se pidió otra carga mientras tanto, descartar este resultado
+        if generacion != self.generacion_carga:
+            self.iniciar_carga()
+            return
+        
+        self.progreso_carga.stop()
+        self.progreso_carga.pack_forget()
+        
+        if resultado["exito"]:
+            self.espejo_parcial = False
+            
+            if resultado["completo"]:
+                self.reemplazar_catalogo(resultado["productos"], categorias, indice)
+            else:
+                if categorias is not None:
+                    self.actualizar_categorias(categorias)
+                self.aplicar_cambios(resultado["productos"], resultado["eliminados"])
+            
+            self.version_catalogo = resultado["version"]
+            self.guardar_espejo()
+            
+            # Actualizar barra de estado
+            self.status_bar.config(text=f"Productos cargados: {len(self.productos)}")
+        else:
+            messagebox.showerror("Error", resultado["mensaje"])
             self.status_bar.config(text="Error al cargar productos")
     
+    def reemplazar_catalogo(self, productos, categorias, indice):
+        """
+        Sustituye el catálogo mostrado por uno completo.
+        
+        Args:
+            productos (list): Productos del catálogo.
+            categorias (list): Categorías del catálogo, ordenadas.
+            indice (IndiceBusqueda): Índice de búsqueda del catálogo.
+        """
+        self.productos = {p["id"]: p for p in productos}
+        self.indice = indice
+        self.actualizar_categorias(categorias)
+        
+        # Aplicar filtros actuales
+        self.filtrar_productos()
+    
+    def actualizar_categorias(self, categorias):
+        """
+        Actualiza las opciones del selector de categoría.
+        
+        Args:
+            categorias (list): Categorías del catálogo, ordenadas.
+        """
+        self.categorias = ["Todas"] + categorias
+        self.category_combobox.config(values=self.categorias)
+    
+    def aplicar_cambios(self, productos, eliminados):
+        """
+        Aplica al catálogo mostrado los cambios recibidos del servidor.
+        
+        Args:
+            productos (list): Productos nuevos o modificados.
+            eliminados (list): IDs de los productos eliminados.
+        """
+        if not productos and not eliminados:
+            return
+        
+        for datos in productos:
+            p = self.productos.get(datos["id"])
+            if p is None:
+                p = dict(datos)
+                self.productos[p["id"]] = p
+            else:
+                p.update(datos)
+            self.indice.actualizar(p)
+        
+        for id_producto in eliminados:
+            if self.productos.pop(id_producto, None) is not None:
+                self.indice.eliminar(id_producto)
+        
+        # Refrescar la tabla conservando el filtro y la posición
+        self.filtrar_productos()
+    
+    def programar_filtrado(self, *args):
+        """
+        Programa el filtrado tras una pausa al escribir, de modo que escribir
+        una palabra provoque un solo filtrado.
+        """
+        if self.filtro_programado is not None:
+            self.root.after_cancel(self.filtro_programado)
+        
+        self.filtro_programado = self.root.after(RETARDO_BUSQUEDA_MS, self.filtrar_productos)
+    
     def filtrar_productos(self, event=None):
         """
         Filtra los productos según los criterios de búsqueda.
         """
-        # Limpiar tabla actual
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        if self.filtro_programado is not None:
+            self.root.after_cancel(self.filtro_programado)
+            self.filtro_programado = None
         
         # Obtener criterios de filtrado
         busqueda = self.search_var.get().lower()
         categoria = self.category_var.get()
         
-        # Aplicar filtros
-        productos_filtrados = []
-        for p in self.productos:
-            # Filtro de categoría
-            if categoria != "Todas" and p["categoria"] != categoria:
-                continue
+        # Si solo cambiaron los datos (no el filtro), conservar la posición
+        criterio = (busqueda, categoria)
+        filtro_cambiado = criterio != self.criterio_filtro
+        self.criterio_filtro = criterio
+        
+        # Aplicar filtros: texto y categoría se resuelven con el índice, sin
+        # recorrer el catálogo
+        if busqueda or categoria != "Todas":
+            ids = self.indice.filtrar(busqueda, None if categoria == "Todas" else categoria)
+            productos_filtrados = [self.productos[id_producto] for id_producto in ids]
+        else:
+            productos_filtrados = list(self.productos.values())
+        self.productos_filtrados = productos_filtrados
+        self.ids_filtrados = set(p["id"] for p in productos_filtrados)
+        
+        if len(productos_filtrados) > UMBRAL_TABLA_VIRTUAL:
+            # Catálogo grande: dibujar solo la ventana visible
+            self.activar_tabla_virtual(True)
+            if filtro_cambiado:
+                self.inicio_virtual = 0
+            self.renderizar_ventana()
+        else:
+            self.activar_tabla_virtual(False)
+            self.aplicar_diferencias(productos_filtrados)
+        
+        # Actualizar barra de estado
+        self.status_bar.config(text=f"Productos mostrados: {len(productos_filtrados)}")
+    
+    def aplicar_resultado_local(self, resultado, eliminado=False):
+        """
+        Actualiza el catálogo local y la fila afectada con el producto que
+        devuelve el servidor tras una operación, sin volver a descargar el
+        catálogo completo.
+        
+        Args:
+            resultado (dict): Respuesta exitosa de la operación remota.
+            eliminado (bool): True si la operación eliminó el producto.
+        """
+        # Venta guardada en la cola local: se verá al sincronizar con el servidor
+        if resultado.get("pendiente"):
+            return
+        
+        if eliminado and "id" in resultado:
+            self.aplicar_producto_local({"id": resultado["id"]}, eliminado=True)
+        elif not eliminado and "producto" in resultado:
+            self.aplicar_producto_local(resultado["producto"])
+        else:
+            # Servidor sin datos del producto en la respuesta
+            self.cargar_productos()
+    
+    def aplicar_producto_local(self, datos, eliminado=False):
+        """
+        Aplica el cambio de un producto a self.productos, al índice de
+        búsqueda y a la tabla.
+        
+        Args:
+            datos (dict): Datos actuales del producto (al menos "id" si se
+                eliminó).
+            eliminado (bool): True si el producto ya no existe.
+        """
+        # Una carga en curso pudo leer el catálogo antes de este cambio y
+        # sobrescribirlo con el producto anterior: su resultado se descarta
+        # y al terminar se repite la carga
+        if self.cargando:
+            self.generacion_carga += 1
+        
+        p = self.productos.get(datos["id"])
+        
+        if eliminado:
+            if p is None:
+                return
+            del self.productos[datos["id"]]
+            self.indice.eliminar(datos["id"])
+            self.actualizar_fila(p, eliminado=True)
+        else:
+            if p is None:
+                p = dict(datos)
+                self.productos[p["id"]] = p
+            else:
+                # Actualizar en el mismo diccionario que comparten la lista
+                # filtrada y la tabla virtual
+                p.update(datos)
+            
+            self.indice.actualizar(p)
+            
+            if p["categoria"] not in self.categorias:
+                self.categorias = ["Todas"] + sorted(self.categorias[1:] + [p["categoria"]])
+                self.category_combobox.config(values=self.categorias)
+            
+            self.actualizar_fila(p)
+        
+        self.status_bar.config(text=f"Productos mostrados: {len(self.productos_filtrados)}")
+    
+    def cumple_filtro(self, p):
+        """
+        Indica si un producto cumple el filtro actual de búsqueda y categoría.
+        
+        El producto debe estar ya actualizado en el índice de búsqueda.
+        
+        Args:
+            p (dict): Datos del producto.
+        
+        Returns:
+            bool: True si el producto debe mostrarse.
+        """
+        busqueda, categoria = self.criterio_filtro
+        
+        # Filtro de categoría
+        if categoria != "Todas" and p["categoria"] != categoria:
+            return False
+        
+        # Filtro de búsqueda
+        if busqueda and not self.indice.coincide(p["id"], busqueda):
+            return False
+        
+        return True
+    
+    def actualizar_fila(self, p, eliminado=False):
+        """
+        Refleja en la tabla el cambio de un único producto sin recorrer el
+        resto del catálogo.
+        
+        El diccionario del producto debe ser el mismo objeto guardado en
+        self.productos, ya actualizado.
+        
+        Args:
+            p (dict): Datos del producto.
+            eliminado (bool): True si el producto se eliminó del catálogo.
+        """
+        if self.criterio_filtro is None:
+            return
+        
+        visible = not eliminado and self.cumple_filtro(p)
+        mostrado = p["id"] in self.ids_filtrados
+        
+        # La lista filtrada comparte los diccionarios de self.productos: solo
+        # hay que tocarla si el producto entra o sale del filtro
+        if visible and not mostrado:
+            self.productos_filtrados.append(p)
+            self.ids_filtrados.add(p["id"])
+        elif not visible and mostrado:
+            self.productos_filtrados = [q for q in self.productos_filtrados if q["id"] != p["id"]]
+            self.ids_filtrados.discard(p["id"])
+        
+        if self.tabla_virtual:
+            self.renderizar_ventana()
+            return
+        
+        fila = self.filas_tree.get(p["id"])
+        
+        if not visible:
+            if fila is not None:
+                self.tree.delete(fila)
+                del self.filas_tree[p["id"]]
+                del self.valores_filas[p["id"]]
+            return
+        
+        valores = self.valores_fila(p)
+        
+        if fila is None:
+            self.filas_tree[p["id"]] = self.tree.insert("", tk.END, values=valores)
+        elif self.valores_filas[p["id"]] != valores:
+            self.tree.item(fila, values=valores)
+        
+        self.valores_filas[p["id"]] = valores
+    
+    def aplicar_diferencias(self, productos_filtrados):
+        """
+        Actualiza la tabla normal aplicando solo las diferencias con lo que
+        ya muestra: elimina las filas sobrantes, inserta las nuevas y cambia
+        los valores de las que se modificaron. La selección y la posición de
+        desplazamiento se conservan.
+        
+        Args:
+            productos_filtrados (list): Productos que deben mostrarse, en orden.
+        """
+        # Eliminar las filas de productos que ya no se muestran
+        sobrantes = [id_ for id_ in self.filas_tree if id_ not in self.ids_filtrados]
+        if sobrantes:
+            self.tree.delete(*[self.filas_tree.pop(id_) for id_ in sobrantes])
+            for id_ in sobrantes:
+                del self.valores_filas[id_]
+        
+        # Insertar las filas nuevas y actualizar las modificadas
+        for indice, p in enumerate(productos_filtrados):
+            valores = self.valores_fila(p)
+            fila = self.filas_tree.get(p["id"])
             
-            # Filtro de búsqueda
-            if busqueda and not (
-                busqueda in str(p["id"]).lower() or
-                busqueda in p["nombre"].lower() or
-                busqueda in p["categoria"].lower()
-            ):
+            if fila is None:
+                self.filas_tree[p["id"]] = self.tree.insert("", indice, values=valores)
+            elif self.valores_filas[p["id"]] != valores:
+                self.tree.item(fila, values=valores)
+            else:
                 continue
             
-            productos_filtrados.append(p)
-        
-        # Insertar productos filtrados
-        for p in productos_filtrados:
-            self.tree.insert(
-                "", tk.END,
-                values=(
-                    p["id"],
-                    p["nombre"],
-                    f"${p['precio']:.2f}",
-                    p["stock"],
-                    p["categoria"]
-                )
-            )
+            self.valores_filas[p["id"]] = valores
+    
+    def valores_fila(self, p):
+        """
+        Devuelve los valores de la fila de la tabla para un producto.
         
-        # Actualizar barra de estado
-        self.status_bar.config(text=f"Productos mostrados: {len(productos_filtrados)}")
+        Args:
+            p (dict): Datos del producto.
+        
+        Returns:
+            tuple: Valores de las columnas.
+        """
+        return (
+            p["id"],
+            p["nombre"],
+            f"${p['precio']:.2f}",
+            p["stock"],
+            p["categoria"]
+        )
+    
+    def activar_tabla_virtual(self, activar):
+        """
+        Cambia entre la tabla normal y la tabla virtual.
+        
+        En modo virtual la tabla contiene solo unas pocas filas que se
+        reutilizan al desplazarse, y la barra de desplazamiento recorre la
+        lista filtrada en memoria en lugar de las filas de la tabla.
+        
+        Args:
+            activar (bool): True para el modo virtual, False para el normal.
+        """
+        if activar == self.tabla_virtual:
+            return
+        
+        self.tabla_virtual = activar
+        self.tree.delete(*self.tree.get_children())
+        self.filas_virtuales = []
+        self.filas_tree = {}
+        self.valores_filas = {}
+        
+        if activar:
+            self.tree.configure(yscrollcommand="")
+            self.vsb.config(command=self.desplazar_virtual)
+        else:
+            self.tree.configure(yscrollcommand=self.vsb.set)
+            self.vsb.config(command=self.tree.yview)
+    
+    def filas_visibles(self):
+        """
+        Calcula cuántas filas caben en la zona visible de la tabla.
+        
+        Returns:
+            int: Número de filas visibles (al menos 1).
+        """
+        alto_fila = self.style.lookup("Treeview", "rowheight") or 20
+        # Restar aproximadamente el alto del encabezado
+        alto = self.tree.winfo_height() - int(alto_fila) - 5
+        return max(1, alto // int(alto_fila))
+    
+    def renderizar_ventana(self):
+        """
+        Dibuja en la tabla virtual las filas de la ventana actual.
+        """
+        total = len(self.productos_filtrados)
+        visibles = self.filas_visibles()
+        
+        self.inicio_virtual = max(0, min(self.inicio_virtual, total - visibles))
+        fin = min(total, self.inicio_virtual + visibles + FILAS_MARGEN_VIRTUAL)
+        ventana = self.productos_filtrados[self.inicio_virtual:fin]
+        
+        # Ajustar el número de filas reutilizables al tamaño de la ventana
+        while len(self.filas_virtuales) < len(ventana):
+            self.filas_virtuales.append(self.tree.insert("", tk.END))
+        while len(self.filas_virtuales) > len(ventana):
+            self.tree.delete(self.filas_virtuales.pop())
+        
+        seleccion = None
+        for fila, p in zip(self.filas_virtuales, ventana):
+            self.tree.item(fila, values=self.valores_fila(p))
+            if p["id"] == self.id_seleccionado:
+                seleccion = fila
+        
+        # Mantener seleccionado el producto aunque cambie de fila
+        if seleccion:
+            self.tree.selection_set(seleccion)
+            self.tree.focus(seleccion)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+        
+        self.tree.yview_moveto(0)
+        
+        if total:
+            self.vsb.set(self.inicio_virtual / total, min(1.0, (self.inicio_virtual + visibles) / total))
+        else:
+            self.vsb.set(0, 1)
+    
+    def desplazar_virtual(self, *args):
+        """
+        Desplaza la ventana de la tabla virtual (comando de la scrollbar).
+        
+        Args:
+            *args: ("moveto", fracción) o ("scroll", n, "units" | "pages").
+        """
+        total = len(self.productos_filtrados)
+        visibles = self.filas_visibles()
+        
+        if args[0] == "moveto":
+            inicio = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            paso = visibles if args[2] == "pages" else 1
+            inicio = self.inicio_virtual + int(args[1]) * paso
+        else:
+            return
+        
+        inicio = max(0, min(inicio, total - visibles))
+        
+        if inicio != self.inicio_virtual:
+            self.inicio_virtual = inicio
+            self.renderizar_ventana()
+    
+    def rueda_tabla_virtual(self, event):
+        """
+        Desplaza la tabla virtual con la rueda del ratón.
+        """
+        if not self.tabla_virtual:
+            return None
+        
+        if event.num == 4 or event.delta > 0:
+            self.desplazar_virtual("scroll", -3, "units")
+        else:
+            self.desplazar_virtual("scroll", 3, "units")
+        
+        return "break"
+    
+    def tecla_tabla_virtual(self, event):
+        """
+        Desplaza la tabla virtual al navegar con el teclado más allá de los
+        bordes de la ventana visible.
+        """
+        if not self.tabla_virtual:
+            return None
+        
+        if event.keysym in ("Prior", "Next"):
+            self.desplazar_virtual("scroll", -1 if event.keysym == "Prior" else 1, "pages")
+            return "break"
+        
+        seleccion = self.tree.selection()
+        if not seleccion or seleccion[0] not in self.filas_virtuales:
+            return None
+        
+        posicion = self.filas_virtuales.index(seleccion[0])
+        indice = self.inicio_virtual + posicion + (1 if event.keysym == "Down" else -1)
+        
+        if posicion == 0 and event.keysym == "Up" or \
+                posicion >= self.filas_visibles() - 1 and event.keysym == "Down":
+            if 0 <= indice < len(self.productos_filtrados):
+                self.id_seleccionado = self.productos_filtrados[indice]["id"]
+                self.desplazar_virtual("scroll", 1 if event.keysym == "Down" else -1, "units")
+            return "break"
+        
+        return None
+    
+    def recordar_seleccion(self, event=None):
+        """
+        Guarda el ID del producto seleccionado para conservar la selección
+        cuando la tabla virtual reutiliza sus filas.
+        """
+        seleccion = self.tree.selection()
+        if seleccion:
+            valores = self.tree.item(seleccion[0], "values")
+            if valores:
+                self.id_seleccionado = int(valores[0])
     
     def mostrar_detalles_producto(self, event):
         """
@@ -431,6 +1104,9 @@ class InterfazGUI:
         item = self.tree.item(seleccion[0])
         id_producto = int(item["values"][0])
         
+        if not self.comprobar_conexion():
+            return
+        
         # Obtener detalles del producto
         resultado = self.cliente.obtener_producto(id_producto)
         
@@ -501,6 +1177,9 @@ class InterfazGUI:
         """
         Abre la ventana para agregar un nuevo producto.
         """
+        if not self.comprobar_conexion():
+            return
+        
         # Crear ventana de agregar producto
         agregar_window = tk.Toplevel(self.root)
         agregar_window.title("Agregar Nuevo Producto")
@@ -621,7 +1300,7 @@ class InterfazGUI:
                 if resultado["exito"]:
                     messagebox.showinfo("Éxito", resultado["mensaje"])
                     agregar_window.destroy()
-                    self.cargar_productos()
+                    self.aplicar_resultado_local(resultado)
                 else:
                     messagebox.showerror("Error", resultado["mensaje"])
             
@@ -652,6 +1331,9 @@ class InterfazGUI:
             id_producto (int, optional): ID del producto a modificar. Si es None,
                                          se utilizará el seleccionado en la tabla.
         """
+        if not self.comprobar_conexion():
+            return
+        
         if id_producto is None:
             # Obtener el ítem seleccionado
             seleccion = self.tree.selection()
@@ -727,7 +1409,7 @@ class InterfazGUI:
         categoria_frame = ttk.Frame(form_frame)
         categoria_frame.pack(fill=tk.X, pady=5)
         ttk.Label(categoria_frame, text="Categoría:", width=10).pack(side=tk.LEFT)
-        
+
 # Si hay categorías disponibles (excepto "Todas"), mostrarlas en el combobox
         categorias_unicas = [cat for cat in self.categorias if cat != "Todas"]
         if categorias_unicas:
@@ -786,7 +1468,7 @@ class InterfazGUI:
                 if resultado["exito"]:
                     messagebox.showinfo("Éxito", resultado["mensaje"])
                     modificar_window.destroy()
-                    self.cargar_productos()
+                    self.aplicar_resultado_local(resultado)
                 else:
                     messagebox.showerror("Error", resultado["mensaje"])
             
@@ -813,6 +1495,9 @@ class InterfazGUI:
         """
         Elimina un producto seleccionado.
         """
+        if not self.comprobar_conexion():
+            return
+        
         # Obtener el ítem seleccionado
         seleccion = self.tree.selection()
         if not seleccion:
@@ -837,7 +1522,7 @@ class InterfazGUI:
         
         if resultado["exito"]:
             messagebox.showinfo("Éxito", resultado["mensaje"])
-            self.cargar_productos()
+            self.aplicar_resultado_local(resultado, eliminado=True)
         else:
             messagebox.showerror("Error", resultado["mensaje"])
     
@@ -849,6 +1534,9 @@ class InterfazGUI:
             id_producto (int, optional): ID del producto a vender. Si es None,
                                         se solicita al usuario que lo ingrese.
         """
+        if not self.comprobar_conexion():
+            return
+        
         if id_producto is None:
             # Obtener el ítem seleccionado en la tabla
             seleccion = self.tree.selection()
@@ -985,7 +1673,7 @@ class InterfazGUI:
                 if resultado["exito"]:
                     messagebox.showinfo("Éxito", resultado["mensaje"])
                     vender_window.destroy()
-                    self.cargar_productos()
+                    self.aplicar_resultado_local(resultado)
                 else:
                     messagebox.showerror("Error", resultado["mensaje"])
             
@@ -3,11 +3,18 @@ Punto de entrada principal para el cliente del sistema de inventario.
 """
 import sys
 from cliente.interfaz_cli import InterfazCLI
+from cliente.comandos import ejecutar_comando
 
 def main():
     """
     Función principal para iniciar el cliente.
+    
+    Sin argumentos se abre el menú interactivo; con argumentos se ejecuta
+    un comando no interactivo (ver cliente.comandos).
     """
+    if len(sys.argv) > 1:
+        sys.exit(ejecutar_comando(sys.argv[1:]))
+    
     print("Iniciando cliente del sistema de inventario...")
     
     try:
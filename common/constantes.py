@@ -12,6 +12,138 @@ PUERTO_SERVIDOR = 9090
 # Ruta para el archivo de persistencia del inventario
 RUTA_DATOS = "servidor/datos/inventario.json"
 
+# Ruta de la copia local del catálogo que guarda la interfaz gráfica
+RUTA_ESPEJO_CATALOGO = "cliente/datos/catalogo_local.json"
+
+# Productos de la copia local que se muestran al iniciar, antes de terminar
+# de leer el resto y de construir su índice de búsqueda
+TAMANO_PAGINA_ESPEJO = 1000
+
+# Cola local de ventas registradas sin conexión y segundos entre intentos
+# de enviarlas al servidor
+RUTA_COLA_VENTAS = "cliente/datos/ventas_pendientes.jsonl"
+INTERVALO_SINCRONIZACION_VENTAS = 5
+
+# Timeout (en segundos) de la conexión con el servidor y de las llamadas
+# remotas del cliente
+TIMEOUT_CONEXION = 2
+
+# Timeout (en segundos) de las llamadas que recorren el catálogo o una
+# parte grande de él (listados, cambios, lotes y exportaciones)
+TIMEOUT_LLAMADA_LARGA = 60
+
+# Reconexión automática del cliente: número de intentos y esperas
+# (en segundos) del backoff exponencial con jitter
+RECONEXION_INTENTOS = 6
+RECONEXION_ESPERA_BASE = 0.2
+RECONEXION_ESPERA_MAX = 5.0
+
+# Reintentos de una llamada tras recuperar la conexión (solo lecturas y
+# operaciones con identificador de solicitud; nunca tras un timeout, porque
+# el servidor puede seguir trabajando en ella)
+REINTENTOS_LLAMADA = 2
+
+# Segundos durante los que, tras fallar una reconexión, las llamadas del
+# cliente fallan enseguida como "sin conexión"; pasado ese tiempo se hace un
+# único intento de reconexión antes de volver a esperar
+SIN_CONEXION_ESPERA = 10
+
+# Caché de productos del cliente: tamaño máximo y segundos durante los que
+# una entrada se usa sin revalidar su versión con el servidor
+CACHE_MAX_PRODUCTOS = 1000
+CACHE_TTL = 2.0
+
+# Máximo de operaciones enviadas en un mismo mensaje por un lote del cliente
+TAMANO_MAX_LOTE = 500
+
+# Máximo de llamadas simultáneas en curso del cliente asíncrono
+MAX_LLAMADAS_EN_VUELO = 16
+
+# Tabla de deduplicación de solicitudes en el servidor: número máximo de
+# resultados recordados y segundos que se conserva cada uno (solo en
+# memoria: no protege los reintentos que llegan tras reiniciar el servidor)
+IDEMPOTENCIA_MAX_ENTRADAS = 10000
+IDEMPOTENCIA_TTL = 600
+
+# Segundos que un reintento espera en el servidor a que termine la
+# solicitud original antes de responder "servidor ocupado"
+IDEMPOTENCIA_ESPERA_MAX = 2.0
+
+# Interfaz gráfica: a partir de este número de filas la tabla pasa a modo
+# virtual (solo se dibujan las filas visibles más un pequeño margen)
+UMBRAL_TABLA_VIRTUAL = 2000
+FILAS_MARGEN_VIRTUAL = 5
+
+# Milisegundos sin escribir antes de aplicar la búsqueda en la interfaz
+RETARDO_BUSQUEDA_MS = 250
+
+# Exportación del catálogo: productos por página y segundos sin leer tras
+# los que el servidor cierra una exportación abandonada
+TAMANO_PAGINA_EXPORTACION = 1000
+EXPORTACION_TTL = 300
+
+# Segundos entre consultas del cliente al estado de una exportación a
+# archivo que se ejecuta en el servidor
+EXPORTACION_INTERVALO_CONSULTA = 0.5
+
+# Publicación de las métricas del servidor en texto plano: archivo reescrito
+# cada METRICAS_INTERVALO segundos y/o puerto HTTP (None para desactivar),
+# que escucha en METRICAS_HOST (None para usar la dirección del servidor)
+METRICAS_ARCHIVO = None
+METRICAS_PUERTO = None
+METRICAS_INTERVALO = 10
+METRICAS_HOST = None
+
+# Clave que deben presentar las operaciones de administración del servidor
+# (perfilado y memoria); con None esas operaciones quedan desactivadas
+TOKEN_ADMIN = None
+
+# Registro del servidor: archivos (que rotan al llegar a REGISTRO_MAX_BYTES,
+# conservando REGISTRO_COPIAS anteriores) y milisegundos a partir de los
+# cuales una llamada se anota como lenta (None para no anotarlas)
+RUTA_REGISTRO = "servidor/datos/registro/servidor.log"
+RUTA_REGISTRO_LENTAS = "servidor/datos/registro/lentas.log"
+REGISTRO_MAX_BYTES = 10 * 1024 * 1024
+REGISTRO_COPIAS = 5
+UMBRAL_LENTAS_MS = 200
+
+# Archivos de trazas de las llamadas (formato de eventos de Chrome) del
+# cliente y del servidor; con None las trazas quedan desactivadas. Se
+# reúnen con: python -m common.trazas combinado.json <archivos>
+RUTA_TRAZAS_CLIENTE = None
+RUTA_TRAZAS_SERVIDOR = None
+
+# Control de admisión del servidor: llamadas atendidas a la vez (None sin
+# límite) y por cliente (None sin límite), llamadas que
+# pueden esperar turno y segundos que esperan como mucho antes de
+# rechazarse con "servidor ocupado". Desactivado por defecto: las llamadas
+# en espera siguen ocupando un hilo del daemon, así que limita el trabajo
+# simultáneo pero no las conexiones
+ADMISION_MAX_CONCURRENTES = None
+ADMISION_MAX_POR_CLIENTE = None
+ADMISION_MAX_COLA = 32
+ADMISION_ESPERA_MAX = 1.0
+
+# Anotación de Pyro con la que cada cliente (y sus clones) se identifica
+# ante el control de admisión
+ANOTACION_CLIENTE = "CLID"
+
+# Veces que el cliente repite una llamada rechazada por servidor ocupado,
+# esperando lo que indique el servidor
+REINTENTOS_OCUPADO = 3
+
+# Ejecución del servidor Pyro (se pueden cambiar al arrancar con opciones
+# de línea de comandos o variables de entorno INVENTARIO_*): tipo de
+# servidor ("thread", un hilo por conexión, o "multiplex", un solo hilo con
+# select), hilos máximos y mínimos del pool, segundos de timeout de los
+# sockets (0 sin timeout) y opciones TCP
+SERVIDOR_TIPO = "thread"
+SERVIDOR_HILOS = 40
+SERVIDOR_HILOS_MIN = 4
+SERVIDOR_TIMEOUT = 0.0
+SERVIDOR_TCP_NODELAY = False
+SERVIDOR_SOCK_REUSE = True
+
 # Configuración del Name Server de Pyro
 NS_HOST = "localhost"
 NS_PORT = 9090
@@ -0,0 +1,58 @@
+"""
+Escritura de productos en CSV o JSON por línea, compartida por la
+exportación del servidor y la del cliente.
+"""
+import csv
+import json
+
+CAMPOS_PRODUCTO = ["id", "nombre", "precio", "stock", "categoria"]
+FORMATOS_EXPORTACION = ("jsonl", "csv")
+
+
+class EscritorProductos:
+    """
+    Escribe productos uno a uno en un archivo de texto abierto, sin
+    acumularlos en memoria.
+    """
+    
+    def __init__(self, archivo, formato):
+        """
+        Inicializa el escritor y, en CSV, escribe la cabecera.
+        
+        Args:
+            archivo: Archivo de texto abierto para escritura.
+            formato (str): "jsonl" o "csv".
+        """
+        if formato not in FORMATOS_EXPORTACION:
+            raise ValueError(f"Formato de exportación no válido: {formato}")
+        
+        self.archivo = archivo
+        self.total = 0
+        self._csv = None
+        
+        if formato == "csv":
+            self._csv = csv.DictWriter(archivo, fieldnames=CAMPOS_PRODUCTO)
+            self._csv.writeheader()
+    
+    def escribir(self, producto):
+        """
+        Escribe un producto.
+        
+        Args:
+            producto (dict): Datos del producto.
+        """
+        if self._csv is not None:
+            self._csv.writerow(producto)
+        else:
+            self.archivo.write(json.dumps(producto, ensure_ascii=False) + "\n")
+        self.total += 1
+    
+    def escribir_todos(self, productos):
+        """
+        Escribe varios productos.
+        
+        Args:
+            productos (iterable): Diccionarios de productos.
+        """
+        for producto in productos:
+            self.escribir(producto)
@@ -0,0 +1,307 @@
+"""
+Trazas de las llamadas entre el cliente y el servidor, en el formato de
+eventos de Chrome (Trace Event Format), que abren chrome://tracing y
+Perfetto.
+
+El cliente asigna a cada llamada un identificador de traza y lo envía al
+servidor, junto con la hora de envío, en una anotación de Pyro; cada lado
+escribe sus tramos en su propio archivo y combinar() los reúne en uno solo
+para verlos en la misma línea de tiempo.
+
+Uso:
+    python -m common.trazas combinado.json trazas_cliente.json trazas_servidor.json
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import atexit
+import threading
+
+# Clave de la anotación de Pyro con el contexto de la traza (4 caracteres)
+ANOTACION_TRAZA = "TRAZ"
+
+# Diferencia entre el reloj de pared y perf_counter, para situar en la misma
+# línea de tiempo los tramos de procesos distintos de la misma máquina
+_DESFASE = time.time() - time.perf_counter()
+
+_registro = None
+_local = threading.local()
+
+
+class RegistroTrazas:
+    """
+    Archivo de trazas escrito por un hilo aparte: emitir un evento solo lo
+    encola, sin esperar al disco.
+    
+    El archivo es un array JSON al que se añade un evento por línea; el
+    formato admite que falte el corchete de cierre, así que se puede abrir
+    aunque el proceso siga en marcha o haya terminado de forma abrupta.
+    """
+    
+    def __init__(self, ruta_archivo, nombre_proceso):
+        """
+        Abre el archivo de trazas y arranca el hilo escritor.
+        
+        Args:
+            ruta_archivo (str): Ruta del archivo de trazas.
+            nombre_proceso (str): Nombre con el que se muestra el proceso.
+        """
+        self.ruta_archivo = ruta_archivo
+        self.pid = os.getpid()
+        self._cola = queue.SimpleQueue()
+        
+        os.makedirs(os.path.dirname(ruta_archivo) or ".", exist_ok=True)
+        nuevo = not os.path.exists(ruta_archivo) or os.path.getsize(ruta_archivo) == 0
+        self._archivo = open(ruta_archivo, 'a', encoding='utf-8')
+        if nuevo:
+            self._archivo.write("[\n")
+        
+        self.emitir({
+            "name": "process_name", "ph": "M", "pid": self.pid,
+            "args": {"name": f"{nombre_proceso} ({self.pid})"}
+        })
+        
+        self._hilo = threading.Thread(target=self._escribir, name="trazas")
+        self._hilo.daemon = True
+        self._hilo.start()
+    
+    def emitir(self, evento):
+        """
+        Encola un evento para escribirlo.
+        
+        Args:
+            evento (dict): Evento en el formato de Chrome.
+        """
+        self._cola.put(evento)
+    
+    def _escribir(self):
+        """
+        Escribe los eventos encolados hasta recibir None.
+        """
+        while True:
+            evento = self._cola.get()
+            if evento is None:
+                break
+            
+            self._archivo.write(json.dumps(evento, ensure_ascii=False) + ",\n")
+            if self._cola.empty():
+                self._archivo.flush()
+        
+        self._archivo.close()
+    
+    def cerrar(self):
+        """
+        Escribe los eventos pendientes y cierra el archivo.
+        """
+        self._cola.put(None)
+        self._hilo.join(timeout=5)
+
+
+def configurar(ruta_archivo, nombre_proceso):
+    """
+    Activa las trazas del proceso.
+    
+    Args:
+        ruta_archivo (str): Ruta del archivo de trazas.
+        nombre_proceso (str): Nombre con el que se muestra el proceso.
+    
+    Returns:
+        RegistroTrazas: Registro activo.
+    """
+    global _registro
+    
+    if _registro is None:
+        _registro = RegistroTrazas(ruta_archivo, nombre_proceso)
+        atexit.register(_registro.cerrar)
+    
+    return _registro
+
+
+def activas():
+    """
+    Indica si las trazas están activadas en este proceso.
+    """
+    return _registro is not None
+
+
+def nuevo_id():
+    """
+    Genera un identificador de traza.
+    """
+    return uuid.uuid4().hex[:16]
+
+
+def microsegundos(instante):
+    """
+    Convierte un instante de perf_counter a microsegundos de reloj de pared.
+    """
+    return round((instante + _DESFASE) * 1e6, 1)
+
+
+def a_perf_counter(instante):
+    """
+    Convierte un instante de reloj de pared (segundos) a perf_counter.
+    """
+    return instante - _DESFASE
+
+
+def ahora():
+    """
+    Devuelve el instante actual en segundos de reloj de pared.
+    """
+    return time.perf_counter() + _DESFASE
+
+
+def iniciar_contexto(id_traza):
+    """
+    Asocia una traza al hilo actual: las llamadas remotas que haga la
+    llevarán en su anotación.
+    """
+    _local.id_traza = id_traza
+
+
+def terminar_contexto():
+    """
+    Quita la traza asociada al hilo actual.
+    """
+    _local.id_traza = None
+
+
+def anotacion():
+    """
+    Devuelve la anotación de Pyro para la traza del hilo actual.
+    
+    Returns:
+        bytes: Identificador de traza y hora de envío, o None si el hilo no
+               tiene traza.
+    """
+    id_traza = getattr(_local, "id_traza", None)
+    if id_traza is None:
+        return None
+    return f"{id_traza}:{ahora():.6f}".encode("ascii")
+
+
+def leer_anotacion(datos):
+    """
+    Interpreta una anotación de traza recibida.
+    
+    Args:
+        datos (bytes): Valor de la anotación.
+    
+    Returns:
+        tuple: (id_traza, hora de envío en segundos), o None si no es válida.
+    """
+    try:
+        id_traza, envio = bytes(datos).decode("ascii").split(":")
+        return id_traza, float(envio)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def tramo(nombre, inicio, fin, id_traza, categoria, argumentos=None):
+    """
+    Emite un tramo (evento completo) en el hilo actual.
+    
+    Args:
+        nombre (str): Nombre del tramo.
+        inicio (float): Inicio en segundos de perf_counter.
+        fin (float): Fin en segundos de perf_counter.
+        id_traza (str): Identificador de la traza.
+        categoria (str): Categoría ("cliente", "servidor"...).
+        argumentos (dict, optional): Datos adicionales del tramo.
+    """
+    if _registro is None:
+        return
+    
+    _registro.emitir({
+        "name": nombre,
+        "cat": categoria,
+        "ph": "X",
+        "ts": microsegundos(inicio),
+        "dur": round((fin - inicio) * 1e6, 1),
+        "pid": _registro.pid,
+        "tid": threading.get_ident(),
+        "args": dict(argumentos or {}, id_traza=id_traza)
+    })
+
+
+def flujo(fase, instante, id_traza):
+    """
+    Emite un extremo de la flecha que une el tramo del cliente con el del
+    servidor.
+    
+    Args:
+        fase (str): "s" en el origen (cliente) o "f" en el destino (servidor).
+        instante (float): Instante en segundos de perf_counter.
+        id_traza (str): Identificador de la traza.
+    """
+    if _registro is None:
+        return
+    
+    evento = {
+        "name": "llamada", "cat": "flujo", "ph": fase, "id": id_traza,
+        "ts": microsegundos(instante), "pid": _registro.pid, "tid": threading.get_ident()
+    }
+    if fase == "f":
+        evento["bp"] = "e"
+    _registro.emitir(evento)
+
+
+def leer_eventos(ruta):
+    """
+    Lee los eventos de un archivo de trazas, aunque no esté cerrado.
+    
+    Args:
+        ruta (str): Ruta del archivo.
+    
+    Returns:
+        list: Eventos del archivo.
+    """
+    eventos = []
+    
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        for linea in archivo:
+            linea = linea.strip().rstrip(",")
+            if linea in ("", "[", "]"):
+                continue
+            try:
+                eventos.append(json.loads(linea))
+            except json.JSONDecodeError:
+                pass
+    
+    return eventos
+
+
+def combinar(destino, rutas):
+    """
+    Reúne varios archivos de trazas en uno solo, ordenado por tiempo.
+    
+    Args:
+        destino (str): Archivo a escribir.
+        rutas (list): Archivos de trazas de origen.
+    
+    Returns:
+        int: Número de eventos escritos.
+    """
+    eventos = []
+    for ruta in rutas:
+        eventos.extend(leer_eventos(ruta))
+    
+    eventos.sort(key=lambda evento: evento.get("ts", 0))
+    
+    with open(destino, 'w', encoding='utf-8') as archivo:
+        json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, archivo, ensure_ascii=False)
+    
+    return len(eventos)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(__doc__.strip().splitlines()[-1].strip())
+        sys.exit(2)
+    
+    total = combinar(sys.argv[1], sys.argv[2:])
+    print(f"{total} eventos escritos en {sys.argv[1]}")
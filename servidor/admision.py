@@ -0,0 +1,225 @@
+"""
+Control de admisión de las llamadas al servidor.
+
+Limita las llamadas que se atienden a la vez, en total y por cliente, y
+deja esperar a un número acotado de ellas. Cuando la espera se llena (o
+tarda demasiado) la llamada se rechaza enseguida con un resultado "servidor
+ocupado" que indica cuándo reintentar, en lugar de dejar al cliente colgado
+hasta que venza su timeout.
+"""
+import time
+import threading
+import Pyro4
+from collections import deque
+from common.constantes import ANOTACION_CLIENTE
+
+# Peso de cada llamada en la media móvil de su duración
+PESO_MEDIA_DURACION = 0.1
+
+# Límites de la espera sugerida al cliente antes de reintentar (segundos)
+REINTENTO_MIN = 0.01
+REINTENTO_MAX = 5.0
+
+
+class _Espera:
+    """
+    Llamada que aguarda en la cola de admisión.
+    """
+    
+    __slots__ = ("cliente", "admitida")
+    
+    def __init__(self, cliente):
+        self.cliente = cliente
+        self.admitida = threading.Event()
+
+
+class ControlAdmision:
+    """
+    Decide si una llamada se atiende, espera su turno o se rechaza.
+    
+    Las llamadas se admiten mientras haya menos de max_concurrentes en
+    curso; las demás esperan en orden de llegada, como mucho max_cola a la
+    vez y durante espera_max segundos. Cada cliente puede tener a lo sumo
+    max_por_cliente llamadas en curso o en espera; un cliente se reconoce
+    por el identificador que envía en la anotación ANOTACION_CLIENTE (el
+    mismo en todas sus conexiones), o si no lo envía por su conexión, de
+    modo que los clientes de un mismo equipo no comparten cupo. Las
+    llamadas anidadas (las de ejecutar_lote) no vuelven a pasar el control.
+    """
+    
+    def __init__(self, max_concurrentes=None, max_por_cliente=None, max_cola=0, espera_max=0.0):
+        """
+        Inicializa el control.
+        
+        Args:
+            max_concurrentes (int, optional): Llamadas en curso a la vez; None
+                para no limitarlas.
+            max_por_cliente (int, optional): Llamadas en curso o en espera por
+                cliente; None para no limitarlas.
+            max_cola (int): Llamadas que pueden esperar turno a la vez.
+            espera_max (float): Segundos que una llamada espera como mucho.
+        """
+        self.max_concurrentes = max_concurrentes
+        self.max_por_cliente = max_por_cliente
+        self.max_cola = max_cola
+        self.espera_max = espera_max
+        
+        self.en_curso = 0
+        self.por_cliente = {}
+        self.cola = deque()
+        self.duracion_media = 0.0
+        self.admitidas = 0
+        self.rechazadas = 0
+        self.max_en_cola = 0
+        
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def _sugerir_reintento(self):
+        """
+        Estima cuándo habrá sitio: lo que tardan en atenderse las llamadas
+        que van por delante. Debe llamarse con el lock adquirido.
+        """
+        paralelas = self.max_concurrentes or 1
+        segundos = self.duracion_media * (len(self.cola) + 1) / paralelas
+        return round(min(REINTENTO_MAX, max(REINTENTO_MIN, segundos)), 3)
+    
+    @staticmethod
+    def _cliente_actual():
+        """
+        Identifica al cliente de la llamada del hilo actual: por su
+        identificador, por su conexión o, si no hay ninguno de los dos, por
+        su dirección IP.
+        
+        Returns:
+            tuple: Clave del cliente, o None si la llamada no viene de Pyro.
+        """
+        contexto = Pyro4.current_context
+        id_cliente = (getattr(contexto, "annotations", None) or {}).get(ANOTACION_CLIENTE)
+        if id_cliente:
+            return ("id", bytes(id_cliente))
+        
+        conexion = getattr(contexto, "client", None)
+        if conexion is not None:
+            return ("conexion", id(conexion))
+        
+        direccion = getattr(contexto, "client_sock_addr", None)
+        return ("ip", direccion[0]) if direccion else None
+    
+    def _rechazar(self, motivo):
+        """
+        Cuenta un rechazo y construye su resultado. Debe llamarse con el lock
+        adquirido.
+        """
+        self.rechazadas += 1
+        return {
+            "exito": False,
+            "mensaje": f"Servidor ocupado: {motivo}",
+            "ocupado": True,
+            "reintentar_en": self._sugerir_reintento()
+        }
+    
+    def _admitir(self):
+        """
+        Anota una llamada en curso. Debe llamarse con el lock adquirido.
+        """
+        self.en_curso += 1
+        self.admitidas += 1
+    
+    def _liberar_cliente(self, cliente):
+        """
+        Descuenta una llamada del cliente. Debe llamarse con el lock adquirido.
+        """
+        restantes = self.por_cliente.get(cliente, 1) - 1
+        if restantes > 0:
+            self.por_cliente[cliente] = restantes
+        else:
+            self.por_cliente.pop(cliente, None)
+    
+    def entrar(self):
+        """
+        Pide turno para la llamada del hilo actual, esperando si hace falta.
+        
+        Returns:
+            dict: None si la llamada se admite, o el resultado de rechazo
+                  ("ocupado" y "reintentar_en") que debe devolverse en su lugar.
+        """
+        profundidad = getattr(self._local, "profundidad", 0)
+        if profundidad:
+            self._local.profundidad = profundidad + 1
+            return None
+        
+        cliente = self._cliente_actual()
+        
+        with self._lock:
+            if self.max_por_cliente is not None and self.por_cliente.get(cliente, 0) >= self.max_por_cliente:
+                return self._rechazar("demasiadas llamadas simultáneas de este cliente")
+            
+            if self.max_concurrentes is None or (self.en_curso < self.max_concurrentes and not self.cola):
+                self._admitir()
+                espera = None
+            elif len(self.cola) < self.max_cola and self.espera_max > 0:
+                espera = _Espera(cliente)
+                self.cola.append(espera)
+                self.max_en_cola = max(self.max_en_cola, len(self.cola))
+            else:
+                return self._rechazar("cola de espera llena")
+            
+            self.por_cliente[cliente] = self.por_cliente.get(cliente, 0) + 1
+        
+        if espera is not None and not espera.admitida.wait(self.espera_max):
+            with self._lock:
+                # Pudo admitirse justo al vencer la espera
+                if not espera.admitida.is_set():
+                    self.cola.remove(espera)
+                    self._liberar_cliente(cliente)
+                    return self._rechazar("tiempo de espera agotado")
+        
+        self._local.profundidad = 1
+        self._local.cliente = cliente
+        self._local.inicio = time.perf_counter()
+        return None
+    
+    def salir(self):
+        """
+        Termina la llamada del hilo actual y da turno a la primera en espera.
+        """
+        self._local.profundidad -= 1
+        if self._local.profundidad:
+            return
+        
+        duracion = time.perf_counter() - self._local.inicio
+        
+        with self._lock:
+            if self.duracion_media:
+                self.duracion_media += (duracion - self.duracion_media) * PESO_MEDIA_DURACION
+            else:
+                self.duracion_media = duracion
+            self.en_curso -= 1
+            self._liberar_cliente(self._local.cliente)
+            
+            while self.cola and (self.max_concurrentes is None or self.en_curso < self.max_concurrentes):
+                espera = self.cola.popleft()
+                self._admitir()
+                espera.admitida.set()
+    
+    def resumen(self):
+        """
+        Devuelve el estado y los contadores del control.
+        
+        Returns:
+            dict: Límites, llamadas en curso y en espera, admitidas,
+                  rechazadas y duración media (ms) de las llamadas.
+        """
+        with self._lock:
+            return {
+                "max_concurrentes": self.max_concurrentes,
+                "max_por_cliente": self.max_por_cliente,
+                "max_cola": self.max_cola,
+                "en_curso": self.en_curso,
+                "en_cola": len(self.cola),
+                "max_en_cola": self.max_en_cola,
+                "admitidas": self.admitidas,
+                "rechazadas": self.rechazadas,
+                "duracion_media_ms": round(self.duracion_media * 1000, 3)
+            }
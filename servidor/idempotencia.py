@@ -0,0 +1,134 @@
+"""
+Tabla de deduplicación para reintentos seguros de operaciones que modifican
+el inventario.
+"""
+import time
+import threading
+from collections import OrderedDict
+
+
+class _Entrada:
+    """
+    Resultado (o ejecución en curso) asociado a un identificador de solicitud.
+    """
+    
+    def __init__(self):
+        self.resultado = None
+        self.expira = float("inf")
+        self.listo = threading.Event()
+
+
+class TablaIdempotencia:
+    """
+    Recuerda el resultado de las solicitudes ya ejecutadas para que un
+    reintento con el mismo identificador devuelva el resultado original en
+    lugar de aplicar la operación dos veces.
+    
+    La tabla está acotada en tamaño (se descartan los resultados más
+    antiguos) y cada resultado expira tras un tiempo de vida fijo, contado
+    desde que termina la operación. Las solicitudes aún en curso no se
+    descartan nunca, aunque la tabla supere su tamaño máximo. Solo vive en
+    memoria: tras reiniciar el servidor, un reintento de una solicitud ya
+    aplicada se aplica otra vez.
+    """
+    
+    def __init__(self, max_entradas, ttl, espera_max=None):
+        """
+        Inicializa la tabla.
+        
+        Args:
+            max_entradas (int): Número máximo de resultados recordados.
+            ttl (float): Segundos que se conserva cada resultado.
+            espera_max (float, optional): Segundos que un reintento espera
+                a que termine la ejecución original; None sin límite.
+        """
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.espera_max = espera_max
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _purgar(self, ahora):
+        """
+        Elimina los resultados expirados y los que exceden el tamaño máximo,
+        empezando por los más antiguos. Debe llamarse con el lock adquirido.
+        
+        Las entradas terminadas están ordenadas por expiración (se mueven al
+        final al terminar); las que siguen en curso se saltan.
+        """
+        exceso = len(self._entradas) - self.max_entradas
+        descartadas = []
+        
+        for clave, entrada in self._entradas.items():
+            if not entrada.listo.is_set():
+                continue
+            if entrada.expira > ahora and exceso <= 0:
+                break
+            descartadas.append(clave)
+            exceso -= 1
+        
+        for clave in descartadas:
+            del self._entradas[clave]
+    
+    def ejecutar(self, id_solicitud, operacion, *args):
+        """
+        Ejecuta la operación una sola vez por identificador de solicitud.
+        
+        Si el identificador ya se procesó, devuelve el resultado guardado. Si
+        otra llamada con el mismo identificador está en curso, espera a que
+        termine (como mucho espera_max segundos) y devuelve su resultado; si
+        no termina a tiempo devuelve un resultado "ocupado", que el cliente
+        puede reintentar con el mismo identificador.
+        
+        Args:
+            id_solicitud (str): Identificador único de la solicitud.
+            operacion (callable): Función que realiza la operación.
+            *args: Argumentos de la operación.
+        
+        Returns:
+            El resultado de la operación original.
+        """
+        with self._lock:
+            self._purgar(time.monotonic())
+            entrada = self._entradas.get(id_solicitud)
+            propietario = entrada is None
+            if propietario:
+                entrada = _Entrada()
+                self._entradas[id_solicitud] = entrada
+        
+        if not propietario:
+            if not entrada.listo.wait(self.espera_max):
+                return {
+                    "exito": False,
+                    "mensaje": "Servidor ocupado: la solicitud original sigue en curso",
+                    "ocupado": True,
+                    "reintentar_en": self.espera_max
+                }
+            if entrada.resultado is None:
+                # La ejecución original falló; se vuelve a intentar
+                return self.ejecutar(id_solicitud, operacion, *args)
+            return entrada.resultado
+        
+        try:
+            resultado = operacion(*args)
+        except BaseException:
+            # No se recuerda una ejecución fallida: un reintento debe volver a
+            # intentarlo
+            with self._lock:
+                self._entradas.pop(id_solicitud, None)
+            entrada.listo.set()
+            raise
+        
+        with self._lock:
+            entrada.resultado = resultado
+            entrada.expira = time.monotonic() + self.ttl
+            entrada.listo.set()
+            
+            # Mantener las entradas terminadas en orden de expiración
+            if self._entradas.get(id_solicitud) is entrada:
+                self._entradas.move_to_end(id_solicitud)
+        
+        return resultado
+    
+    def __len__(self):
+        return len(self._entradas)
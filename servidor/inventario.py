@@ -3,8 +3,14 @@ Módulo para la gestión del inventario de productos.
 """
 import json
 import os
+import time
+import logging
+import bisect
+import itertools
 from servidor.producto import Producto
 
+bitacora = logging.getLogger("servidor.inventario")
+
 class Inventario:
     """
     Clase que gestiona el inventario de productos.
@@ -20,10 +26,234 @@ class Inventario:
         self.productos = {}
         self.ruta_archivo = ruta_archivo
         
+        # Contador de cambios del inventario y versión (valor del contador en
+        # su último cambio) de cada producto, incluidos los eliminados
+        self.version = 0
+        self.versiones = {}
+        
+        # Resumen por categoría (número de productos y stock total), que se
+        # mantiene al día con cada operación
+        self.categorias = {}
+        
+        # IDs de los productos en orden, para recorrer el catálogo por páginas
+        self.ids_ordenados = []
+        
+        # Instantáneas abiertas para lecturas consistentes largas: versión en
+        # que se abrieron, datos anteriores de los productos que cambiaron
+        # desde entonces (None si no existían) y momento del último uso
+        self.instantaneas = {}
+        self._ids_instantanea = itertools.count(1)
+        
         # Si se proporciona una ruta y el archivo existe, cargar datos
         if ruta_archivo and os.path.exists(ruta_archivo):
             self.cargar_desde_archivo()
     
+    def registrar_cambio(self, id_producto):
+        """
+        Registra que un producto cambió, asignándole una nueva versión.
+        
+        Args:
+            id_producto (int): ID del producto modificado.
+        """
+        self.version += 1
+        self.versiones[id_producto] = self.version
+    
+    def version_producto(self, id_producto):
+        """
+        Obtiene la versión actual de un producto.
+        
+        Args:
+            id_producto (int): ID del producto.
+            
+        Returns:
+            int: Versión del último cambio (0 si no cambió desde la carga).
+        """
+        return self.versiones.get(id_producto, 0)
+    
+    def _contabilizar(self, producto, signo):
+        """
+        Suma o resta un producto del resumen de su categoría.
+        
+        Args:
+            producto (Producto): Producto a contabilizar.
+            signo (int): 1 para sumarlo, -1 para restarlo.
+        """
+        resumen = self.categorias.get(producto.categoria)
+        if resumen is None:
+            resumen = self.categorias[producto.categoria] = {"productos": 0, "stock": 0}
+        
+        resumen["productos"] += signo
+        resumen["stock"] += signo * producto.stock
+        
+        if resumen["productos"] == 0:
+            del self.categorias[producto.categoria]
+    
+    def recalcular_categorias(self):
+        """
+        Reconstruye el resumen por categoría a partir de los productos.
+        """
+        self.categorias = {}
+        for producto in self.productos.values():
+            self._contabilizar(producto, 1)
+    
+    def listar_categorias(self):
+        """
+        Lista las categorías con su número de productos y stock total.
+        
+        Returns:
+            list: Diccionarios con "categoria", "productos" y "stock",
+                  ordenados por nombre de categoría.
+        """
+        return [
+            {"categoria": categoria, "productos": resumen["productos"], "stock": resumen["stock"]}
+            for categoria, resumen in sorted(self.categorias.items())
+        ]
+    
+    def _preservar(self, id_producto):
+        """
+        Guarda el estado de un producto que va a cambiar en las instantáneas
+        abiertas que aún no lo tienen, para que sigan viendo el anterior.
+        
+        Args:
+            id_producto (int): ID del producto que va a cambiar.
+        """
+        if not self.instantaneas:
+            return
+        
+        self._purgar_instantaneas()
+        version_producto = self.versiones.get(id_producto, 0)
+        
+        for instantanea in self.instantaneas.values():
+            anteriores = instantanea["anteriores"]
+            
+            # Si cambió después de abrirse la instantánea, ya se guardó
+            if id_producto in anteriores or version_producto > instantanea["version"]:
+                continue
+            
+            producto = self.productos.get(id_producto)
+            anteriores[id_producto] = producto.to_dict() if producto else None
+    
+    def _purgar_instantaneas(self):
+        """
+        Cierra las instantáneas que llevan más de su ttl sin usarse.
+        """
+        ahora = time.monotonic()
+        caducadas = [
+            id_instantanea for id_instantanea, instantanea in self.instantaneas.items()
+            if ahora - instantanea["ultimo_uso"] > instantanea["ttl"]
+        ]
+        for id_instantanea in caducadas:
+            del self.instantaneas[id_instantanea]
+    
+    def abrir_instantanea(self, ttl):
+        """
+        Abre una vista del catálogo fija en el momento actual.
+        
+        Abrirla no copia el catálogo: solo se guardan los datos anteriores
+        de los productos que cambian mientras está abierta.
+        
+        Args:
+            ttl (float): Segundos sin usarse tras los que se cierra sola.
+            
+        Returns:
+            int: Identificador de la instantánea.
+        """
+        self._purgar_instantaneas()
+        
+        id_instantanea = next(self._ids_instantanea)
+        self.instantaneas[id_instantanea] = {
+            "version": self.version,
+            "anteriores": {},
+            "ultimo_uso": time.monotonic(),
+            "ttl": ttl
+        }
+        return id_instantanea
+    
+    def cerrar_instantanea(self, id_instantanea):
+        """
+        Cierra una instantánea y libera los datos que guardaba.
+        
+        Args:
+            id_instantanea (int): Identificador de la instantánea.
+        """
+        self.instantaneas.pop(id_instantanea, None)
+    
+    def leer_instantanea(self, id_instantanea, desde_id, limite):
+        """
+        Lee una página de productos de una instantánea, en orden de ID.
+        
+        Args:
+            id_instantanea (int): Identificador de la instantánea.
+            desde_id (int): Se devuelven productos con ID mayor que este
+                (None para empezar desde el principio).
+            limite (int): Número máximo de productos de la página.
+            
+        Returns:
+            tuple: (productos, ultimo_id) con los diccionarios de la página y
+                   el ID desde el que pedir la siguiente, o None si ya no
+                   quedan más.
+            
+        Raises:
+            KeyError: Si la instantánea no existe o caducó.
+        """
+        instantanea = self.instantaneas[id_instantanea]
+        instantanea["ultimo_uso"] = time.monotonic()
+        anteriores = instantanea["anteriores"]
+        
+        inicio = 0 if desde_id is None else bisect.bisect_right(self.ids_ordenados, desde_id)
+        candidatos = self.ids_ordenados[inicio:inicio + limite]
+        
+        # Productos eliminados después de abrir la instantánea: ya no están
+        # en ids_ordenados, pero la instantánea aún los ve
+        hasta = candidatos[-1] if len(candidatos) == limite else None
+        eliminados = [
+            id_producto for id_producto, datos in anteriores.items()
+            if datos is not None and id_producto not in self.productos and
+            (desde_id is None or id_producto > desde_id) and
+            (hasta is None or id_producto <= hasta)
+        ]
+        if eliminados:
+            candidatos = sorted(candidatos + eliminados)[:limite]
+        
+        productos = []
+        for id_producto in candidatos:
+            if id_producto in anteriores:
+                # None: el producto se creó después de abrir la instantánea
+                if anteriores[id_producto] is not None:
+                    productos.append(dict(anteriores[id_producto]))
+            else:
+                productos.append(self.productos[id_producto].to_dict())
+        
+        ultimo_id = candidatos[-1] if len(candidatos) == limite else None
+        return productos, ultimo_id
+    
+    def cambios_desde(self, version):
+        """
+        Obtiene los productos que cambiaron después de una versión.
+        
+        Args:
+            version (int): Valor del contador de cambios conocido.
+            
+        Returns:
+            tuple: (modificados, eliminados) donde modificados es la lista de
+                   productos existentes que cambiaron y eliminados la lista
+                   de IDs de los productos que se eliminaron.
+        """
+        modificados = []
+        eliminados = []
+        
+        for id_producto, version_producto in self.versiones.items():
+            if version_producto <= version:
+                continue
+            
+            producto = self.productos.get(id_producto)
+            if producto is None:
+                eliminados.append(id_producto)
+            else:
+                modificados.append(producto)
+        
+        return modificados, eliminados
+    
     def agregar_producto(self, producto):
         """
         Agrega un nuevo producto al inventario.
@@ -37,7 +267,11 @@ class Inventario:
         if producto.id in self.productos:
             return False
         
+        self._preservar(producto.id)
         self.productos[producto.id] = producto
+        bisect.insort(self.ids_ordenados, producto.id)
+        self._contabilizar(producto, 1)
+        self.registrar_cambio(producto.id)
         return True
     
     def modificar_producto(self, id_producto, datos_actualizados):
@@ -54,13 +288,17 @@ class Inventario:
         if id_producto not in self.productos:
             return False
         
+        self._preservar(id_producto)
         producto = self.productos[id_producto]
+        self._contabilizar(producto, -1)
         
         # Actualizar solo los campos proporcionados
         for campo, valor in datos_actualizados.items():
             if hasattr(producto, campo):
                 setattr(producto, campo, valor)
         
+        self._contabilizar(producto, 1)
+        self.registrar_cambio(id_producto)
         return True
     
     def eliminar_producto(self, id_producto):
@@ -76,7 +314,10 @@ class Inventario:
         if id_producto not in self.productos:
             return False
         
-        del self.productos[id_producto]
+        self._preservar(id_producto)
+        self._contabilizar(self.productos.pop(id_producto), -1)
+        del self.ids_ordenados[bisect.bisect_left(self.ids_ordenados, id_producto)]
+        self.registrar_cambio(id_producto)
         return True
     
     def obtener_producto(self, id_producto):
@@ -91,6 +332,29 @@ class Inventario:
         """
         return self.productos.get(id_producto)
     
+    def obtener_productos(self, ids):
+        """
+        Obtiene varios productos por sus IDs en una sola operación.
+        
+        Args:
+            ids (iterable): IDs de los productos a obtener.
+            
+        Returns:
+            tuple: (encontrados, faltantes) donde encontrados es un diccionario
+                   ID -> Producto y faltantes la lista de IDs inexistentes.
+        """
+        encontrados = {}
+        faltantes = []
+        
+        for id_producto in ids:
+            producto = self.productos.get(id_producto)
+            if producto is None:
+                faltantes.append(id_producto)
+            else:
+                encontrados[id_producto] = producto
+        
+        return encontrados, faltantes
+    
     def listar_productos(self, filtro_categoria=None):
         """
         Lista todos los productos, opcionalmente filtrados por categoría.
@@ -125,9 +389,37 @@ class Inventario:
         if producto.stock < cantidad:
             return False, f"Stock insuficiente. Disponible: {producto.stock}"
         
+        self._preservar(id_producto)
         producto.stock -= cantidad
+        self.categorias[producto.categoria]["stock"] -= cantidad
+        self.registrar_cambio(id_producto)
         return True, f"Venta realizada. Nuevo stock: {producto.stock}"
     
+    def ajustar_stock(self, id_producto, cantidad):
+        """
+        Suma (o resta, si es negativa) una cantidad al stock de un producto.
+        
+        Args:
+            id_producto (int): ID del producto.
+            cantidad (int): Cantidad a sumar al stock.
+            
+        Returns:
+            tuple: (éxito, mensaje) donde éxito es un booleano y mensaje describe el resultado.
+        """
+        if id_producto not in self.productos:
+            return False, "Producto no encontrado"
+        
+        producto = self.productos[id_producto]
+        
+        if producto.stock + cantidad < 0:
+            return False, f"Stock insuficiente. Disponible: {producto.stock}"
+        
+        self._preservar(id_producto)
+        producto.stock += cantidad
+        self.categorias[producto.categoria]["stock"] += cantidad
+        self.registrar_cambio(id_producto)
+        return True, f"Stock ajustado. Nuevo stock: {producto.stock}"
+    
     def guardar_en_archivo(self):
         """
         Guarda el inventario en un archivo JSON.
@@ -150,7 +442,7 @@ class Inventario:
             
             return True
         except Exception as e:
-            print(f"Error al guardar inventario: {e}")
+            bitacora.error(f"Error al guardar inventario: {e}")
             return False
     
     def cargar_desde_archivo(self):
@@ -165,8 +457,8 @@ class Inventario:
         
         # Si el archivo no existe, no es un error, simplemente retornamos False
         if not os.path.exists(self.ruta_archivo):
-            print(f"Archivo de inventario no encontrado: {self.ruta_archivo}")
-            print("Se iniciará con un inventario vacío.")
+            bitacora.warning(f"Archivo de inventario no encontrado: {self.ruta_archivo}")
+            bitacora.warning("Se iniciará con un inventario vacío.")
             return False
         
         try:
@@ -178,12 +470,14 @@ class Inventario:
                 int(id_): Producto.from_dict(producto_dict)
                 for id_, producto_dict in datos.items()
             }
+            self.recalcular_categorias()
+            self.ids_ordenados = sorted(self.productos)
             
             return True
         except json.JSONDecodeError:
             # Si el archivo está vacío o no es JSON válido, empezamos con un inventario vacío
-            print(f"El archivo de inventario está vacío o no es un JSON válido. Se iniciará con un inventario vacío.")
+            bitacora.warning(f"El archivo de inventario está vacío o no es un JSON válido. Se iniciará con un inventario vacío.")
             return False
         except Exception as e:
-            print(f"Error al cargar inventario: {e}")
+            bitacora.error(f"Error al cargar inventario: {e}")
             return False
\ No newline at end of file
@@ -0,0 +1,566 @@
+"""
+Métricas de las llamadas remotas del servidor: número de llamadas, errores
+e histogramas de latencia por método, desglosados por fase.
+"""
+import os
+import time
+import bisect
+import threading
+import inspect
+import logging
+import functools
+import contextlib
+import http.server
+import Pyro4.util
+from servidor.registro import registrar_llamada_lenta
+from common import trazas
+
+bitacora = logging.getLogger("servidor.metricas")
+
+# Fases en que se desglosa cada llamada
+FASES = ("total", "espera_lock", "logica", "persistencia", "serializacion")
+
+# Límites superiores (en segundos) de los intervalos del histograma: crecen
+# un 20 % cada uno, de 1 µs a unos 10 minutos, de modo que los percentiles
+# tienen un error relativo de como mucho un 20 %
+LIMITES_HISTOGRAMA = [1e-6 * 1.2 ** i for i in range(111)]
+
+# Medición en curso del hilo actual (compartida por todos los registros, ya
+# que el serializador de Pyro es común a todo el proceso)
+_local = threading.local()
+
+# Versiones de Pyro4 cuyos detalles internos (Pyro4.util._serializers y
+# _serializers_by_id) usa instalar_serializador_medido; con otras, la
+# serialización no se mide
+VERSIONES_PYRO_SERIALIZADOR = ("4.82",)
+
+# Si SerializadorMedido está instalado y terminará cada medición
+_serializador_instalado = False
+
+
+class Histograma:
+    """
+    Histograma de latencias con intervalos de tamaño exponencial.
+    
+    Registrar un valor cuesta una búsqueda binaria y un incremento, y la
+    memoria es fija sea cual sea el número de valores.
+    """
+    
+    def __init__(self):
+        self.cuentas = [0] * (len(LIMITES_HISTOGRAMA) + 1)
+        self.total = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+    
+    def registrar(self, valor):
+        """
+        Añade un valor al histograma.
+        
+        Args:
+            valor (float): Duración en segundos.
+        """
+        self.cuentas[bisect.bisect_left(LIMITES_HISTOGRAMA, valor)] += 1
+        self.total += 1
+        self.suma += valor
+        if valor > self.maximo:
+            self.maximo = valor
+    
+    def percentil(self, p):
+        """
+        Estima un percentil como el límite superior de su intervalo.
+        
+        Args:
+            p (float): Percentil entre 0 y 100.
+        
+        Returns:
+            float: Duración estimada en segundos (0 si no hay valores).
+        """
+        if not self.total:
+            return 0.0
+        
+        objetivo = p / 100 * self.total
+        acumulado = 0
+        for indice, cuenta in enumerate(self.cuentas):
+            acumulado += cuenta
+            if acumulado >= objetivo and cuenta:
+                if indice < len(LIMITES_HISTOGRAMA):
+                    return min(LIMITES_HISTOGRAMA[indice], self.maximo)
+                return self.maximo
+        return self.maximo
+    
+    def resumen(self):
+        """
+        Resume el histograma en milisegundos.
+        
+        Returns:
+            dict: Media, p50, p95, p99 y máximo.
+        """
+        return {
+            "media_ms": self.suma / self.total * 1000 if self.total else 0.0,
+            "p50_ms": self.percentil(50) * 1000,
+            "p95_ms": self.percentil(95) * 1000,
+            "p99_ms": self.percentil(99) * 1000,
+            "max_ms": self.maximo * 1000
+        }
+
+
+class _EstadisticasMetodo:
+    """
+    Contadores e histogramas de un método remoto.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.llamadas = 0
+        self.errores = 0
+        self.histogramas = {fase: Histograma() for fase in FASES}
+
+
+class _Medicion:
+    """
+    Tiempos acumulados durante una llamada en curso.
+    
+    Si la llamada llega con una traza, "traza" guarda su identificador y
+    hora de envío, y "tramos" los intervalos (nombre, inicio, fin) de cada
+    fase para escribirlos al terminar.
+    """
+    
+    __slots__ = ("espera_lock", "persistencia", "serializacion", "inicio", "traza", "tramos")
+    
+    def __init__(self):
+        self.espera_lock = 0.0
+        self.persistencia = 0.0
+        self.serializacion = 0.0
+        self.inicio = 0.0
+        self.traza = None
+        self.tramos = None
+
+
+class RegistroMetricas:
+    """
+    Registro de métricas por método del servidor.
+    
+    El tiempo de cada llamada se reparte en fases: espera del lock del
+    inventario, persistencia en disco, serialización de la petición y la
+    respuesta, y lógica (el resto).
+    """
+    
+    def __init__(self, umbral_lentas=None):
+        """
+        Args:
+            umbral_lentas (float, optional): Segundos a partir de los cuales
+                una llamada se escribe en el registro de llamadas lentas
+                (None para no registrarlas).
+        """
+        self.inicio = time.time()
+        self.umbral_lentas = umbral_lentas
+        self._metodos = {}
+        self._lock = threading.Lock()
+    
+    def _estadisticas(self, metodo):
+        """
+        Devuelve las estadísticas de un método, creándolas si hace falta.
+        """
+        estadisticas = self._metodos.get(metodo)
+        if estadisticas is None:
+            with self._lock:
+                estadisticas = self._metodos.setdefault(metodo, _EstadisticasMetodo())
+        return estadisticas
+    
+    def medir(self, metodo, llamada, funcion, *args, **kwargs):
+        """
+        Ejecuta una función registrando su duración y resultado.
+        
+        Una llamada cuenta como error si lanza una excepción o devuelve un
+        diccionario con "exito" falso.
+        
+        Args:
+            metodo (str): Nombre del método medido.
+            llamada (tuple): (nombres de parámetros, args, kwargs) del método,
+                para resumir sus argumentos si la llamada resulta lenta.
+            funcion (callable): Función a ejecutar.
+            *args: Argumentos posicionales de la función.
+            **kwargs: Argumentos con nombre de la función.
+        
+        Returns:
+            Resultado de la función.
+        """
+        anterior = getattr(_local, "medicion", None)
+        medicion = _Medicion()
+        _local.medicion = medicion
+        
+        # La deserialización de la petición ocurrió justo antes, en el mismo
+        # hilo; solo se atribuye a la llamada más externa
+        if anterior is None:
+            inicio_deserializacion, fin_deserializacion = getattr(_local, "deserializacion", (0.0, 0.0))
+            medicion.serializacion = fin_deserializacion - inicio_deserializacion
+            _local.deserializacion = (0.0, 0.0)
+            
+            if trazas.activas():
+                self._iniciar_traza(medicion, inicio_deserializacion, fin_deserializacion)
+        else:
+            # Las fases de una llamada anidada forman parte de la traza de la
+            # llamada que la contiene
+            medicion.tramos = anterior.tramos
+        
+        error = True
+        inicio = medicion.inicio = time.perf_counter()
+        
+        try:
+            resultado = funcion(*args, **kwargs)
+            error = isinstance(resultado, dict) and not resultado.get("exito", True)
+            return resultado
+        finally:
+            duracion = time.perf_counter() - inicio
+            _local.medicion = anterior
+            
+            if anterior is not None:
+                # Llamada anidada (dentro de un lote): sus esperas también
+                # cuentan para la llamada que la contiene
+                anterior.espera_lock += medicion.espera_lock
+                anterior.persistencia += medicion.persistencia
+                if medicion.tramos is not None:
+                    medicion.tramos.append((metodo, inicio, inicio + duracion))
+            elif _serializador_instalado:
+                # La serialización de la respuesta ocurre al volver
+                _local.pendiente = (self, metodo, llamada, medicion, duracion)
+            else:
+                fin = inicio + duracion
+                self._terminar(metodo, llamada, medicion, duracion, fin, fin, 0)
+            
+            self._registrar(metodo, duracion, medicion, error)
+    
+    def _registrar(self, metodo, duracion, medicion, error):
+        """
+        Añade una llamada terminada a las estadísticas de su método.
+        """
+        estadisticas = self._estadisticas(metodo)
+        logica = max(0.0, duracion - medicion.espera_lock - medicion.persistencia)
+        
+        with estadisticas.lock:
+            estadisticas.llamadas += 1
+            if error:
+                estadisticas.errores += 1
+            
+            histogramas = estadisticas.histogramas
+            histogramas["total"].registrar(duracion)
+            histogramas["espera_lock"].registrar(medicion.espera_lock)
+            histogramas["logica"].registrar(logica)
+            histogramas["persistencia"].registrar(medicion.persistencia)
+    
+    @staticmethod
+    def _iniciar_traza(medicion, inicio_deserializacion, fin_deserializacion):
+        """
+        Asocia a la llamada la traza que envía el cliente en su anotación, si
+        la lleva.
+        """
+        anotaciones = getattr(Pyro4.current_context, "annotations", None) or {}
+        traza = trazas.leer_anotacion(anotaciones.get(trazas.ANOTACION_TRAZA, b""))
+        
+        if traza is not None:
+            medicion.traza = traza
+            medicion.tramos = [("deserializacion", inicio_deserializacion, fin_deserializacion)]
+    
+    def _terminar(self, metodo, llamada, medicion, duracion, inicio_serializacion, fin_serializacion,
+                  tamano_resultado):
+        """
+        Completa una llamada ya respondida: añade el tiempo de serialización,
+        escribe su traza si la tiene y, si en total supera el umbral, la
+        anota en el registro de llamadas lentas.
+        """
+        serializacion = medicion.serializacion + fin_serializacion - inicio_serializacion
+        
+        estadisticas = self._estadisticas(metodo)
+        with estadisticas.lock:
+            estadisticas.histogramas["serializacion"].registrar(serializacion)
+        
+        if medicion.traza is not None:
+            medicion.tramos.append(("serializacion", inicio_serializacion, fin_serializacion))
+            self._escribir_traza(metodo, medicion, duracion, tamano_resultado)
+        
+        total = duracion + serializacion
+        if self.umbral_lentas is not None and total >= self.umbral_lentas:
+            registrar_llamada_lenta(metodo, llamada, {
+                "total": total,
+                "espera_lock": medicion.espera_lock,
+                "logica": max(0.0, duracion - medicion.espera_lock - medicion.persistencia),
+                "persistencia": medicion.persistencia,
+                "serializacion": serializacion
+            }, tamano_resultado)
+    
+    @staticmethod
+    def _escribir_traza(metodo, medicion, duracion, tamano_resultado):
+        """
+        Escribe los tramos de una llamada trazada: el tiempo desde que el
+        cliente la envió hasta que un hilo del servidor empezó a atenderla
+        (red y cola), y la atención completa con sus fases anidadas.
+        """
+        id_traza, envio = medicion.traza
+        inicio_deserializacion = medicion.tramos[0][1]
+        fin_serializacion = medicion.tramos[-1][2]
+        
+        envio = trazas.a_perf_counter(envio)
+        if envio < inicio_deserializacion:
+            trazas.tramo("red_y_cola", envio, inicio_deserializacion, id_traza, "servidor")
+        
+        trazas.tramo(
+            f"servidor.{metodo}", inicio_deserializacion, fin_serializacion, id_traza, "servidor",
+            {"tamano_resultado": tamano_resultado}
+        )
+        trazas.flujo("f", inicio_deserializacion, id_traza)
+        trazas.tramo(metodo, medicion.inicio, medicion.inicio + duracion, id_traza, "servidor")
+        
+        for nombre, inicio, fin in medicion.tramos:
+            trazas.tramo(nombre, inicio, fin, id_traza, "servidor")
+    
+    @staticmethod
+    def sumar_espera_lock(inicio, fin):
+        """
+        Suma tiempo de espera del lock a la llamada en curso del hilo.
+        """
+        medicion = getattr(_local, "medicion", None)
+        if medicion is not None:
+            medicion.espera_lock += fin - inicio
+            if medicion.tramos is not None:
+                medicion.tramos.append(("espera_lock", inicio, fin))
+    
+    @staticmethod
+    def sumar_persistencia(inicio, fin):
+        """
+        Suma tiempo de persistencia a la llamada en curso del hilo.
+        """
+        medicion = getattr(_local, "medicion", None)
+        if medicion is not None:
+            medicion.persistencia += fin - inicio
+            if medicion.tramos is not None:
+                medicion.tramos.append(("persistencia", inicio, fin))
+    
+    def resumen(self):
+        """
+        Resume las métricas de todos los métodos.
+        
+        Returns:
+            dict: Por método: llamadas, errores y, por fase, media,
+                  percentiles p50/p95/p99 y máximo en milisegundos.
+        """
+        with self._lock:
+            metodos = dict(self._metodos)
+        
+        resumen = {}
+        for metodo, estadisticas in sorted(metodos.items()):
+            with estadisticas.lock:
+                resumen[metodo] = {
+                    "llamadas": estadisticas.llamadas,
+                    "errores": estadisticas.errores,
+                    "fases": {
+                        fase: histograma.resumen()
+                        for fase, histograma in estadisticas.histogramas.items()
+                    }
+                }
+        return resumen
+    
+    def texto(self):
+        """
+        Genera las métricas en el formato de texto de Prometheus.
+        
+        Returns:
+            str: Métricas, una por línea.
+        """
+        lineas = [
+            "# TYPE inventario_llamadas_total counter",
+            "# TYPE inventario_errores_total counter",
+            "# TYPE inventario_latencia_segundos summary"
+        ]
+        
+        for metodo, datos in self.resumen().items():
+            etiqueta = f'metodo="{metodo}"'
+            lineas.append(f"inventario_llamadas_total{{{etiqueta}}} {datos['llamadas']}")
+            lineas.append(f"inventario_errores_total{{{etiqueta}}} {datos['errores']}")
+            
+            for fase, valores in datos["fases"].items():
+                for cuantil, clave in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+                    lineas.append(
+                        f'inventario_latencia_segundos{{{etiqueta},fase="{fase}",quantile="{cuantil}"}} '
+                        f"{valores[clave] / 1000:.6f}"
+                    )
+        
+        lineas.append(f"inventario_inicio_segundos {self.inicio:.0f}")
+        return "\n".join(lineas) + "\n"
+
+
+def medir_llamada(funcion):
+    """
+    Decorador para métodos de ServidorInventario: pasa cada llamada por el
+    control de admisión del servidor (self.admision), que puede rechazarla
+    si está ocupado, la registra en el registro de métricas
+    (self.registro_metricas) y la pasa por su perfilador (self.perfilador),
+    que la perfila si hay un perfil cProfile en curso.
+    """
+    nombre = funcion.__name__
+    parametros = list(inspect.signature(funcion).parameters)[1:]
+    
+    @functools.wraps(funcion)
+    def envoltura(self, *args, **kwargs):
+        rechazo = self.admision.entrar()
+        if rechazo is not None:
+            return rechazo
+        
+        try:
+            return self.registro_metricas.medir(
+                nombre, (parametros, args, kwargs), self.perfilador.ejecutar, funcion, self, *args, **kwargs
+            )
+        finally:
+            self.admision.salir()
+    
+    return envoltura
+
+
+class LockMedido:
+    """
+    Envoltorio de un lock que suma a la llamada en curso el tiempo que pasa
+    esperando para adquirirlo.
+    """
+    
+    def __init__(self, lock):
+        """
+        Args:
+            lock: Lock o RLock a envolver.
+        """
+        self._lock = lock
+    
+    def acquire(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        adquirido = self._lock.acquire(*args, **kwargs)
+        RegistroMetricas.sumar_espera_lock(inicio, time.perf_counter())
+        return adquirido
+    
+    def release(self):
+        self._lock.release()
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, tipo, valor, traza):
+        self.release()
+
+
+@contextlib.contextmanager
+def medir_persistencia():
+    """
+    Suma a la llamada en curso el tiempo del bloque como persistencia.
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        RegistroMetricas.sumar_persistencia(inicio, time.perf_counter())
+
+
+class SerializadorMedido(Pyro4.util.PickleSerializer):
+    """
+    Serializador pickle de Pyro que mide el tiempo de deserializar cada
+    petición y serializar su respuesta en el servidor.
+    """
+    
+    def deserializeCall(self, data, compressed=False):
+        inicio = time.perf_counter()
+        try:
+            return super().deserializeCall(data, compressed)
+        finally:
+            _local.deserializacion = (inicio, time.perf_counter())
+    
+    def serializeData(self, data, compress=False):
+        inicio = time.perf_counter()
+        serializado = None
+        try:
+            serializado = super().serializeData(data, compress)
+            return serializado
+        finally:
+            pendiente = getattr(_local, "pendiente", None)
+            if pendiente is not None:
+                _local.pendiente = None
+                registro_metricas, metodo, llamada, medicion, duracion = pendiente
+                registro_metricas._terminar(
+                    metodo, llamada, medicion, duracion, inicio, time.perf_counter(),
+                    len(serializado[0]) if serializado else 0
+                )
+
+
+def instalar_serializador_medido():
+    """
+    Sustituye el serializador pickle de Pyro por SerializadorMedido.
+    
+    Pyro no ofrece una forma pública de cambiar sus serializadores: esto
+    depende de los detalles internos de Pyro4 4.82 (los diccionarios
+    _serializers y _serializers_by_id de Pyro4.util). Con otra versión no
+    se instala y la serialización no se mide.
+    
+    Returns:
+        bool: True si el serializador medido está instalado.
+    """
+    global _serializador_instalado
+    
+    if _serializador_instalado:
+        return True
+    
+    internos = getattr(Pyro4.util, "_serializers", None), getattr(Pyro4.util, "_serializers_by_id", None)
+    if Pyro4.__version__ not in VERSIONES_PYRO_SERIALIZADOR or not all(isinstance(d, dict) for d in internos):
+        bitacora.warning(
+            f"Pyro4 {Pyro4.__version__} no es una versión probada; no se mide la serialización"
+        )
+        return False
+    
+    serializador = SerializadorMedido()
+    Pyro4.util._serializers["pickle"] = serializador
+    Pyro4.util._serializers_by_id[serializador.serializer_id] = serializador
+    _serializador_instalado = True
+    return True
+
+
+def iniciar_exposicion(registro, archivo=None, puerto=None, intervalo=10, host="localhost"):
+    """
+    Publica las métricas en formato de texto en un archivo, reescrito cada
+    cierto tiempo, y/o en un puerto HTTP (ruta /metrics).
+    
+    Args:
+        registro (RegistroMetricas): Registro a publicar.
+        archivo (str, optional): Ruta del archivo de métricas.
+        puerto (int, optional): Puerto HTTP en el que servirlas.
+        intervalo (float): Segundos entre escrituras del archivo.
+        host (str): Dirección en la que escucha el puerto HTTP.
+    """
+    if archivo:
+        def escribir_periodicamente():
+            while True:
+                try:
+                    temporal = f"{archivo}.tmp"
+                    with open(temporal, 'w', encoding='utf-8') as salida:
+                        salida.write(registro.texto())
+                    os.replace(temporal, archivo)
+                except Exception as e:
+                    bitacora.error(f"Error al escribir las métricas: {e}")
+                time.sleep(intervalo)
+        
+        hilo = threading.Thread(target=escribir_periodicamente, name="metricas-archivo")
+        hilo.daemon = True
+        hilo.start()
+    
+    if puerto:
+        class Manejador(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                cuerpo = registro.texto().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+            
+            def log_message(self, *args):
+                pass
+        
+        servidor_http = http.server.ThreadingHTTPServer((host, puerto), Manejador)
+        hilo = threading.Thread(target=servidor_http.serve_forever, name="metricas-http")
+        hilo.daemon = True
+        hilo.start()
+        bitacora.info(f"Métricas disponibles en http://{host}:{puerto}/metrics")
@@ -0,0 +1,142 @@
+"""
+Opciones de ejecución del servidor: dirección, tipo de servidor de Pyro,
+tamaño del pool de hilos, timeout de los sockets y opciones TCP.
+
+Cada opción toma su valor, por orden de preferencia, de la línea de
+comandos, de su variable de entorno (INVENTARIO_*) o de la constante de
+common/constantes.py.
+
+Uso:
+    python -m servidor.servidor --tipo multiplex
+    INVENTARIO_HILOS=100 python -m servidor.servidor --timeout 30 --tcp-nodelay
+"""
+import os
+import argparse
+import Pyro4
+from common.constantes import (
+    HOST_SERVIDOR, PUERTO_SERVIDOR, SERVIDOR_TIPO, SERVIDOR_HILOS,
+    SERVIDOR_HILOS_MIN, SERVIDOR_TIMEOUT, SERVIDOR_TCP_NODELAY, SERVIDOR_SOCK_REUSE
+)
+
+# Tipos de servidor de Pyro admitidos
+TIPOS_SERVIDOR = ("thread", "multiplex")
+
+# Valores de las variables de entorno que activan una opción booleana
+VALORES_VERDADEROS = ("1", "true", "si", "sí", "yes", "on")
+
+
+def leer_booleano(texto):
+    """
+    Interpreta una opción booleana escrita como texto ("1", "true", "si"...).
+    """
+    return str(texto).strip().lower() in VALORES_VERDADEROS
+
+
+def valor_entorno(nombre, tipo, predeterminado):
+    """
+    Lee una opción de su variable de entorno.
+    
+    Args:
+        nombre (str): Variable de entorno.
+        tipo (callable): Conversión del texto al tipo de la opción.
+        predeterminado: Valor si la variable no está definida.
+    
+    Returns:
+        Valor de la opción.
+    """
+    texto = os.environ.get(nombre)
+    if texto is None or texto == "":
+        return predeterminado
+    try:
+        return tipo(texto)
+    except ValueError:
+        raise SystemExit(f"Valor no válido en {nombre}: {texto}")
+
+
+def crear_parser():
+    """
+    Crea el intérprete de las opciones de línea de comandos, con los valores
+    por defecto tomados del entorno y de las constantes.
+    
+    Returns:
+        argparse.ArgumentParser: Intérprete de las opciones.
+    """
+    parser = argparse.ArgumentParser(description="Servidor de inventario")
+    parser.add_argument("--host", default=valor_entorno("INVENTARIO_HOST", str, HOST_SERVIDOR),
+                        help="Dirección en la que escucha (INVENTARIO_HOST)")
+    parser.add_argument("--puerto", type=int,
+                        default=valor_entorno("INVENTARIO_PUERTO", int, PUERTO_SERVIDOR),
+                        help="Puerto en el que escucha (INVENTARIO_PUERTO)")
+    parser.add_argument("--tipo", choices=TIPOS_SERVIDOR,
+                        default=valor_entorno("INVENTARIO_TIPO", str, SERVIDOR_TIPO),
+                        help="thread (un hilo por conexión) o multiplex (un solo hilo) (INVENTARIO_TIPO)")
+    parser.add_argument("--hilos", type=int, default=valor_entorno("INVENTARIO_HILOS", int, SERVIDOR_HILOS),
+                        help="Hilos máximos del pool, es decir, conexiones simultáneas (INVENTARIO_HILOS)")
+    parser.add_argument("--hilos-min", type=int,
+                        default=valor_entorno("INVENTARIO_HILOS_MIN", int, SERVIDOR_HILOS_MIN),
+                        help="Hilos que se mantienen aunque estén libres (INVENTARIO_HILOS_MIN)")
+    parser.add_argument("--timeout", type=float,
+                        default=valor_entorno("INVENTARIO_TIMEOUT", float, SERVIDOR_TIMEOUT),
+                        help="Segundos de timeout de los sockets, 0 sin timeout (INVENTARIO_TIMEOUT)")
+    parser.add_argument("--tcp-nodelay", action=argparse.BooleanOptionalAction,
+                        default=valor_entorno("INVENTARIO_TCP_NODELAY", leer_booleano, SERVIDOR_TCP_NODELAY),
+                        help="Desactivar el algoritmo de Nagle (INVENTARIO_TCP_NODELAY)")
+    parser.add_argument("--sock-reuse", action=argparse.BooleanOptionalAction,
+                        default=valor_entorno("INVENTARIO_SOCK_REUSE", leer_booleano, SERVIDOR_SOCK_REUSE),
+                        help="Reutilizar el puerto aunque quede en TIME_WAIT (INVENTARIO_SOCK_REUSE)")
+    return parser
+
+
+def leer_opciones(argumentos=None):
+    """
+    Lee y valida las opciones de ejecución del servidor.
+    
+    Args:
+        argumentos (list, optional): Argumentos de línea de comandos; por
+            defecto, los del proceso.
+    
+    Returns:
+        argparse.Namespace: Opciones del servidor.
+    """
+    parser = crear_parser()
+    opciones = parser.parse_args(argumentos)
+    
+    if opciones.tipo not in TIPOS_SERVIDOR:
+        parser.error(f"Tipo de servidor no válido: {opciones.tipo}")
+    if opciones.hilos < 1 or not 1 <= opciones.hilos_min <= opciones.hilos:
+        parser.error("Se necesita 1 <= hilos mínimos <= hilos máximos")
+    if opciones.timeout < 0:
+        parser.error("El timeout no puede ser negativo")
+    
+    return opciones
+
+
+def aplicar_opciones(opciones):
+    """
+    Aplica las opciones a la configuración de Pyro. Debe llamarse antes de
+    crear el daemon.
+    
+    Args:
+        opciones: Opciones de leer_opciones (o un objeto con los mismos
+            atributos).
+    """
+    Pyro4.config.SERVERTYPE = opciones.tipo
+    Pyro4.config.THREADPOOL_SIZE = opciones.hilos
+    Pyro4.config.THREADPOOL_SIZE_MIN = opciones.hilos_min
+    Pyro4.config.COMMTIMEOUT = opciones.timeout
+    Pyro4.config.SOCK_NODELAY = opciones.tcp_nodelay
+    Pyro4.config.SOCK_REUSE = opciones.sock_reuse
+
+
+def describir_opciones(opciones):
+    """
+    Resume las opciones de ejecución en una línea para el registro.
+    """
+    if opciones.tipo == "thread":
+        tipo = f"thread ({opciones.hilos_min}-{opciones.hilos} hilos)"
+    else:
+        tipo = "multiplex"
+    
+    timeout = f"{opciones.timeout:g} s" if opciones.timeout else "sin límite"
+    return (f"tipo {tipo}, timeout {timeout}, TCP_NODELAY {'sí' if opciones.tcp_nodelay else 'no'}, "
+            f"SO_REUSEADDR {'sí' if opciones.sock_reuse else 'no'}")
@@ -0,0 +1,329 @@
+"""
+Perfilado bajo demanda del servidor en ejecución: cProfile o muestreo de
+pilas durante un tiempo fijo, e instantáneas de memoria con tracemalloc.
+
+Los resultados se escriben en archivos para analizarlos fuera de línea.
+"""
+import os
+import sys
+import time
+import pstats
+import logging
+import cProfile
+import threading
+import tracemalloc
+from collections import Counter
+
+bitacora = logging.getLogger("servidor.perfilado")
+
+# Tipos de perfil admitidos
+TIPOS_PERFIL = ("cprofile", "muestreo")
+
+# Desde Python 3.12 cProfile usa sys.monitoring: solo puede haber un perfil
+# activo en todo el proceso, y ese perfil ve las llamadas de todos los hilos
+PERFIL_COMPARTIDO = sys.version_info >= (3, 12)
+
+
+class Perfilador:
+    """
+    Perfilador de las llamadas atendidas por el servidor.
+    
+    En modo "cprofile" se perfila cada llamada remota en el hilo que la
+    atiende (un perfil por hilo, que se combinan al terminar), o, desde
+    Python 3.12, todo el proceso con un único perfil compartido; en modo
+    "muestreo" un hilo aparte registra cada cierto tiempo la pila de todos
+    los hilos y al final escribe las pilas agregadas en formato "folded",
+    el que usan flamegraph.pl y speedscope.
+    
+    Solo puede haber un perfil en curso a la vez. Termina solo al cumplirse
+    su duración o antes, con detener().
+    """
+    
+    def __init__(self, directorio):
+        """
+        Inicializa el perfilador.
+        
+        Args:
+            directorio (str): Directorio donde se escriben los resultados.
+        """
+        self.directorio = directorio
+        self._lock = threading.Condition()
+        self._local = threading.local()
+        
+        # Perfil en curso
+        self.tipo = None
+        self._ruta = None
+        self._temporizador = None
+        self._perfiles = []
+        self._en_curso = 0
+        self._muestras = Counter()
+        self._parar_muestreo = None
+        self._hilo_muestreo = None
+        
+        # Última instantánea de memoria, para calcular diferencias
+        self._instantanea_anterior = None
+    
+    def _nombre_archivo(self, prefijo, extension):
+        """
+        Devuelve una ruta nueva en el directorio de resultados.
+        """
+        os.makedirs(self.directorio, exist_ok=True)
+        marca = time.strftime("%Y%m%d-%H%M%S")
+        return os.path.join(self.directorio, f"{prefijo}_{marca}_{os.getpid()}.{extension}")
+    
+    def iniciar(self, tipo, duracion, intervalo=0.005):
+        """
+        Inicia un perfil durante un tiempo.
+        
+        Args:
+            tipo (str): "cprofile" o "muestreo".
+            duracion (float): Segundos que dura el perfil.
+            intervalo (float): Segundos entre muestras (solo en "muestreo").
+        
+        Returns:
+            tuple: (exito, mensaje, ruta) con la ruta del archivo que se
+                   escribirá al terminar.
+        """
+        if tipo not in TIPOS_PERFIL:
+            return False, f"Tipo de perfil no válido: {tipo}", None
+        
+        with self._lock:
+            if self.tipo is not None:
+                return False, f"Ya hay un perfil {self.tipo} en curso", None
+            
+            if tipo == "cprofile":
+                self._perfiles = []
+                if PERFIL_COMPARTIDO:
+                    perfil = cProfile.Profile()
+                    try:
+                        perfil.enable()
+                    except ValueError as e:
+                        return False, f"No se puede iniciar el perfil: {e}", None
+                    self._perfiles.append(perfil)
+                self._ruta = self._nombre_archivo("perfil", "prof")
+            else:
+                self._ruta = self._nombre_archivo("muestreo", "folded")
+                self._muestras = Counter()
+                self._parar_muestreo = threading.Event()
+                self._hilo_muestreo = threading.Thread(
+                    target=self._muestrear, args=(self._parar_muestreo, intervalo),
+                    name="perfilador-muestreo"
+                )
+                self._hilo_muestreo.daemon = True
+                self._hilo_muestreo.start()
+            
+            self.tipo = tipo
+            self._temporizador = threading.Timer(duracion, self.detener)
+            self._temporizador.daemon = True
+            self._temporizador.start()
+            
+            return True, f"Perfil {tipo} iniciado durante {duracion} s", self._ruta
+    
+    def detener(self):
+        """
+        Detiene el perfil en curso y escribe sus resultados.
+        
+        Returns:
+            tuple: (exito, mensaje, ruta) con la ruta del archivo escrito.
+        """
+        with self._lock:
+            tipo = self.tipo
+            if tipo is None:
+                return False, "No hay ningún perfil en curso", None
+            
+            self.tipo = None
+            ruta = self._ruta
+            self._temporizador.cancel()
+            
+            if tipo == "cprofile":
+                if PERFIL_COMPARTIDO:
+                    self._perfiles[0].disable()
+                else:
+                    # Esperar a que terminen las llamadas que se están perfilando
+                    self._lock.wait_for(lambda: self._en_curso == 0, timeout=10)
+                perfiles = self._perfiles
+                self._perfiles = []
+            else:
+                parar, hilo = self._parar_muestreo, self._hilo_muestreo
+        
+        try:
+            if tipo == "cprofile":
+                self._escribir_cprofile(perfiles, ruta)
+            else:
+                parar.set()
+                hilo.join()
+                self._escribir_muestras(ruta)
+        except Exception as e:
+            return False, f"Error al escribir el perfil: {e}", None
+        
+        bitacora.info(f"Perfil {tipo} escrito en {ruta}")
+        return True, "Perfil detenido", ruta
+    
+    def ejecutar(self, funcion, *args, **kwargs):
+        """
+        Ejecuta una llamada del servidor, perfilándola si hay un perfil
+        cProfile en curso.
+        
+        Args:
+            funcion (callable): Función a ejecutar.
+            *args: Argumentos posicionales de la función.
+            **kwargs: Argumentos con nombre de la función.
+        
+        Returns:
+            Resultado de la función.
+        """
+        # Sin perfil, con el perfil compartido del proceso (que ya ve esta
+        # llamada) o en una llamada anidada, ya perfilada: llamada directa
+        if PERFIL_COMPARTIDO or self.tipo != "cprofile" or getattr(self._local, "activo", False):
+            return funcion(*args, **kwargs)
+        
+        with self._lock:
+            perfil = None
+            if self.tipo == "cprofile":
+                perfil = getattr(self._local, "perfil", None)
+                if perfil is None or perfil not in self._perfiles:
+                    perfil = cProfile.Profile()
+                    self._local.perfil = perfil
+                    self._perfiles.append(perfil)
+                self._en_curso += 1
+        
+        if perfil is None:
+            return funcion(*args, **kwargs)
+        
+        self._local.activo = True
+        
+        try:
+            try:
+                perfil.enable()
+            except ValueError:
+                # Otra herramienta de perfilado activa: se atiende sin perfilar
+                perfil = None
+            return funcion(*args, **kwargs)
+        finally:
+            if perfil is not None:
+                perfil.disable()
+            self._local.activo = False
+            
+            with self._lock:
+                self._en_curso -= 1
+                self._lock.notify_all()
+    
+    @staticmethod
+    def _escribir_cprofile(perfiles, ruta):
+        """
+        Combina los perfiles de cada hilo y los escribe en formato pstats,
+        junto con un resumen en texto ordenado por tiempo acumulado.
+        """
+        estadisticas = None
+        for perfil in perfiles:
+            # Un perfil sin ninguna llamada registrada no se puede cargar
+            try:
+                if estadisticas is None:
+                    estadisticas = pstats.Stats(perfil)
+                else:
+                    estadisticas.add(perfil)
+            except TypeError:
+                continue
+        
+        if estadisticas is None:
+            raise ValueError("no se atendió ninguna llamada durante el perfil")
+        estadisticas.dump_stats(ruta)
+        
+        with open(os.path.splitext(ruta)[0] + ".txt", 'w', encoding='utf-8') as archivo:
+            estadisticas.stream = archivo
+            estadisticas.sort_stats("cumulative").print_stats(50)
+    
+    def _muestrear(self, parar, intervalo):
+        """
+        Registra la pila de cada hilo hasta que se pida parar.
+        """
+        propio = threading.get_ident()
+        
+        while not parar.wait(intervalo):
+            nombres = {hilo.ident: hilo.name for hilo in threading.enumerate()}
+            
+            for ident, marco in sys._current_frames().items():
+                if ident == propio:
+                    continue
+                
+                pila = []
+                while marco is not None:
+                    codigo = marco.f_code
+                    pila.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{marco.f_lineno})")
+                    marco = marco.f_back
+                
+                pila.append(nombres.get(ident, str(ident)))
+                self._muestras[";".join(reversed(pila))] += 1
+    
+    def _escribir_muestras(self, ruta):
+        """
+        Escribe las pilas muestreadas, una por línea con su número de muestras.
+        """
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            for pila, cuenta in self._muestras.most_common():
+                archivo.write(f"{pila} {cuenta}\n")
+    
+    def instantanea_memoria(self, marcos=25, limite=50):
+        """
+        Toma una instantánea de la memoria reservada y la compara con la
+        anterior.
+        
+        La primera llamada activa tracemalloc, que solo ve las reservas
+        hechas a partir de ese momento.
+        
+        Args:
+            marcos (int): Marcos de pila guardados por reserva al activar
+                tracemalloc.
+            limite (int): Líneas del resumen escrito en texto.
+        
+        Returns:
+            dict: Rutas de la instantánea ("ruta") y de su comparación con la
+                  anterior ("ruta_diferencias", None la primera vez), y
+                  memoria actual y máxima en bytes.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(marcos)
+                self._instantanea_anterior = None
+            
+            instantanea = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+            ))
+            ruta = self._nombre_archivo("memoria", "snapshot")
+            instantanea.dump(ruta)
+            
+            if self._instantanea_anterior is None:
+                estadisticas = instantanea.statistics("lineno")
+                ruta_resumen = os.path.splitext(ruta)[0] + ".txt"
+                ruta_diferencias = None
+            else:
+                estadisticas = instantanea.compare_to(self._instantanea_anterior, "lineno")
+                ruta_resumen = ruta_diferencias = os.path.splitext(ruta)[0] + "_diferencias.txt"
+            
+            with open(ruta_resumen, 'w', encoding='utf-8') as archivo:
+                for estadistica in estadisticas[:limite]:
+                    archivo.write(f"{estadistica}\n")
+            
+            self._instantanea_anterior = instantanea
+            actual, maxima = tracemalloc.get_traced_memory()
+        
+        return {
+            "ruta": ruta,
+            "ruta_diferencias": ruta_diferencias,
+            "memoria_actual": actual,
+            "memoria_maxima": maxima
+        }
+    
+    def detener_memoria(self):
+        """
+        Desactiva tracemalloc y descarta la última instantánea.
+        
+        Returns:
+            bool: True si tracemalloc estaba activo.
+        """
+        with self._lock:
+            activo = tracemalloc.is_tracing()
+            tracemalloc.stop()
+            self._instantanea_anterior = None
+        
+        return activo
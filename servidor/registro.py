@@ -0,0 +1,174 @@
+"""
+Registro (logging) del servidor: mensajes generales y llamadas lentas.
+
+Los mensajes se encolan en el hilo que los emite y un hilo aparte los
+escribe en archivos que rotan por tamaño, así que registrar no bloquea las
+peticiones aunque el disco vaya lento.
+"""
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import logging.handlers
+import Pyro4
+
+# Registro de las llamadas lentas, en un archivo propio con una línea JSON
+# por llamada
+bitacora_lentas = logging.getLogger("servidor.lentas")
+bitacora_lentas.propagate = False
+
+# Longitud máxima de un texto en el resumen de argumentos
+MAX_TEXTO_RESUMEN = 40
+
+_escuchador = None
+
+
+def configurar_registro(ruta_registro, ruta_lentas, max_bytes, copias, nivel=logging.INFO):
+    """
+    Configura el registro del servidor: consola y archivo rotativo para los
+    mensajes generales, y archivo rotativo aparte para las llamadas lentas.
+    
+    Args:
+        ruta_registro (str): Archivo de los mensajes generales.
+        ruta_lentas (str): Archivo de las llamadas lentas.
+        max_bytes (int): Tamaño a partir del cual rota cada archivo.
+        copias (int): Archivos rotados que se conservan.
+        nivel (int): Nivel mínimo de los mensajes generales.
+    
+    Returns:
+        logging.handlers.QueueListener: Hilo escritor (ya iniciado).
+    """
+    global _escuchador
+    
+    if _escuchador is not None:
+        return _escuchador
+    
+    for ruta in (ruta_registro, ruta_lentas):
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    
+    consola = logging.StreamHandler()
+    consola.setFormatter(logging.Formatter("%(message)s"))
+    
+    archivo = logging.handlers.RotatingFileHandler(
+        ruta_registro, maxBytes=max_bytes, backupCount=copias, encoding="utf-8"
+    )
+    archivo.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    
+    # Las llamadas lentas solo van a su archivo, sin formato añadido
+    class SoloGenerales(logging.Filter):
+        def filter(self, entrada):
+            return entrada.name != bitacora_lentas.name
+    
+    class SoloLentas(logging.Filter):
+        def filter(self, entrada):
+            return entrada.name == bitacora_lentas.name
+    
+    lentas = logging.handlers.RotatingFileHandler(
+        ruta_lentas, maxBytes=max_bytes, backupCount=copias, encoding="utf-8"
+    )
+    lentas.setFormatter(logging.Formatter("%(message)s"))
+    lentas.addFilter(SoloLentas())
+    for manejador in (consola, archivo):
+        manejador.addFilter(SoloGenerales())
+    
+    cola = queue.SimpleQueue()
+    _escuchador = logging.handlers.QueueListener(
+        cola, consola, archivo, lentas, respect_handler_level=True
+    )
+    
+    encolador = logging.handlers.QueueHandler(cola)
+    servidor = logging.getLogger("servidor")
+    servidor.setLevel(nivel)
+    servidor.addHandler(encolador)
+    
+    bitacora_lentas.setLevel(logging.INFO)
+    bitacora_lentas.addHandler(encolador)
+    
+    # Al terminar el proceso se escriben los mensajes que queden en la cola
+    _escuchador.start()
+    atexit.register(_escuchador.stop)
+    return _escuchador
+
+
+def resumir_valor(valor):
+    """
+    Resume un argumento: los números y textos cortos tal cual, las
+    colecciones solo con su tipo y tamaño.
+    
+    Args:
+        valor: Argumento de una llamada.
+    
+    Returns:
+        Valor o descripción breve que se puede escribir en JSON.
+    """
+    if valor is None or isinstance(valor, (bool, int, float)):
+        return valor
+    if isinstance(valor, str):
+        return valor if len(valor) <= MAX_TEXTO_RESUMEN else f"str[{len(valor)}]"
+    if isinstance(valor, dict):
+        return f"dict[{len(valor)}]: {','.join(sorted(map(str, valor))[:10])}"
+    if isinstance(valor, (list, tuple, set)):
+        return f"{type(valor).__name__}[{len(valor)}]"
+    return type(valor).__name__
+
+
+def resumir_argumentos(nombres, args, kwargs):
+    """
+    Resume los argumentos de una llamada por nombre de parámetro.
+    
+    En ejecutar_lote se cuentan las operaciones del lote por método.
+    
+    Args:
+        nombres (list): Nombres de los parámetros del método, en orden.
+        args (tuple): Argumentos posicionales.
+        kwargs (dict): Argumentos con nombre.
+    
+    Returns:
+        dict: Resumen de cada argumento.
+    """
+    argumentos = dict(zip(nombres, args), **kwargs)
+    resumen = {}
+    
+    for nombre, valor in argumentos.items():
+        if nombre == "operaciones" and isinstance(valor, (list, tuple)):
+            metodos = {}
+            for operacion in valor:
+                metodo = operacion[0] if isinstance(operacion, (list, tuple)) and operacion else "?"
+                metodos[metodo] = metodos.get(metodo, 0) + 1
+            resumen[nombre] = metodos
+        elif nombre == "token":
+            resumen[nombre] = "***"
+        else:
+            resumen[nombre] = resumir_valor(valor)
+    
+    return resumen
+
+
+def registrar_llamada_lenta(metodo, llamada, fases, tamano_resultado):
+    """
+    Escribe una llamada lenta en el registro de llamadas lentas.
+    
+    Args:
+        metodo (str): Nombre del método.
+        llamada (tuple): (nombres de parámetros, args, kwargs) de la llamada.
+        fases (dict): Segundos de cada fase (total, espera_lock, logica,
+            persistencia, serializacion).
+        tamano_resultado (int): Bytes de la respuesta serializada.
+    """
+    if not bitacora_lentas.isEnabledFor(logging.INFO):
+        return
+    
+    direccion = getattr(Pyro4.current_context, "client_sock_addr", None)
+    
+    entrada = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "metodo": metodo,
+        "argumentos": resumir_argumentos(*llamada),
+        "tamano_resultado": tamano_resultado,
+        "cliente": f"{direccion[0]}:{direccion[1]}" if direccion else None
+    }
+    entrada.update({f"{fase}_ms": round(segundos * 1000, 3) for fase, segundos in fases.items()})
+    
+    bitacora_lentas.info(json.dumps(entrada, ensure_ascii=False))
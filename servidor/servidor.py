@@ -4,41 +4,166 @@ Servidor Pyro que expone la funcionalidad del inventario.
 import os
 import sys
 import time
+import hmac
+import uuid
+import itertools
+import logging
+import threading
 import Pyro4
 from servidor.inventario import Inventario
 from servidor.producto import Producto
+from servidor.idempotencia import TablaIdempotencia
+from servidor.perfilado import Perfilador
+from servidor.admision import ControlAdmision
+from servidor.registro import configurar_registro
+from servidor.opciones import leer_opciones, aplicar_opciones, describir_opciones
+from servidor.metricas import (
+    RegistroMetricas, LockMedido, medir_llamada, medir_persistencia,
+    instalar_serializador_medido, iniciar_exposicion
+)
+from common import trazas
+from common.exportacion import EscritorProductos, FORMATOS_EXPORTACION
 from common.constantes import (
     NOMBRE_SERVIDOR, HOST_SERVIDOR, PUERTO_SERVIDOR, RUTA_DATOS, 
-    NS_HOST, NS_PORT
+    NS_HOST, NS_PORT, IDEMPOTENCIA_MAX_ENTRADAS, IDEMPOTENCIA_TTL, IDEMPOTENCIA_ESPERA_MAX,
+    TAMANO_PAGINA_EXPORTACION, EXPORTACION_TTL, METRICAS_ARCHIVO,
+    METRICAS_PUERTO, METRICAS_INTERVALO, METRICAS_HOST, TOKEN_ADMIN, RUTA_REGISTRO,
+    RUTA_REGISTRO_LENTAS, REGISTRO_MAX_BYTES, REGISTRO_COPIAS, UMBRAL_LENTAS_MS,
+    RUTA_TRAZAS_SERVIDOR, ADMISION_MAX_CONCURRENTES, ADMISION_MAX_POR_CLIENTE,
+    ADMISION_MAX_COLA, ADMISION_ESPERA_MAX
 )
 
+bitacora = logging.getLogger("servidor.servidor")
+
 @Pyro4.expose
 class ServidorInventario:
     """
     Servidor que expone métodos remotos para gestionar el inventario.
     """
     
-    def __init__(self):
+    # Métodos que se pueden invocar dentro de ejecutar_lote
+    METODOS_LOTE = (
+        "agregar_producto", "modificar_producto", "eliminar_producto",
+        "vender_producto", "ajustar_stock", "obtener_producto",
+        "obtener_productos", "listar_productos", "listar_categorias"
+    )
+    
+    def __init__(self, ruta_archivo=None):
         """
         Inicializa el servidor con una instancia de Inventario.
+        
+        Args:
+            ruta_archivo (str, optional): Ruta del archivo de persistencia.
+                Por defecto se usa RUTA_DATOS dentro del proyecto.
         """
         # Crear la ruta completa para el archivo de inventario
-        ruta_base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        ruta_completa = os.path.join(ruta_base, RUTA_DATOS)
+        if ruta_archivo is None:
+            ruta_base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            ruta_completa = os.path.join(ruta_base, RUTA_DATOS)
+        else:
+            ruta_completa = os.path.abspath(ruta_archivo)
         
         # Asegurarse de que el directorio para el archivo exista
         directorio = os.path.dirname(ruta_completa)
         if not os.path.exists(directorio):
             try:
                 os.makedirs(directorio, exist_ok=True)
-                print(f"Directorio creado: {directorio}")
+                bitacora.info(f"Directorio creado: {directorio}")
             except Exception as e:
-                print(f"Error al crear directorio: {e}")
+                bitacora.error(f"Error al crear directorio: {e}")
         
         self.inventario = Inventario(ruta_completa)
-        print(f"Inventario inicializado. Productos cargados: {len(self.inventario.productos)}")
+        self.directorio_exportaciones = os.path.join(directorio, "exportaciones")
+        
+        # Exportaciones a archivo en curso o terminadas hace menos de
+        # EXPORTACION_TTL segundos, por identificador de trabajo
+        self.trabajos_exportacion = {}
+        self._ids_trabajo = itertools.count(1)
+        self._lock_trabajos = threading.Lock()
+        bitacora.info(f"Inventario inicializado. Productos cargados: {len(self.inventario.productos)}")
+        
+        # El daemon atiende cada conexión en su propio hilo: las operaciones
+        # sobre el inventario y su persistencia se serializan con este lock
+        self.lock = LockMedido(threading.RLock())
+        
+        # Identificador de esta ejecución del servidor: las versiones de los
+        # productos solo son comparables dentro de una misma época
+        self.epoca = uuid.uuid4().hex
+        
+        # Resultados de solicitudes ya aplicadas, para reintentos seguros
+        self.solicitudes = TablaIdempotencia(
+            IDEMPOTENCIA_MAX_ENTRADAS, IDEMPOTENCIA_TTL, IDEMPOTENCIA_ESPERA_MAX
+        )
+        
+        # Estado por hilo para diferir el guardado durante ejecutar_lote
+        self._local = threading.local()
+        
+        # Llamadas, errores y latencias por método; la serialización se mide
+        # en el serializador pickle de Pyro
+        self.registro_metricas = RegistroMetricas(
+            UMBRAL_LENTAS_MS / 1000 if UMBRAL_LENTAS_MS is not None else None
+        )
+        instalar_serializador_medido()
+        
+        # Perfiles e instantáneas de memoria pedidos por un administrador
+        self.perfilador = Perfilador(os.path.join(directorio, "perfiles"))
+        
+        # Límite de llamadas simultáneas: las que no caben esperan turno o se
+        # rechazan enseguida con "servidor ocupado"
+        self.admision = ControlAdmision(
+            ADMISION_MAX_CONCURRENTES, ADMISION_MAX_POR_CLIENTE,
+            ADMISION_MAX_COLA, ADMISION_ESPERA_MAX
+        )
+    
+    def _version(self, id_producto):
+        """
+        Devuelve la versión de un producto como texto "época:versión".
+        
+        Args:
+            id_producto (int): ID del producto.
+        
+        Returns:
+            str: Versión del producto válida para validar cachés.
+        """
+        return f"{self.epoca}:{self.inventario.version_producto(id_producto)}"
     
-    def agregar_producto(self, id, nombre, precio, stock, categoria):
+    def _ejecutar_idempotente(self, id_solicitud, operacion, *args):
+        """
+        Ejecuta una operación de modificación, una sola vez por solicitud.
+        
+        Args:
+            id_solicitud (str): Identificador de la solicitud o None.
+            operacion (callable): Método que realiza la operación.
+            *args: Argumentos de la operación.
+        
+        Returns:
+            dict: Resultado de la operación (el original si es un reintento).
+        """
+        if id_solicitud is None:
+            return self._con_lock(operacion, *args)
+        
+        return self.solicitudes.ejecutar(id_solicitud, self._con_lock, operacion, *args)
+    
+    def _guardar(self):
+        """
+        Guarda el inventario en disco, o lo deja pendiente si el hilo actual
+        está ejecutando un lote (se guarda una sola vez al terminarlo).
+        """
+        if getattr(self._local, "diferir_guardado", False):
+            self._local.guardado_pendiente = True
+        else:
+            with medir_persistencia():
+                self.inventario.guardar_en_archivo()
+    
+    def _con_lock(self, operacion, *args):
+        """
+        Ejecuta una operación con el lock del inventario adquirido.
+        """
+        with self.lock:
+            return operacion(*args)
+    
+    @medir_llamada
+    def agregar_producto(self, id, nombre, precio, stock, categoria, id_solicitud=None):
         """
         Agrega un nuevo producto al inventario.
         
@@ -48,9 +173,21 @@ class ServidorInventario:
             precio (float): Precio del producto.
             stock (int): Cantidad disponible en inventario.
             categoria (str): Categoría a la que pertenece el producto.
-            
+            id_solicitud (str, optional): Identificador único de la solicitud.
+                Si se repite, se devuelve el resultado original sin volver
+                a aplicar la operación.
+        
         Returns:
-            dict: Resultado de la operación.
+            dict: Resultado de la operación y, si tuvo éxito, el
+                  producto agregado en "producto".
+        """
+        return self._ejecutar_idempotente(
+            id_solicitud, self._agregar_producto, id, nombre, precio, stock, categoria
+        )
+    
+    def _agregar_producto(self, id, nombre, precio, stock, categoria):
+        """
+        Realiza la operación de agregar_producto sin deduplicación.
         """
         try:
             # Convertir tipos de datos por seguridad
@@ -62,24 +199,42 @@ class ServidorInventario:
             resultado = self.inventario.agregar_producto(producto)
             
             if resultado:
-                self.inventario.guardar_en_archivo()
-                return {"exito": True, "mensaje": "Producto agregado correctamente"}
+                self._guardar()
+                return {
+                    "exito": True,
+                    "mensaje": "Producto agregado correctamente",
+                    "producto": producto.to_dict(),
+                    "version": self._version(id)
+                }
             else:
                 return {"exito": False, "mensaje": "Ya existe un producto con ese ID"}
         
         except Exception as e:
             return {"exito": False, "mensaje": f"Error: {str(e)}"}
     
-    def modificar_producto(self, id_producto, datos):
+    @medir_llamada
+    def modificar_producto(self, id_producto, datos, id_solicitud=None):
         """
         Modifica un producto existente en el inventario.
         
         Args:
             id_producto (int): ID del producto a modificar.
             datos (dict): Datos a actualizar.
-            
+            id_solicitud (str, optional): Identificador único de la solicitud.
+                Si se repite, se devuelve el resultado original sin volver
+                a aplicar la operación.
+        
         Returns:
-            dict: Resultado de la operación.
+            dict: Resultado de la operación y, si tuvo éxito, el
+                  producto modificado en "producto".
+        """
+        return self._ejecutar_idempotente(
+            id_solicitud, self._modificar_producto, id_producto, datos
+        )
+    
+    def _modificar_producto(self, id_producto, datos):
+        """
+        Realiza la operación de modificar_producto sin deduplicación.
         """
         try:
             id_producto = int(id_producto)
@@ -93,74 +248,140 @@ class ServidorInventario:
             resultado = self.inventario.modificar_producto(id_producto, datos)
             
             if resultado:
-                self.inventario.guardar_en_archivo()
-                return {"exito": True, "mensaje": "Producto modificado correctamente"}
+                self._guardar()
+                return {
+                    "exito": True,
+                    "mensaje": "Producto modificado correctamente",
+                    "producto": self.inventario.obtener_producto(id_producto).to_dict(),
+                    "version": self._version(id_producto)
+                }
             else:
                 return {"exito": False, "mensaje": "Producto no encontrado"}
         
         except Exception as e:
             return {"exito": False, "mensaje": f"Error: {str(e)}"}
     
-    def eliminar_producto(self, id_producto):
+    @medir_llamada
+    def eliminar_producto(self, id_producto, id_solicitud=None):
         """
         Elimina un producto del inventario.
         
         Args:
             id_producto (int): ID del producto a eliminar.
-            
+            id_solicitud (str, optional): Identificador único de la solicitud.
+                Si se repite, se devuelve el resultado original sin volver
+                a aplicar la operación.
+        
         Returns:
             dict: Resultado de la operación.
         """
+        return self._ejecutar_idempotente(
+            id_solicitud, self._eliminar_producto, id_producto
+        )
+    
+    def _eliminar_producto(self, id_producto):
+        """
+        Realiza la operación de eliminar_producto sin deduplicación.
+        """
         try:
             id_producto = int(id_producto)
             resultado = self.inventario.eliminar_producto(id_producto)
             
             if resultado:
-                self.inventario.guardar_en_archivo()
-                return {"exito": True, "mensaje": "Producto eliminado correctamente"}
+                self._guardar()
+                return {
+                    "exito": True,
+                    "mensaje": "Producto eliminado correctamente",
+                    "id": id_producto
+                }
             else:
                 return {"exito": False, "mensaje": "Producto no encontrado"}
         
         except Exception as e:
             return {"exito": False, "mensaje": f"Error: {str(e)}"}
     
-    def obtener_producto(self, id_producto):
+    @medir_llamada
+    def obtener_producto(self, id_producto, version_conocida=None):
         """
         Obtiene la información de un producto por su ID.
         
         Args:
             id_producto (int): ID del producto a consultar.
-            
+            version_conocida (str, optional): Versión que el cliente tiene en
+                caché. Si sigue siendo la actual, no se envían los datos.
+        
         Returns:
-            dict: Datos del producto o mensaje de error.
+            dict: Datos del producto y su versión, "sin_cambios" si la versión
+                  conocida es la actual, o mensaje de error.
         """
         try:
             id_producto = int(id_producto)
-            producto = self.inventario.obtener_producto(id_producto)
             
-            if producto:
-                return {
-                    "exito": True,
-                    "producto": producto.to_dict()
-                }
-            else:
+            with self.lock:
+                producto = self.inventario.obtener_producto(id_producto)
+                version = self._version(id_producto)
+                datos = producto.to_dict() if producto else None
+            
+            if datos is None:
                 return {"exito": False, "mensaje": "Producto no encontrado"}
+            
+            if version_conocida == version:
+                return {"exito": True, "sin_cambios": True, "version": version}
+            
+            return {
+                "exito": True,
+                "producto": datos,
+                "version": version
+            }
         
         except Exception as e:
             return {"exito": False, "mensaje": f"Error: {str(e)}"}
     
+    @medir_llamada
+    def obtener_productos(self, ids):
+        """
+        Obtiene la información de varios productos en una sola llamada.
+        
+        Args:
+            ids (list): IDs de los productos a consultar.
+        
+        Returns:
+            dict: Diccionario ID -> datos del producto en "productos", sus
+                  versiones en "versiones" y lista de IDs inexistentes en
+                  "faltantes", o mensaje de error.
+        """
+        try:
+            ids = [int(id_producto) for id_producto in ids]
+            
+            with self.lock:
+                encontrados, faltantes = self.inventario.obtener_productos(ids)
+                versiones = {id_: self._version(id_) for id_ in encontrados}
+            
+            return {
+                "exito": True,
+                "productos": {id_: p.to_dict() for id_, p in encontrados.items()},
+                "versiones": versiones,
+                "faltantes": faltantes
+            }
+        
+        except Exception as e:
+            return {"exito": False, "mensaje": f"Error: {str(e)}"}
+    
+    @medir_llamada
     def listar_productos(self, categoria=None):
         """
         Lista todos los productos, opcionalmente filtrados por categoría.
         
         Args:
             categoria (str, optional): Categoría por la que filtrar.
-            
+        
         Returns:
             dict: Lista de productos o mensaje de error.
         """
         try:
-            productos = self.inventario.listar_productos(categoria)
+            with self.lock:
+                productos = self.inventario.listar_productos(categoria)
+            
             productos_dict = [p.to_dict() for p in productos]
             
             return {
@@ -172,16 +393,95 @@ class ServidorInventario:
         except Exception as e:
             return {"exito": False, "mensaje": f"Error: {str(e)}"}
     
-    def vender_producto(self, id_producto, cantidad):
+    @medir_llamada
+    def listar_categorias(self):
+        """
+        Lista las categorías del inventario con su número de productos y su
+        stock total.
+        
+        Returns:
+            dict: Lista de categorías o mensaje de error.
+        """
+        try:
+            with self.lock:
+                categorias = self.inventario.listar_categorias()
+            
+            return {
+                "exito": True,
+                "categorias": categorias,
+                "total": len(categorias)
+            }
+        
+        except Exception as e:
+            return {"exito": False, "mensaje": f"Error: {str(e)}"}
+    
+    @medir_llamada
+    def cambios_desde(self, version_conocida=None):
+        """
+        Obtiene los cambios del catálogo posteriores a una versión, para que
+        un cliente con una copia local solo descargue lo que cambió.
+        
+        Si la versión es de otra ejecución del servidor (o no se indica), se
+        devuelve el catálogo completo.
+        
+        Args:
+            version_conocida (str, optional): Versión del catálogo "época:número"
+                devuelta por una llamada anterior.
+        
+        Returns:
+            dict: Versión actual del catálogo en "version", "completo" y, si es
+                  completo, todos los productos en "productos"; si no, los
+                  productos modificados en "productos" y los IDs eliminados en
+                  "eliminados". O mensaje de error.
+        """
+        try:
+            epoca, _, numero = (version_conocida or "").partition(":")
+            
+            with self.lock:
+                version = f"{self.epoca}:{self.inventario.version}"
+                
+                if epoca == self.epoca and numero.isdigit():
+                    productos, eliminados = self.inventario.cambios_desde(int(numero))
+                    completo = False
+                else:
+                    productos = self.inventario.listar_productos()
+                    eliminados = []
+                    completo = True
+            
+            return {
+                "exito": True,
+                "version": version,
+                "completo": completo,
+                "productos": [p.to_dict() for p in productos],
+                "eliminados": eliminados
+            }
+        
+        except Exception as e:
+            return {"exito": False, "mensaje": f"Error: {str(e)}"}
+    
+    @medir_llamada
+    def vender_producto(self, id_producto, cantidad, id_solicitud=None):
         """
         Registra la venta de un producto, reduciendo su stock.
         
         Args:
             id_producto (int): ID del producto vendido.
             cantidad (int): Cantidad vendida.
-            
+            id_solicitud (str, optional): Identificador único de la solicitud.
+                Si se repite, se devuelve el resultado original sin volver
+                a aplicar la operación.
+        
         Returns:
-            dict: Resultado de la operación.
+            dict: Resultado de la operación y, si tuvo éxito, el
+                  producto con el stock actualizado en "producto".
+        """
+        return self._ejecutar_idempotente(
+            id_solicitud, self._vender_producto, id_producto, cantidad
+        )
+    
+    def _vender_producto(self, id_producto, cantidad):
+        """
+        Realiza la operación de vender_producto sin deduplicación.
         """
         try:
             id_producto = int(id_producto)
@@ -189,74 +489,568 @@ class ServidorInventario:
             
             exito, mensaje = self.inventario.vender_producto(id_producto, cantidad)
             
-            if exito:
-                self.inventario.guardar_en_archivo()
+            if not exito:
+                return {"exito": False, "mensaje": mensaje}
+            
+            self._guardar()
+            
+            # Devolver el producto actualizado para que el cliente no tenga
+            # que volver a consultarlo
+            return {
+                "exito": True,
+                "mensaje": mensaje,
+                "producto": self.inventario.obtener_producto(id_producto).to_dict(),
+                "version": self._version(id_producto)
+            }
+        
+        except Exception as e:
+            return {"exito": False, "mensaje": f"Error: {str(e)}"}
+    
+    
+    @medir_llamada
+    def ajustar_stock(self, id_producto, cantidad, id_solicitud=None):
+        """
+        Suma (o resta, si es negativa) una cantidad al stock de un producto.
+        
+        Args:
+            id_producto (int): ID del producto.
+            cantidad (int): Cantidad a sumar al stock.
+            id_solicitud (str, optional): Identificador único de la solicitud.
+                Si se repite, se devuelve el resultado original sin volver
+                a aplicar la operación.
+        
+        Returns:
+            dict: Resultado de la operación y, si tuvo éxito, el
+                  producto con el stock actualizado en "producto".
+        """
+        return self._ejecutar_idempotente(
+            id_solicitud, self._ajustar_stock, id_producto, cantidad
+        )
+    
+    def _ajustar_stock(self, id_producto, cantidad):
+        """
+        Realiza la operación de ajustar_stock sin deduplicación.
+        """
+        try:
+            id_producto = int(id_producto)
+            cantidad = int(cantidad)
+            
+            exito, mensaje = self.inventario.ajustar_stock(id_producto, cantidad)
+            
+            if not exito:
+                return {"exito": False, "mensaje": mensaje}
+            
+            self._guardar()
+            
+            return {
+                "exito": True,
+                "mensaje": mensaje,
+                "producto": self.inventario.obtener_producto(id_producto).to_dict(),
+                "version": self._version(id_producto)
+            }
+        
+        except Exception as e:
+            return {"exito": False, "mensaje": f"Error: {str(e)}"}
+    
+    @medir_llamada
+    def ejecutar_lote(self, operaciones):
+        """
+        Ejecuta varias operaciones en una sola llamada remota.
+        
+        Cada operación se aplica como si se hubiera llamado por separado (con
+        su propio identificador de solicitud, si lo lleva), pero el
+        inventario se guarda en disco una sola vez, al final del lote.
+        
+        Args:
+            operaciones (list): Tuplas (metodo, args) con el nombre de uno de
+                METODOS_LOTE y sus argumentos.
+        
+        Returns:
+            dict: Resultado de cada operación, en orden, en "resultados".
+        """
+        resultados = []
+        self._local.diferir_guardado = True
+        self._local.guardado_pendiente = False
+        
+        try:
+            for metodo, args in operaciones:
+                if metodo not in self.METODOS_LOTE:
+                    resultados.append({"exito": False, "mensaje": f"Operación no permitida en un lote: {metodo}"})
+                    continue
+                
+                try:
+                    resultados.append(getattr(self, metodo)(*args))
+                except Exception as e:
+                    resultados.append({"exito": False, "mensaje": f"Error: {str(e)}"})
+        finally:
+            self._local.diferir_guardado = False
+            
+            if self._local.guardado_pendiente:
+                with self.lock, medir_persistencia():
+                    self.inventario.guardar_en_archivo()
+        
+        return {"exito": True, "resultados": resultados}
+    
+    def metricas(self):
+        """
+        Devuelve las métricas de las llamadas atendidas desde el arranque.
+        
+        Returns:
+            dict: Por método en "metodos": llamadas, errores y, para cada fase
+                  (total, espera_lock, logica, persistencia, serializacion),
+                  media, p50, p95, p99 y máximo en milisegundos; en
+                  "admision", el estado del control de admisión.
+        """
+        return {
+            "exito": True,
+            "desde": self.registro_metricas.inicio,
+            "metodos": self.registro_metricas.resumen(),
+            "admision": self.admision.resumen()
+        }
+    
+    
+    def _comprobar_admin(self, token):
+        """
+        Comprueba la clave de una operación de administración.
+        
+        Args:
+            token (str): Clave presentada por el cliente.
+        
+        Returns:
+            dict: Resultado de error si no se permite la operación, o None.
+        """
+        if TOKEN_ADMIN is None:
+            return {"exito": False, "mensaje": "Las operaciones de administración están desactivadas"}
+        
+        if not isinstance(token, str) or not hmac.compare_digest(token, TOKEN_ADMIN):
+            return {"exito": False, "mensaje": "Clave de administración no válida"}
+        
+        return None
+    
+    def iniciar_perfil(self, token, tipo="cprofile", duracion=30, intervalo=0.005):
+        """
+        Inicia un perfil del servidor durante un tiempo (administración).
+        
+        Con "cprofile" se perfilan las llamadas remotas atendidas y al
+        terminar se escribe un archivo .prof (pstats) y un resumen .txt; con
+        "muestreo" se toman muestras de la pila de todos los hilos y se
+        escriben en formato "folded" para generar un flame graph.
+        
+        Args:
+            token (str): Clave de administración.
+            tipo (str): "cprofile" o "muestreo".
+            duracion (float): Segundos que dura el perfil.
+            intervalo (float): Segundos entre muestras (solo en "muestreo").
+        
+        Returns:
+            dict: Resultado con la ruta ("ruta") del archivo que se escribirá.
+        """
+        error = self._comprobar_admin(token)
+        if error:
+            return error
+        
+        exito, mensaje, ruta = self.perfilador.iniciar(tipo, float(duracion), float(intervalo))
+        return {"exito": exito, "mensaje": mensaje, "ruta": ruta}
+    
+    def detener_perfil(self, token):
+        """
+        Detiene el perfil en curso antes de tiempo y escribe sus resultados
+        (administración).
+        
+        Args:
+            token (str): Clave de administración.
+        
+        Returns:
+            dict: Resultado con la ruta ("ruta") del archivo escrito.
+        """
+        error = self._comprobar_admin(token)
+        if error:
+            return error
+        
+        exito, mensaje, ruta = self.perfilador.detener()
+        return {"exito": exito, "mensaje": mensaje, "ruta": ruta}
+    
+    def instantanea_memoria(self, token):
+        """
+        Escribe una instantánea de tracemalloc y su diferencia con la
+        anterior (administración).
+        
+        La primera llamada activa tracemalloc, que tiene un coste en cada
+        reserva de memoria hasta llamar a detener_memoria.
+        
+        Args:
+            token (str): Clave de administración.
+        
+        Returns:
+            dict: Rutas de la instantánea y de las diferencias, y memoria
+                  actual y máxima en bytes.
+        """
+        error = self._comprobar_admin(token)
+        if error:
+            return error
+        
+        try:
+            datos = self.perfilador.instantanea_memoria()
+            return dict(datos, exito=True, mensaje="Instantánea de memoria escrita")
+        except Exception as e:
+            return {"exito": False, "mensaje": f"Error: {str(e)}"}
+    
+    def detener_memoria(self, token):
+        """
+        Desactiva tracemalloc (administración).
+        
+        Args:
+            token (str): Clave de administración.
+        
+        Returns:
+            dict: Resultado de la operación.
+        """
+        error = self._comprobar_admin(token)
+        if error:
+            return error
+        
+        if self.perfilador.detener_memoria():
+            return {"exito": True, "mensaje": "Seguimiento de memoria desactivado"}
+        return {"exito": False, "mensaje": "El seguimiento de memoria no estaba activo"}
+    
+    @medir_llamada
+    def abrir_exportacion(self):
+        """
+        Abre una exportación: una vista del catálogo fija en este momento que
+        se lee por páginas con leer_exportacion.
+        
+        Las ventas y demás cambios siguen aplicándose mientras tanto; la
+        exportación no los ve.
+        
+        Returns:
+            dict: Identificador de la exportación, número de productos y
+                  versión del catálogo exportado, o mensaje de error.
+        """
+        try:
+            with self.lock:
+                id_exportacion = self.inventario.abrir_instantanea(EXPORTACION_TTL)
+                total = len(self.inventario.productos)
+                version = f"{self.epoca}:{self.inventario.version}"
             
-            return {"exito": exito, "mensaje": mensaje}
+            return {
+                "exito": True,
+                "id_exportacion": id_exportacion,
+                "total": total,
+                "version": version
+            }
         
         except Exception as e:
             return {"exito": False, "mensaje": f"Error: {str(e)}"}
+    
+    @medir_llamada
+    def leer_exportacion(self, id_exportacion, desde_id=None, limite=TAMANO_PAGINA_EXPORTACION):
+        """
+        Lee una página de una exportación, en orden de ID.
+        
+        Args:
+            id_exportacion (int): Identificador devuelto por abrir_exportacion.
+            desde_id (int, optional): Valor de "siguiente" de la página
+                anterior (None para la primera).
+            limite (int): Productos por página (como máximo
+                TAMANO_PAGINA_EXPORTACION).
+        
+        Returns:
+            dict: Productos de la página y "siguiente" (None si es la
+                  última), o mensaje de error.
+        """
+        try:
+            limite = max(1, min(int(limite), TAMANO_PAGINA_EXPORTACION))
+            
+            with self.lock:
+                productos, siguiente = self.inventario.leer_instantanea(
+                    int(id_exportacion), desde_id, limite
+                )
+            
+            return {"exito": True, "productos": productos, "siguiente": siguiente}
+        
+        except KeyError:
+            return {"exito": False, "mensaje": "Exportación no encontrada o caducada"}
+        except Exception as e:
+            return {"exito": False, "mensaje": f"Error: {str(e)}"}
+    
+    @medir_llamada
+    def cerrar_exportacion(self, id_exportacion):
+        """
+        Cierra una exportación y libera los datos que conservaba.
+        
+        Args:
+            id_exportacion (int): Identificador de la exportación.
+        
+        Returns:
+            dict: Resultado de la operación.
+        """
+        with self.lock:
+            self.inventario.cerrar_instantanea(id_exportacion)
+        
+        return {"exito": True, "mensaje": "Exportación cerrada"}
+    
+    @medir_llamada
+    def exportar_a_archivo(self, nombre_archivo, formato="jsonl"):
+        """
+        Inicia la exportación del catálogo a un archivo del servidor, dentro
+        del directorio de exportaciones junto al archivo de inventario.
+        
+        La exportación se ejecuta en un hilo aparte y la llamada vuelve
+        enseguida, así que no depende del timeout del cliente; su resultado
+        se consulta con estado_exportacion_archivo.
+        
+        Args:
+            nombre_archivo (str): Nombre del archivo (sin directorios).
+            formato (str): "jsonl" o "csv".
+        
+        Returns:
+            dict: Identificador del trabajo ("id_trabajo"), o mensaje de
+                  error.
+        """
+        nombre_archivo = os.path.basename(nombre_archivo)
+        if not nombre_archivo:
+            return {"exito": False, "mensaje": "Nombre de archivo no válido"}
+        if formato not in FORMATOS_EXPORTACION:
+            return {"exito": False, "mensaje": f"Formato de exportación no válido: {formato}"}
+        
+        trabajo = {"terminado": False, "escritos": 0, "resultado": None, "fin": None}
+        
+        with self._lock_trabajos:
+            self._purgar_trabajos()
+            id_trabajo = next(self._ids_trabajo)
+            self.trabajos_exportacion[id_trabajo] = trabajo
+        
+        hilo = threading.Thread(
+            target=self._ejecutar_trabajo_exportacion,
+            args=(trabajo, nombre_archivo, formato),
+            name=f"exportacion-{id_trabajo}"
+        )
+        hilo.daemon = True
+        hilo.start()
+        
+        return {"exito": True, "mensaje": "Exportación iniciada", "id_trabajo": id_trabajo}
+    
+    @medir_llamada
+    def estado_exportacion_archivo(self, id_trabajo):
+        """
+        Consulta el estado de una exportación iniciada con exportar_a_archivo.
+        
+        Args:
+            id_trabajo (int): Identificador del trabajo.
+        
+        Returns:
+            dict: "terminado", productos escritos hasta ahora ("escritos") y,
+                  al terminar, el resultado de la exportación ("resultado");
+                  o mensaje de error si el trabajo no existe o caducó.
+        """
+        with self._lock_trabajos:
+            self._purgar_trabajos()
+            trabajo = self.trabajos_exportacion.get(id_trabajo)
+            
+            if trabajo is None:
+                return {"exito": False, "mensaje": "Trabajo de exportación no encontrado o caducado"}
+            
+            return {
+                "exito": True,
+                "terminado": trabajo["terminado"],
+                "escritos": trabajo["escritos"],
+                "resultado": trabajo["resultado"]
+            }
+    
+    def _purgar_trabajos(self):
+        """
+        Olvida los trabajos de exportación terminados hace más de
+        EXPORTACION_TTL segundos. Debe llamarse con _lock_trabajos adquirido.
+        """
+        limite = time.monotonic() - EXPORTACION_TTL
+        caducados = [
+            id_trabajo for id_trabajo, trabajo in self.trabajos_exportacion.items()
+            if trabajo["terminado"] and trabajo["fin"] < limite
+        ]
+        for id_trabajo in caducados:
+            del self.trabajos_exportacion[id_trabajo]
+    
+    def _ejecutar_trabajo_exportacion(self, trabajo, nombre_archivo, formato):
+        """
+        Cuerpo del hilo de un trabajo de exportación: exporta y guarda el
+        resultado en el trabajo.
+        """
+        try:
+            resultado = self._exportar_a_archivo(nombre_archivo, formato, trabajo)
+        except Exception as e:
+            resultado = {"exito": False, "mensaje": f"Error: {str(e)}"}
+        
+        with self._lock_trabajos:
+            trabajo["resultado"] = resultado
+            trabajo["fin"] = time.monotonic()
+            trabajo["terminado"] = True
+        
+        if resultado["exito"]:
+            bitacora.info(f"Catálogo exportado en {resultado['ruta']}: {resultado['total']} productos")
+        else:
+            bitacora.warning(f"Error al exportar el catálogo a {nombre_archivo}: {resultado['mensaje']}")
+    
+    def _exportar_a_archivo(self, nombre_archivo, formato, trabajo):
+        """
+        Exporta el catálogo a un archivo del directorio de exportaciones.
+        
+        Se escribe página a página desde una vista fija del catálogo, así que
+        la memoria usada no depende de su tamaño y las ventas no se bloquean
+        más que lo que dura leer cada página.
+        
+        Args:
+            nombre_archivo (str): Nombre del archivo (sin directorios).
+            formato (str): "jsonl" o "csv".
+            trabajo (dict): Trabajo en el que anotar los productos escritos.
+        
+        Returns:
+            dict: Ruta del archivo y número de productos exportados, o
+                  mensaje de error.
+        """
+        ruta = os.path.join(self.directorio_exportaciones, nombre_archivo)
+        temporal = f"{ruta}.tmp"
+        abierta = self.abrir_exportacion()
+        
+        if not abierta["exito"]:
+            return abierta
+        
+        exportado = False
+        
+        try:
+            os.makedirs(self.directorio_exportaciones, exist_ok=True)
+            
+            with open(temporal, 'w', encoding='utf-8', newline='') as archivo:
+                escritor = EscritorProductos(archivo, formato)
+                desde_id = None
+                
+                while True:
+                    pagina = self.leer_exportacion(abierta["id_exportacion"], desde_id)
+                    if not pagina["exito"]:
+                        return pagina
+                    
+                    escritor.escribir_todos(pagina["productos"])
+                    trabajo["escritos"] = escritor.total
+                    desde_id = pagina["siguiente"]
+                    if desde_id is None:
+                        break
+            
+            os.replace(temporal, ruta)
+            exportado = True
+            
+            return {
+                "exito": True,
+                "mensaje": "Catálogo exportado correctamente",
+                "ruta": ruta,
+                "total": escritor.total,
+                "version": abierta["version"]
+            }
+        
+        except Exception as e:
+            return {"exito": False, "mensaje": f"Error: {str(e)}"}
+        finally:
+            # Una exportación fallida no deja el archivo temporal a medias
+            if not exportado:
+                try:
+                    os.remove(temporal)
+                except OSError:
+                    pass
+            
+            # Un error al cerrar no debe reemplazar el resultado
+            try:
+                self.cerrar_exportacion(abierta["id_exportacion"])
+            except Exception as e:
+                bitacora.warning(f"No se pudo cerrar la exportación {abierta['id_exportacion']}: {e}")
 
 
-def iniciar_servidor_con_ns():
+def iniciar_servidor_con_ns(host=HOST_SERVIDOR, opciones=None):
     """
     Inicia el servidor utilizando el Name Server de Pyro.
+    
+    Args:
+        host (str): Dirección en la que escucha el daemon.
+        opciones (argparse.Namespace, optional): Opciones de ejecución
+            (leer_opciones) a aplicar a Pyro antes de crear el daemon.
     """
+    if opciones is not None:
+        aplicar_opciones(opciones)
+    
     try:
         # Intentar localizar el nameserver con los parámetros de configuración
         ns = Pyro4.locateNS(host=NS_HOST, port=NS_PORT)
-        print(f"Nameserver encontrado en {NS_HOST}:{NS_PORT}.")
+        bitacora.info(f"Nameserver encontrado en {NS_HOST}:{NS_PORT}.")
         
         # Crear el daemon
-        daemon = Pyro4.Daemon(host=HOST_SERVIDOR)
+        daemon = Pyro4.Daemon(host=host)
         
         # Registrar el objeto en el daemon
-        uri = daemon.register(ServidorInventario())
+        servidor = ServidorInventario()
+        uri = daemon.register(servidor)
+        iniciar_exposicion(
+            servidor.registro_metricas, METRICAS_ARCHIVO, METRICAS_PUERTO, METRICAS_INTERVALO,
+            METRICAS_HOST or host
+        )
         
         # Registrar el objeto en el nameserver
         ns.register(NOMBRE_SERVIDOR, uri)
         
-        print(f"Servidor registrado como: {NOMBRE_SERVIDOR}")
-        print(f"URI: {uri}")
-        print("Servidor listo para recibir peticiones.")
+        bitacora.info(f"Servidor registrado como: {NOMBRE_SERVIDOR}")
+        bitacora.info(f"URI: {uri}")
+        bitacora.info("Servidor listo para recibir peticiones.")
         
         # Iniciar el bucle del daemon
         daemon.requestLoop()
     
     except Pyro4.errors.NamingError:
-        print("Error al conectar con el Name Server. Asegúrate de que esté en ejecución.")
-        print("Puedes iniciarlo con el comando: python -m Pyro4.naming")
+        bitacora.error("Error al conectar con el Name Server. Asegúrate de que esté en ejecución.")
+        bitacora.error("Puedes iniciarlo con el comando: python -m Pyro4.naming")
         sys.exit(1)
     
     except Exception as e:
-        print(f"Error al iniciar el servidor: {e}")
+        bitacora.error(f"Error al iniciar el servidor: {e}")
         sys.exit(1)
 
 
-def iniciar_servidor_sin_ns():
+def iniciar_servidor_sin_ns(host=HOST_SERVIDOR, puerto=PUERTO_SERVIDOR, opciones=None):
     """
     Inicia el servidor en modo independiente sin usar el Name Server.
+    
+    Args:
+        host (str): Dirección en la que escucha el daemon.
+        puerto (int): Puerto en el que escucha el daemon.
+        opciones (argparse.Namespace, optional): Opciones de ejecución
+            (leer_opciones) a aplicar a Pyro antes de crear el daemon.
     """
+    if opciones is not None:
+        aplicar_opciones(opciones)
+    
     try:
         # Crear el daemon en la dirección y puerto específicos
-        daemon = Pyro4.Daemon(host=HOST_SERVIDOR, port=PUERTO_SERVIDOR)
+        daemon = Pyro4.Daemon(host=host, port=puerto)
         
         # Registrar el objeto en el daemon con un nombre específico
-        uri = daemon.register(ServidorInventario(), objectId=NOMBRE_SERVIDOR)
+        servidor = ServidorInventario()
+        uri = daemon.register(servidor, objectId=NOMBRE_SERVIDOR)
+        iniciar_exposicion(
+            servidor.registro_metricas, METRICAS_ARCHIVO, METRICAS_PUERTO, METRICAS_INTERVALO,
+            METRICAS_HOST or host
+        )
         
-        print(f"Servidor iniciado en: {HOST_SERVIDOR}:{PUERTO_SERVIDOR}")
-        print(f"URI: {uri}")
-        print("Servidor listo para recibir peticiones.")
+        bitacora.info(f"Servidor iniciado en: {host}:{puerto}")
+        bitacora.info(f"URI: {uri}")
+        bitacora.info("Servidor listo para recibir peticiones.")
         
         # Iniciar el bucle del daemon
         daemon.requestLoop()
     
     except Exception as e:
-        print(f"Error al iniciar el servidor: {e}")
+        bitacora.error(f"Error al iniciar el servidor: {e}")
         sys.exit(1)
 
 
 if __name__ == "__main__":
+    # Opciones de ejecución: línea de comandos, entorno o constantes
+    opciones = leer_opciones()
+    
     # Configurar Pyro para permitir que los métodos de las clases sean llamados
     Pyro4.config.SERIALIZER = "pickle"
     Pyro4.config.SERIALIZERS_ACCEPTED.add("pickle")
@@ -264,6 +1058,19 @@ if __name__ == "__main__":
     # Deshabilitar la necesidad de clave HMAC para desarrollo local
     Pyro4.config.REQUIRE_EXPOSE = False
     
+    # Mensajes a la consola y a archivos rotativos, junto a los datos
+    ruta_base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    configurar_registro(
+        os.path.join(ruta_base, RUTA_REGISTRO),
+        os.path.join(ruta_base, RUTA_REGISTRO_LENTAS),
+        REGISTRO_MAX_BYTES,
+        REGISTRO_COPIAS
+    )
+    
+    if RUTA_TRAZAS_SERVIDOR:
+        trazas.configurar(os.path.join(ruta_base, RUTA_TRAZAS_SERVIDOR), "servidor")
+    
     # Iniciar directamente en modo independiente sin intentar usar el Name Server
-    print("Iniciando servidor en modo independiente...")
-    iniciar_servidor_sin_ns()
\ No newline at end of file
+    bitacora.info("Iniciando servidor en modo independiente...")
+    bitacora.info(f"Opciones: {describir_opciones(opciones)}")
+    iniciar_servidor_sin_ns(opciones.host, opciones.puerto, opciones)
\ No newline at end of file
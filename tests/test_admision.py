@@ -0,0 +1,127 @@
+"""
+Pruebas del control de admisión del servidor.
+"""
+import threading
+import unittest
+from unittest import mock
+from servidor.admision import ControlAdmision
+from common.constantes import ANOTACION_CLIENTE
+
+
+class Llamada(threading.Thread):
+    """
+    Llamada en un hilo propio que pide turno como un cliente dado y, si se
+    admite, sigue en curso hasta que se la termina.
+    """
+    
+    def __init__(self, control, contexto, id_cliente=None):
+        super().__init__()
+        self.control = control
+        self.contexto = contexto
+        self.id_cliente = id_cliente
+        self.rechazo = None
+        self.decidida = threading.Event()
+        self.terminar = threading.Event()
+    
+    def run(self):
+        if self.id_cliente is not None:
+            self.contexto.annotations = {ANOTACION_CLIENTE: self.id_cliente}
+        self.rechazo = self.control.entrar()
+        self.decidida.set()
+        if self.rechazo is None:
+            self.terminar.wait(5)
+            self.control.salir()
+
+
+class PruebasControlAdmision(unittest.TestCase):
+
+    def setUp(self):
+        # Contexto de Pyro por hilo, como el de una llamada remota
+        self.contexto = threading.local()
+        parche = mock.patch("servidor.admision.Pyro4.current_context", self.contexto)
+        parche.start()
+        self.addCleanup(parche.stop)
+        self.llamadas = []
+    
+    def tearDown(self):
+        for llamada in self.llamadas:
+            llamada.terminar.set()
+            llamada.join(5)
+    
+    def llamar(self, control, id_cliente=None, esperar=True):
+        llamada = Llamada(control, self.contexto, id_cliente)
+        self.llamadas.append(llamada)
+        llamada.start()
+        if esperar:
+            self.assertTrue(llamada.decidida.wait(5))
+        return llamada
+    
+    def test_sin_limites_admite_todas(self):
+        control = ControlAdmision()
+        llamadas = [self.llamar(control) for _ in range(5)]
+        
+        self.assertTrue(all(llamada.rechazo is None for llamada in llamadas))
+        self.assertEqual(control.resumen()["en_curso"], 5)
+    
+    def test_cola_llena_rechaza_con_ocupado(self):
+        control = ControlAdmision(max_concurrentes=1, max_cola=1, espera_max=5)
+        primera = self.llamar(control)
+        segunda = self.llamar(control, esperar=False)
+        
+        while not control.cola:
+            segunda.decidida.wait(0.01)
+        
+        tercera = self.llamar(control)
+        self.assertTrue(tercera.rechazo["ocupado"])
+        self.assertIn("cola de espera llena", tercera.rechazo["mensaje"])
+        self.assertGreater(tercera.rechazo["reintentar_en"], 0)
+        
+        # Al terminar la primera entra la que esperaba
+        self.assertFalse(segunda.decidida.is_set())
+        primera.terminar.set()
+        self.assertTrue(segunda.decidida.wait(5))
+        self.assertIsNone(segunda.rechazo)
+        
+        resumen = control.resumen()
+        self.assertEqual(resumen["en_curso"], 1)
+        self.assertEqual(resumen["admitidas"], 2)
+        self.assertEqual(resumen["rechazadas"], 1)
+    
+    def test_espera_agotada_libera_el_cupo(self):
+        control = ControlAdmision(max_concurrentes=1, max_por_cliente=1, max_cola=1, espera_max=0.05)
+        self.llamar(control, b"a")
+        
+        esperando = self.llamar(control, b"b")
+        self.assertIn("tiempo de espera agotado", esperando.rechazo["mensaje"])
+        self.assertEqual(control.resumen()["en_cola"], 0)
+        self.assertNotIn(("id", b"b"), control.por_cliente)
+    
+    def test_limite_por_identificador_de_cliente(self):
+        control = ControlAdmision(max_por_cliente=1)
+        primera = self.llamar(control, b"a")
+        
+        # Otra conexión del mismo cliente comparte su cupo; otro cliente no
+        misma = self.llamar(control, b"a")
+        otro = self.llamar(control, b"b")
+        
+        self.assertIsNone(primera.rechazo)
+        self.assertIn("este cliente", misma.rechazo["mensaje"])
+        self.assertIsNone(otro.rechazo)
+        
+        primera.terminar.set()
+        primera.join(5)
+        self.assertIsNone(self.llamar(control, b"a").rechazo)
+    
+    def test_llamadas_anidadas_no_pasan_el_control(self):
+        control = ControlAdmision(max_concurrentes=1)
+        
+        self.assertIsNone(control.entrar())
+        self.assertIsNone(control.entrar())
+        control.salir()
+        self.assertEqual(control.resumen()["en_curso"], 1)
+        control.salir()
+        self.assertEqual(control.resumen()["en_curso"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,264 @@
+"""
+Pruebas del cliente de inventario contra un servidor en el mismo proceso:
+reconexión con backoff, caché validada por versión y cola de ventas sin
+conexión.
+"""
+import os
+import copy
+import tempfile
+import unittest
+from unittest import mock
+import Pyro4
+from cliente.cliente import ClienteInventario
+from cliente.cola_ventas import ColaVentas
+from cliente.cache import CacheLRU
+from servidor.servidor import ServidorInventario
+from common.constantes import RECONEXION_INTENTOS, RECONEXION_ESPERA_BASE, RECONEXION_ESPERA_MAX
+
+
+class ProxyLocal:
+    """
+    Sustituto de un proxy de Pyro que llama directamente al servidor,
+    copiando los resultados como lo haría la serialización.
+    
+    Con "error" se simula un fallo en todas las llamadas; con "caer_tras",
+    una conexión que se pierde después de ese número de llamadas.
+    """
+    
+    def __init__(self, servidor):
+        self._pyroTimeout = None
+        self.servidor = servidor
+        self.llamadas = []
+        self.error = None
+        self.caer_tras = None
+    
+    def __getattr__(self, nombre):
+        metodo = getattr(self.servidor, nombre)
+        
+        def llamada(*args):
+            self.llamadas.append(nombre)
+            if self.caer_tras is not None and len(self.llamadas) > self.caer_tras:
+                self.error = Pyro4.errors.CommunicationError("Conexión perdida")
+            if self.error is not None:
+                raise self.error
+            return copy.deepcopy(metodo(*copy.deepcopy(args)))
+        
+        return llamada
+    
+    def _pyroRelease(self):
+        pass
+
+
+class PruebasClienteBase(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.servidor = ServidorInventario(os.path.join(self.directorio.name, "inventario.json"))
+        for i in range(1, 4):
+            self.servidor.agregar_producto(i, f"Producto {i}", 10.0, 10, "General")
+        
+        self.cola = ColaVentas(os.path.join(self.directorio.name, "ventas.jsonl"))
+        self.cliente = ClienteInventario(cola_ventas=self.cola)
+        self.proxy = ProxyLocal(self.servidor)
+        self.cliente.servidor = self.proxy
+        self.cliente.uri = "PYRO:inventario@localhost:9"
+        
+        # La reconexión no llega a ningún servidor y no espera de verdad
+        self.crear_proxy = mock.patch.object(
+            self.cliente, "_crear_proxy",
+            side_effect=Pyro4.errors.CommunicationError("Conexión rechazada")
+        ).start()
+        self.esperas = mock.patch("cliente.cliente.time.sleep").start()
+        self.addCleanup(mock.patch.stopall)
+    
+    def tearDown(self):
+        self.directorio.cleanup()
+    
+    def stock(self, id_producto):
+        return self.servidor.obtener_producto(id_producto)["producto"]["stock"]
+
+
+class PruebasReconexion(PruebasClienteBase):
+
+    def test_backoff_exponencial_y_espera_sin_conexion(self):
+        with mock.patch("cliente.cliente.random.uniform", side_effect=lambda minimo, maximo: maximo):
+            self.assertFalse(self.cliente.reconectar())
+        
+        self.assertEqual(self.crear_proxy.call_count, RECONEXION_INTENTOS)
+        self.assertEqual(
+            [llamada.args[0] for llamada in self.esperas.call_args_list],
+            [min(RECONEXION_ESPERA_MAX, RECONEXION_ESPERA_BASE * 2 ** i) for i in range(RECONEXION_INTENTOS)]
+        )
+        self.assertEqual(self.cliente.estadisticas["reconexiones_fallidas"], 1)
+        
+        # Mientras dura la espera, las llamadas fallan sin intentar conectar
+        resultado = self.cliente.listar_productos()
+        self.assertTrue(resultado["sin_conexion"])
+        self.assertFalse(self.cliente.reconectar())
+        self.assertEqual(self.crear_proxy.call_count, RECONEXION_INTENTOS)
+        self.assertEqual(self.proxy.llamadas, [])
+        
+        # Pasada la espera se hace un solo intento
+        self.cliente._sin_conexion_hasta = 1.0
+        self.assertFalse(self.cliente.reconectar())
+        self.assertEqual(self.crear_proxy.call_count, RECONEXION_INTENTOS + 1)
+        
+        nuevo = ProxyLocal(self.servidor)
+        self.crear_proxy.side_effect = None
+        self.crear_proxy.return_value = nuevo
+        self.cliente._sin_conexion_hasta = 1.0
+        self.assertTrue(self.cliente.reconectar())
+        self.assertIs(self.cliente.servidor, nuevo)
+        self.assertEqual(self.cliente._sin_conexion_hasta, 0.0)
+        self.assertTrue(self.cliente.listar_productos()["exito"])
+    
+    def test_reintento_tras_reconectar(self):
+        self.proxy.error = Pyro4.errors.CommunicationError("Conexión perdida")
+        self.crear_proxy.side_effect = None
+        self.crear_proxy.return_value = ProxyLocal(self.servidor)
+        
+        resultado = self.cliente.vender_producto(1, 3)
+        
+        self.assertTrue(resultado["exito"])
+        self.assertEqual(self.stock(1), 7)
+        self.assertEqual(self.cliente.estadisticas["reconexiones"], 1)
+    
+    def test_timeout_no_se_reintenta(self):
+        self.proxy.error = Pyro4.errors.TimeoutError("Sin respuesta")
+        
+        resultado = self.cliente.obtener_producto(1)
+        
+        self.assertTrue(resultado["sin_conexion"])
+        self.assertEqual(self.proxy.llamadas, ["obtener_producto"])
+        self.crear_proxy.assert_not_called()
+
+
+class PruebasCache(PruebasClienteBase):
+
+    def test_revalidacion_por_version(self):
+        self.cliente.obtener_producto(1)
+        self.cliente.obtener_producto(1)
+        self.assertEqual(self.proxy.llamadas, ["obtener_producto"])
+        
+        # Caducada pero sin cambios: el servidor no reenvía los datos
+        self.cliente.cache.ttl = 0
+        resultado = self.cliente.obtener_producto(1)
+        self.assertEqual(resultado["producto"]["nombre"], "Producto 1")
+        
+        # Cambiada en el servidor: se reciben los datos nuevos
+        self.servidor.modificar_producto(1, {"nombre": "Renombrado"})
+        resultado = self.cliente.obtener_producto(1)
+        self.assertEqual(resultado["producto"]["nombre"], "Renombrado")
+        
+        estadisticas = self.cliente.obtener_estadisticas()
+        self.assertEqual(
+            (estadisticas["cache_aciertos"], estadisticas["cache_revalidaciones"], estadisticas["cache_fallos"]),
+            (1, 1, 2)
+        )
+    
+    def test_cambios_desde_invalida_la_cache_compartida(self):
+        version = self.cliente.cambios_desde()["version"]
+        self.cliente.obtener_producto(1)
+        self.cliente.obtener_producto(2)
+        
+        self.servidor.vender_producto(1, 1)
+        self.servidor.eliminar_producto(2)
+        
+        clon = ClienteInventario(cache=self.cliente.cache)
+        clon.servidor = self.proxy
+        resultado = clon.cambios_desde(version)
+        
+        self.assertFalse(resultado["completo"])
+        self.assertEqual(resultado["eliminados"], [2])
+        self.assertIsNone(self.cliente.cache.obtener(1))
+        self.assertIsNone(self.cliente.cache.obtener(2))
+        self.assertEqual(self.cliente.obtener_producto(1)["producto"]["stock"], 9)
+    
+    def test_expulsion_lru(self):
+        cache = CacheLRU(2, 60)
+        cache.guardar(1, {}, "v1")
+        cache.guardar(2, {}, "v1")
+        cache.obtener(1)
+        cache.guardar(3, {}, "v1")
+        
+        self.assertIsNone(cache.obtener(2))
+        self.assertEqual(len(cache), 2)
+
+
+class PruebasColaVentas(PruebasClienteBase):
+
+    def sin_conexion(self):
+        self.proxy.error = Pyro4.errors.CommunicationError("Conexión perdida")
+    
+    def con_conexion(self):
+        self.proxy.error = None
+        self.proxy.caer_tras = None
+        self.cliente._sin_conexion_hasta = 0.0
+    
+    def test_venta_sin_conexion_se_guarda_y_se_envia(self):
+        self.sin_conexion()
+        resultado = self.cliente.vender_producto(1, 2)
+        self.cliente.vender_producto(2, 1)
+        
+        self.assertTrue(resultado["pendiente"])
+        self.assertEqual(len(self.cola), 2)
+        
+        # La cola sobrevive a un reinicio del cliente
+        self.assertEqual(len(ColaVentas(self.cola.ruta_archivo)), 2)
+        
+        self.con_conexion()
+        resultado = self.cliente.sincronizar_ventas()
+        
+        self.assertEqual((resultado["confirmadas"], resultado["pendientes"]), (2, 0))
+        self.assertEqual((self.stock(1), self.stock(2)), (8, 9))
+        self.assertEqual(len(ColaVentas(self.cola.ruta_archivo)), 0)
+    
+    def test_reenvio_no_aplica_dos_veces(self):
+        # El servidor aplicó la venta pero la respuesta no llegó al cliente
+        self.servidor.vender_producto(1, 4, "venta-1")
+        self.cola.encolar(1, 4, "venta-1")
+        
+        resultado = self.cliente.sincronizar_ventas()
+        
+        self.assertEqual(resultado["confirmadas"], 1)
+        self.assertEqual(self.stock(1), 6)
+        self.assertEqual(len(self.cola), 0)
+    
+    def test_venta_rechazada_pasa_a_conflictos(self):
+        self.cola.encolar(1, 50)
+        self.cola.encolar(2, 1)
+        
+        resultado = self.cliente.sincronizar_ventas()
+        
+        self.assertEqual(resultado["confirmadas"], 1)
+        self.assertEqual([c["id_producto"] for c in resultado["conflictos"]], [1])
+        self.assertEqual(len(self.cola), 0)
+        self.assertEqual(self.stock(1), 10)
+        self.assertEqual([c["cantidad"] for c in self.cola.conflictos()], [50])
+    
+    def test_lote_no_enviado_queda_pendiente(self):
+        for id_producto in (1, 2, 3, 1, 2):
+            self.cola.encolar(id_producto, 1)
+        
+        # Se pierde la conexión después del primer lote
+        self.proxy.caer_tras = 1
+        with mock.patch("cliente.cliente.TAMANO_MAX_LOTE", 2):
+            resultado = self.cliente.sincronizar_ventas()
+        
+        self.assertEqual((resultado["confirmadas"], resultado["pendientes"]), (2, 3))
+        self.assertIn("mensaje", resultado)
+        self.assertEqual(resultado["conflictos"], [])
+        self.assertEqual(
+            [e["id_producto"] for e in ColaVentas(self.cola.ruta_archivo).pendientes()], [3, 1, 2]
+        )
+        
+        self.con_conexion()
+        with mock.patch("cliente.cliente.TAMANO_MAX_LOTE", 2):
+            resultado = self.cliente.sincronizar_ventas()
+        
+        self.assertEqual((resultado["confirmadas"], resultado["pendientes"]), (3, 0))
+        self.assertEqual([self.stock(i) for i in (1, 2, 3)], [8, 8, 9])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Pruebas de la tabla de idempotencia del servidor.
+"""
+import threading
+import unittest
+from unittest import mock
+from servidor.idempotencia import TablaIdempotencia
+
+
+class Operacion:
+    """
+    Operación que cuenta sus ejecuciones y puede quedarse bloqueada hasta
+    que se la libere.
+    """
+    
+    def __init__(self, bloquear=False):
+        self.ejecuciones = 0
+        self.iniciada = threading.Event()
+        self.liberar = threading.Event()
+        if not bloquear:
+            self.liberar.set()
+    
+    def __call__(self, valor):
+        self.ejecuciones += 1
+        self.iniciada.set()
+        self.liberar.wait(5)
+        return {"exito": True, "valor": valor}
+
+
+class PruebasTablaIdempotencia(unittest.TestCase):
+
+    def test_reintento_devuelve_resultado_original(self):
+        tabla = TablaIdempotencia(10, 60)
+        operacion = Operacion()
+        
+        primero = tabla.ejecutar("a", operacion, 1)
+        segundo = tabla.ejecutar("a", operacion, 2)
+        
+        self.assertEqual(primero, {"exito": True, "valor": 1})
+        self.assertIs(segundo, primero)
+        self.assertEqual(operacion.ejecuciones, 1)
+    
+    def test_ejecucion_fallida_no_se_recuerda(self):
+        tabla = TablaIdempotencia(10, 60)
+        
+        def fallar():
+            raise RuntimeError("fallo")
+        
+        with self.assertRaises(RuntimeError):
+            tabla.ejecutar("a", fallar)
+        self.assertEqual(len(tabla), 0)
+        
+        operacion = Operacion()
+        self.assertEqual(tabla.ejecutar("a", operacion, 1)["valor"], 1)
+        self.assertEqual(operacion.ejecuciones, 1)
+    
+    def test_exceso_descarta_los_mas_antiguos(self):
+        tabla = TablaIdempotencia(3, 60)
+        operacion = Operacion()
+        
+        for id_solicitud in "abcde":
+            tabla.ejecutar(id_solicitud, operacion, id_solicitud)
+        
+        # La purga se hace antes de añadir cada entrada nueva
+        self.assertEqual(len(tabla), 4)
+        tabla.ejecutar("e", operacion, "e")
+        self.assertEqual(operacion.ejecuciones, 5)
+        tabla.ejecutar("a", operacion, "a")
+        self.assertEqual(operacion.ejecuciones, 6)
+    
+    def test_resultados_expirados_se_descartan(self):
+        tabla = TablaIdempotencia(10, 60)
+        operacion = Operacion()
+        
+        with mock.patch("servidor.idempotencia.time") as reloj:
+            reloj.monotonic.return_value = 100.0
+            tabla.ejecutar("a", operacion, 1)
+            
+            reloj.monotonic.return_value = 159.0
+            tabla.ejecutar("a", operacion, 1)
+            self.assertEqual(operacion.ejecuciones, 1)
+            
+            reloj.monotonic.return_value = 161.0
+            tabla.ejecutar("b", operacion, 2)
+            self.assertEqual(len(tabla), 1)
+            tabla.ejecutar("a", operacion, 1)
+            self.assertEqual(operacion.ejecuciones, 3)
+    
+    def test_solicitud_en_curso_no_se_descarta(self):
+        tabla = TablaIdempotencia(2, 60)
+        lenta = Operacion(bloquear=True)
+        resultados = []
+        
+        original = threading.Thread(target=lambda: resultados.append(tabla.ejecutar("lenta", lenta, 1)))
+        original.start()
+        self.assertTrue(lenta.iniciada.wait(5))
+        
+        # Llenar la tabla por encima de su tamaño mientras sigue en curso
+        rapida = Operacion()
+        for numero in range(5):
+            tabla.ejecutar(f"r{numero}", rapida, numero)
+        
+        reintento = threading.Thread(target=lambda: resultados.append(tabla.ejecutar("lenta", lenta, 2)))
+        reintento.start()
+        
+        lenta.liberar.set()
+        original.join(5)
+        reintento.join(5)
+        
+        self.assertEqual(lenta.ejecuciones, 1)
+        self.assertEqual(resultados, [{"exito": True, "valor": 1}] * 2)
+    
+    def test_espera_acotada_devuelve_ocupado(self):
+        tabla = TablaIdempotencia(10, 60, espera_max=0.05)
+        lenta = Operacion(bloquear=True)
+        
+        original = threading.Thread(target=tabla.ejecutar, args=("a", lenta, 1))
+        original.start()
+        self.assertTrue(lenta.iniciada.wait(5))
+        
+        try:
+            resultado = tabla.ejecutar("a", lenta, 1)
+        finally:
+            lenta.liberar.set()
+            original.join(5)
+        
+        self.assertFalse(resultado["exito"])
+        self.assertTrue(resultado["ocupado"])
+        self.assertEqual(resultado["reintentar_en"], 0.05)
+        self.assertEqual(lenta.ejecuciones, 1)
+        
+        # Terminada la original, el reintento recibe su resultado
+        self.assertEqual(tabla.ejecutar("a", lenta, 1), {"exito": True, "valor": 1})
+        self.assertEqual(lenta.ejecuciones, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+"""
+Pruebas del índice de búsqueda de la interfaz.
+"""
+import unittest
+from cliente.indice_busqueda import IndiceBusqueda
+
+
+def producto(id_producto, nombre, categoria="General"):
+    return {"id": id_producto, "nombre": nombre, "categoria": categoria}
+
+
+class PruebasIndiceBusqueda(unittest.TestCase):
+
+    def setUp(self):
+        self.indice = IndiceBusqueda([
+            producto(3, "Martillo"),
+            producto(1, "Tornillo", "Ferretería"),
+            producto(2, "Tuerca", "Ferretería")
+        ])
+    
+    def test_filtrar_en_orden_del_catalogo(self):
+        self.assertEqual(self.indice.filtrar("illo"), [3, 1])
+        self.assertEqual(self.indice.filtrar("", "Ferretería"), [1, 2])
+        self.assertEqual(self.indice.filtrar("t", "Ferretería"), [1, 2])
+        self.assertEqual(self.indice.filtrar("", None), [3, 1, 2])
+        self.assertEqual(self.indice.filtrar("xyz"), [])
+    
+    def test_actualizar_quita_los_trigramas_anteriores(self):
+        self.indice.filtrar("mar")
+        self.indice.actualizar(producto(3, "Destornillador", "Ferretería"))
+        
+        self.assertEqual(self.indice.filtrar("mar"), [])
+        self.assertEqual(self.indice.filtrar("tornill"), [3, 1])
+        self.assertEqual(self.indice.filtrar("", "General"), [])
+        self.assertNotIn("mar", self.indice.trigramas)
+        self.assertNotIn("General", self.indice.categorias)
+    
+    def test_eliminar(self):
+        self.indice.eliminar(1)
+        self.indice.eliminar(99)
+        
+        self.assertEqual(self.indice.filtrar("illo"), [3])
+        self.assertEqual(self.indice.filtrar("", "Ferretería"), [2])
+        self.assertFalse(any(1 in ids for ids in self.indice.trigramas.values()))
+        
+        self.indice.actualizar(producto(1, "Tornillo"))
+        self.assertEqual(self.indice.filtrar("illo"), [3, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
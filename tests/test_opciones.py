@@ -0,0 +1,81 @@
+"""
+Pruebas de las opciones de ejecución del servidor.
+"""
+import io
+import os
+import unittest
+from contextlib import redirect_stderr
+from unittest import mock
+import Pyro4
+from servidor.opciones import leer_opciones, aplicar_opciones
+from common.constantes import SERVIDOR_TIPO, SERVIDOR_HILOS, SERVIDOR_TIMEOUT, PUERTO_SERVIDOR
+
+
+class PruebasOpciones(unittest.TestCase):
+
+    def setUp(self):
+        entorno = {
+            nombre: valor for nombre, valor in os.environ.items()
+            if not nombre.startswith("INVENTARIO_")
+        }
+        parche = mock.patch.dict(os.environ, entorno, clear=True)
+        parche.start()
+        self.addCleanup(parche.stop)
+    
+    def leer_con_error(self, argumentos):
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            leer_opciones(argumentos)
+    
+    def test_valores_por_defecto(self):
+        opciones = leer_opciones([])
+        
+        self.assertEqual(opciones.tipo, SERVIDOR_TIPO)
+        self.assertEqual(opciones.hilos, SERVIDOR_HILOS)
+        self.assertEqual(opciones.timeout, SERVIDOR_TIMEOUT)
+        self.assertEqual(opciones.puerto, PUERTO_SERVIDOR)
+    
+    def test_entorno_y_linea_de_comandos(self):
+        os.environ["INVENTARIO_HILOS"] = "7"
+        os.environ["INVENTARIO_HILOS_MIN"] = "2"
+        os.environ["INVENTARIO_TCP_NODELAY"] = "sí"
+        
+        opciones = leer_opciones([])
+        self.assertEqual((opciones.hilos, opciones.hilos_min), (7, 2))
+        self.assertTrue(opciones.tcp_nodelay)
+        
+        # La línea de comandos tiene preferencia sobre el entorno
+        opciones = leer_opciones(["--hilos", "9", "--no-tcp-nodelay", "--tipo", "multiplex"])
+        self.assertEqual(opciones.hilos, 9)
+        self.assertFalse(opciones.tcp_nodelay)
+        self.assertEqual(opciones.tipo, "multiplex")
+    
+    def test_valores_no_validos(self):
+        self.leer_con_error(["--tipo", "procesos"])
+        self.leer_con_error(["--hilos", "4", "--hilos-min", "5"])
+        self.leer_con_error(["--hilos", "0", "--hilos-min", "0"])
+        self.leer_con_error(["--timeout", "-1"])
+        
+        os.environ["INVENTARIO_PUERTO"] = "abc"
+        with self.assertRaises(SystemExit):
+            leer_opciones([])
+    
+    def test_aplicar_opciones(self):
+        nombres = ("SERVERTYPE", "THREADPOOL_SIZE", "THREADPOOL_SIZE_MIN", "COMMTIMEOUT", "SOCK_NODELAY", "SOCK_REUSE")
+        for nombre in nombres:
+            self.addCleanup(setattr, Pyro4.config, nombre, getattr(Pyro4.config, nombre))
+        
+        aplicar_opciones(leer_opciones([
+            "--tipo", "multiplex", "--hilos", "8", "--hilos-min", "3",
+            "--timeout", "2.5", "--tcp-nodelay", "--no-sock-reuse"
+        ]))
+        
+        self.assertEqual(Pyro4.config.SERVERTYPE, "multiplex")
+        self.assertEqual(Pyro4.config.THREADPOOL_SIZE, 8)
+        self.assertEqual(Pyro4.config.THREADPOOL_SIZE_MIN, 3)
+        self.assertEqual(Pyro4.config.COMMTIMEOUT, 2.5)
+        self.assertTrue(Pyro4.config.SOCK_NODELAY)
+        self.assertFalse(Pyro4.config.SOCK_REUSE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Pruebas del perfilador del servidor.
+"""
+import os
+import pstats
+import tempfile
+import threading
+import unittest
+from servidor.perfilado import Perfilador
+
+
+def calcular(n):
+    return sum(i * i for i in range(n))
+
+
+class PruebasPerfilador(unittest.TestCase):
+    
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.perfilador = Perfilador(self.directorio.name)
+    
+    def tearDown(self):
+        self.directorio.cleanup()
+    
+    def test_llamadas_concurrentes_perfiladas(self):
+        exito, mensaje, _ = self.perfilador.iniciar("cprofile", 30)
+        self.assertTrue(exito, mensaje)
+        
+        barrera = threading.Barrier(4)
+        resultados = []
+        errores = []
+        
+        def llamada():
+            barrera.wait()
+            try:
+                for _ in range(5):
+                    resultados.append(self.perfilador.ejecutar(calcular, 20000))
+            except Exception as e:
+                errores.append(e)
+        
+        hilos = [threading.Thread(target=llamada) for _ in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        
+        self.assertEqual(errores, [])
+        self.assertEqual(resultados, [calcular(20000)] * 20)
+        self.assertEqual(self.perfilador._en_curso, 0)
+        
+        exito, mensaje, ruta = self.perfilador.detener()
+        self.assertTrue(exito, mensaje)
+        self.assertTrue(os.path.exists(ruta))
+        funciones = {funcion for _, _, funcion in pstats.Stats(ruta).stats}
+        self.assertIn("calcular", funciones)
+    
+    def test_perfil_sin_llamadas(self):
+        self.perfilador.iniciar("cprofile", 30)
+        self.perfilador.detener()
+        
+        # Detener un perfil vacío no deja el perfilador bloqueado
+        self.assertIsNone(self.perfilador.tipo)
+        exito, mensaje, _ = self.perfilador.iniciar("cprofile", 30)
+        self.assertTrue(exito, mensaje)
+        self.perfilador.detener()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+"""
+Pruebas del servidor de inventario: sincronización por versiones y
+exportación por páginas desde una vista fija del catálogo.
+"""
+import os
+import json
+import time
+import tempfile
+import unittest
+from unittest import mock
+from servidor.servidor import ServidorInventario
+
+
+def crear_servidor(directorio, n=0):
+    """
+    Crea un servidor sobre un archivo de inventario en el directorio dado,
+    con n productos de IDs 1..n.
+    """
+    servidor = ServidorInventario(os.path.join(directorio, "inventario.json"))
+    for i in range(1, n + 1):
+        servidor.agregar_producto(i, f"Producto {i}", 10.0, 100, "General")
+    return servidor
+
+
+class PruebasCambiosDesde(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.servidor = crear_servidor(self.directorio.name, 3)
+    
+    def tearDown(self):
+        self.directorio.cleanup()
+    
+    def test_sin_version_devuelve_catalogo_completo(self):
+        resultado = self.servidor.cambios_desde(None)
+        
+        self.assertTrue(resultado["completo"])
+        self.assertEqual(sorted(p["id"] for p in resultado["productos"]), [1, 2, 3])
+    
+    def test_solo_devuelve_lo_que_cambio(self):
+        version = self.servidor.cambios_desde(None)["version"]
+        
+        self.servidor.modificar_producto(1, {"precio": 12.5})
+        self.servidor.vender_producto(2, 5)
+        self.servidor.eliminar_producto(3)
+        self.servidor.agregar_producto(4, "Nuevo", 1.0, 1, "Otra")
+        
+        resultado = self.servidor.cambios_desde(version)
+        self.assertFalse(resultado["completo"])
+        productos = {p["id"]: p for p in resultado["productos"]}
+        self.assertEqual(sorted(productos), [1, 2, 4])
+        self.assertEqual(productos[1]["precio"], 12.5)
+        self.assertEqual(productos[2]["stock"], 95)
+        self.assertEqual(resultado["eliminados"], [3])
+        
+        # Sin cambios nuevos, la siguiente sincronización viene vacía
+        siguiente = self.servidor.cambios_desde(resultado["version"])
+        self.assertEqual((siguiente["productos"], siguiente["eliminados"]), ([], []))
+    
+    def test_version_de_otra_ejecucion_devuelve_catalogo_completo(self):
+        version = self.servidor.cambios_desde(None)["version"]
+        numero = version.partition(":")[2]
+        
+        resultado = self.servidor.cambios_desde(f"otra:{numero}")
+        self.assertTrue(resultado["completo"])
+        self.assertEqual(len(resultado["productos"]), 3)
+
+
+class PruebasExportacion(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.directorio.cleanup()
+    
+    def leer_todo(self, servidor, id_exportacion, limite, al_leer_pagina=None):
+        """
+        Lee una exportación completa; devuelve los productos y el número de
+        páginas.
+        """
+        productos = []
+        paginas = 0
+        desde_id = None
+        
+        while True:
+            pagina = servidor.leer_exportacion(id_exportacion, desde_id, limite)
+            self.assertTrue(pagina["exito"], pagina.get("mensaje"))
+            productos.extend(pagina["productos"])
+            paginas += 1
+            if al_leer_pagina is not None:
+                al_leer_pagina(paginas)
+            desde_id = pagina["siguiente"]
+            if desde_id is None:
+                return productos, paginas
+    
+    def test_paginas_ven_el_catalogo_al_abrir(self):
+        servidor = crear_servidor(self.directorio.name, 25)
+        abierta = servidor.abrir_exportacion()
+        self.assertEqual(abierta["total"], 25)
+        
+        def modificar(paginas):
+            if paginas == 1:
+                servidor.vender_producto(15, 40)
+                servidor.eliminar_producto(20)
+                servidor.agregar_producto(26, "Posterior", 1.0, 1, "General")
+        
+        productos, paginas = self.leer_todo(servidor, abierta["id_exportacion"], 10, modificar)
+        
+        self.assertEqual(paginas, 3)
+        self.assertEqual([p["id"] for p in productos], list(range(1, 26)))
+        self.assertEqual(productos[14]["stock"], 100)
+        self.assertEqual(servidor.obtener_producto(15)["producto"]["stock"], 60)
+    
+    def test_eliminados_en_el_borde_de_pagina(self):
+        servidor = crear_servidor(self.directorio.name, 20)
+        abierta = servidor.abrir_exportacion()
+        
+        for id_producto in (5, 6, 20):
+            servidor.eliminar_producto(id_producto)
+        
+        productos, _ = self.leer_todo(servidor, abierta["id_exportacion"], 5)
+        self.assertEqual([p["id"] for p in productos], list(range(1, 21)))
+    
+    def test_ultima_pagina_completa(self):
+        servidor = crear_servidor(self.directorio.name, 20)
+        abierta = servidor.abrir_exportacion()
+        
+        productos, paginas = self.leer_todo(servidor, abierta["id_exportacion"], 10)
+        self.assertEqual(len(productos), 20)
+        self.assertEqual(paginas, 3)
+    
+    def test_exportacion_cerrada(self):
+        servidor = crear_servidor(self.directorio.name, 3)
+        abierta = servidor.abrir_exportacion()
+        servidor.cerrar_exportacion(abierta["id_exportacion"])
+        
+        pagina = servidor.leer_exportacion(abierta["id_exportacion"])
+        self.assertFalse(pagina["exito"])
+        self.assertEqual(servidor.inventario.instantaneas, {})
+    
+    def esperar_trabajo(self, servidor, id_trabajo):
+        limite = time.monotonic() + 10
+        while time.monotonic() < limite:
+            estado = servidor.estado_exportacion_archivo(id_trabajo)
+            self.assertTrue(estado["exito"], estado.get("mensaje"))
+            if estado["terminado"]:
+                return estado["resultado"]
+            time.sleep(0.01)
+        self.fail("La exportación no terminó a tiempo")
+    
+    def test_exportar_a_archivo(self):
+        servidor = crear_servidor(self.directorio.name, 30)
+        
+        with mock.patch("servidor.servidor.TAMANO_PAGINA_EXPORTACION", 7):
+            iniciada = servidor.exportar_a_archivo("../catalogo.jsonl")
+            self.assertTrue(iniciada["exito"])
+            resultado = self.esperar_trabajo(servidor, iniciada["id_trabajo"])
+        
+        self.assertTrue(resultado["exito"], resultado.get("mensaje"))
+        self.assertEqual(resultado["total"], 30)
+        self.assertEqual(os.path.dirname(resultado["ruta"]), servidor.directorio_exportaciones)
+        with open(resultado["ruta"], encoding="utf-8") as archivo:
+            ids = [json.loads(linea)["id"] for linea in archivo]
+        self.assertEqual(ids, list(range(1, 31)))
+        self.assertEqual(os.listdir(servidor.directorio_exportaciones), ["catalogo.jsonl"])
+        self.assertEqual(servidor.inventario.instantaneas, {})
+    
+    def test_exportacion_fallida_no_deja_temporal(self):
+        servidor = crear_servidor(self.directorio.name, 5)
+        
+        with mock.patch("servidor.servidor.EscritorProductos.escribir_todos", side_effect=OSError("disco lleno")), \
+                self.assertLogs("servidor.servidor", "WARNING"):
+            iniciada = servidor.exportar_a_archivo("catalogo.csv", "csv")
+            resultado = self.esperar_trabajo(servidor, iniciada["id_trabajo"])
+        
+        self.assertFalse(resultado["exito"])
+        self.assertIn("disco lleno", resultado["mensaje"])
+        self.assertEqual(os.listdir(servidor.directorio_exportaciones), [])
+        self.assertEqual(servidor.inventario.instantaneas, {})
+    
+    def test_exportar_a_archivo_valida_antes_de_empezar(self):
+        servidor = crear_servidor(self.directorio.name)
+        
+        self.assertFalse(servidor.exportar_a_archivo("catalogo.xml", "xml")["exito"])
+        self.assertFalse(servidor.exportar_a_archivo("")["exito"])
+        self.assertEqual(servidor.trabajos_exportacion, {})
+        self.assertFalse(servidor.estado_exportacion_archivo(99)["exito"])
+
+
+if __name__ == "__main__":
+    unittest.main()